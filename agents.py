@@ -1,74 +1,156 @@
 from crewai import Agent
-import json
-from langchain.tools import BaseTool
-from tools import (
-    market_research_tool,
-    financial_modeling_tool,
-    technical_assessment_tool,
-    validation_experiment_tool,
-    pivot_analysis_tool
-)
+import re
+import threading
+from collections.abc import Mapping
 from config import AGENT_TEMPERATURE
+from tool_registry import ToolRegistry
+from utils import load_config
 
-# Convert LangChain tools to CrewAI compatible format
-def convert_to_crewai_tool(lc_tool):
-    return {
-        "name": lc_tool.name,
-        "description": lc_tool.description,
-        "func": lc_tool._run
+# Registry of the built-in tools, used when no workshop registry is given
+TOOL_MAP = ToolRegistry()
+
+def create_agent(agent_config, llm, tool_memo=None, tools=None):
+    """
+    Create a single agent from its entry in the configuration file.
+
+    Args:
+        agent_config: The agent's entry in the configuration file
+        llm: The language model to use
+        tool_memo: Optional ToolMemo shared by all agents of a run to memoize tool results
+        tools: ToolRegistry to take the tools from (defaults to the built-in tools)
+
+    Returns:
+        The CrewAI agent
+    """
+    registry = tools if tools is not None else TOOL_MAP
+    registry.validate_agents([agent_config])
+
+    # Get the tools for this agent; only tools with the "run" cache policy are memoized
+    tools = []
+    for tool_name in agent_config.get("tools", []):
+        tool = registry[tool_name]
+        if tool_memo and registry.spec(tool_name).cache == "run":
+            tool = tool_memo.wrap_tool(tool, agent_id=agent_config["id"])
+        tools.append(tool)
+
+    # Create the agent
+    agent_kwargs = {
+        "role": agent_config["role"],
+        "goal": agent_config["goal"],
+        "backstory": agent_config["backstory"],
+        "verbose": agent_config.get("verbose", True),
+        "allow_delegation": True,  # Always enable delegation for collaboration
+        "llm": llm
     }
 
-# Map tool names to actual tool objects
-TOOL_MAP = {
-    "market_research_tool": convert_to_crewai_tool(market_research_tool),
-    "financial_modeling_tool": convert_to_crewai_tool(financial_modeling_tool),
-    "technical_assessment_tool": convert_to_crewai_tool(technical_assessment_tool),
-    "validation_experiment_tool": convert_to_crewai_tool(validation_experiment_tool),
-    "pivot_analysis_tool": convert_to_crewai_tool(pivot_analysis_tool)
-}
+    # Only add tools if we have any
+    if tools:
+        agent_kwargs["tools"] = tools
 
-def create_agents(llm, config_file="workshop_config.json"):
+    return Agent(**agent_kwargs)
+
+def create_agents(llm, config_file="workshop_config.json", tool_memo=None):
     """
     Create all the agents for the workshop based on a JSON configuration file.
 
     Args:
         llm: The language model to use
         config_file: Path to the JSON configuration file
+        tool_memo: Optional ToolMemo shared by all agents of a run to memoize tool results
 
     Returns:
         Dictionary of agents with their IDs as keys
     """
     # Load the configuration file
-    with open(config_file, "r") as f:
-        config = json.load(f)
+    config = load_config(config_file)
+    tools = ToolRegistry.from_config(config)
 
     # Create agents based on the configuration
     agents = {}
     for agent_config in config["agents"]:
-        # Get the tools for this agent
-        tools = []
-        for tool_name in agent_config.get("tools", []):
-            if tool_name in TOOL_MAP:
-                tools.append(TOOL_MAP[tool_name])
-
-        # Create the agent
-        agent_kwargs = {
-            "role": agent_config["role"],
-            "goal": agent_config["goal"],
-            "backstory": agent_config["backstory"],
-            "verbose": agent_config.get("verbose", True),
-            "allow_delegation": True,  # Always enable delegation for collaboration
-            "llm": llm
-        }
-
-        # Only add tools if we have any
-        if tools:
-            agent_kwargs["tools"] = tools
-
-        # Create the agent
-        agent = Agent(**agent_kwargs)
-
-        # Add the agent to the dictionary
-        agents[agent_config["id"]] = agent
+        agents[agent_config["id"]] = create_agent(agent_config, llm, tool_memo, tools)
 
     return agents
+
+def _words(text):
+    return set(word for word in re.findall(r"[a-z]+", text.lower()) if len(word) > 3)
+
+class AgentRoster(Mapping):
+    """
+    The agents of a workshop, each created the first time it is needed.
+
+    The roster behaves like the dictionary returned by create_agents, but only
+    the agents a task actually uses are instantiated. It also selects the
+    minimal set of agents for each task.
+    """
+
+    def __init__(self, llm, config_file="workshop_config.json", tool_memo=None, tools=None):
+        config = load_config(config_file)
+        self.llm = llm
+        self.tool_memo = tool_memo
+        self.tools = tools if tools is not None else ToolRegistry.from_config(config)
+        self.agent_configs = {agent_config["id"]: agent_config for agent_config in config["agents"]}
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, agent_id):
+        agent_config = self.agent_configs[agent_id]
+        with self._lock:
+            if agent_id not in self._agents:
+                self._agents[agent_id] = create_agent(agent_config, self.llm, self.tool_memo, self.tools)
+            return self._agents[agent_id]
+
+    def __iter__(self):
+        return iter(self.agent_configs)
+
+    def __len__(self):
+        return len(self.agent_configs)
+
+    @property
+    def instantiated(self):
+        """IDs of the agents created so far."""
+        return list(self._agents)
+
+    def role(self, agent_id):
+        return self.agent_configs[agent_id]["role"]
+
+    def select(self, task_config, full_team=False, max_agents=None, exclude=()):
+        """
+        Select the agents for a task.
+
+        A task gets its lead agent and the collaborators listed in its configuration.
+        A full-team task gets every other agent as well, ranked by how many words of
+        their role and goal appear in the task description, and is optionally capped.
+
+        Args:
+            task_config: The task's entry in the configuration file
+            full_team: Whether the whole team takes part in the task
+            max_agents: Maximum number of agents for a full-team task
+            exclude: Agent IDs never included unless they lead the task
+
+        Returns:
+            Tuple of (selected agent IDs, absent agent IDs left out by the cap)
+        """
+        lead = task_config["agent_id"]
+        selected = [lead] + [agent_id for agent_id in task_config.get("collaborators", [])
+                             if agent_id in self.agent_configs and agent_id != lead and agent_id not in exclude]
+        if not full_team:
+            return selected, []
+
+        task_words = _words(task_config["description"])
+        others = [agent_id for agent_id in self.agent_configs if agent_id not in selected and agent_id not in exclude]
+        others.sort(key=lambda agent_id: -len(task_words & _words(
+            f"{self.agent_configs[agent_id]['role']} {self.agent_configs[agent_id]['goal']}")))
+        selected += others
+
+        if max_agents and len(selected) > max_agents:
+            return selected[:max_agents], selected[max_agents:]
+        return selected, []
+
+    def absent_summary(self, agent_ids):
+        """Summarize the roles left out of a capped crew so their perspective is still considered."""
+        lines = ["Team members not in this crew (consider their perspective in your synthesis):"]
+        for agent_id in agent_ids:
+            agent_config = self.agent_configs[agent_id]
+            lines.append(f"- {agent_config['role']}: {agent_config['goal']}")
+        return "\n".join(lines)
@@ -0,0 +1,229 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from config import BENCHMARK_CACHE_DIR, BENCHMARK_DATA_DIR, BENCHMARK_DATA_VERSION
+
+# Columns of the compiled dataset; sector, country and metric are codes into the manifest's vocabularies
+COLUMNS = ("sector", "country", "metric", "low", "high")
+
+# Country used when no country-specific value exists
+DEFAULT_COUNTRY = "GCC"
+
+_datasets = {}
+_lock = threading.Lock()
+
+def _source_digest(source_dir):
+    """Return a digest of the source files of a dataset version, so edits invalidate the compiled arrays."""
+    digest = hashlib.sha256()
+    for name in ("manifest.json", "benchmarks.csv"):
+        digest.update((source_dir / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+def _save_array(path, array):
+    """Save an array to a .npy file atomically, so concurrent workers never map a partial file."""
+    # Unique per writer, since threads of one process may compile the same dataset
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def compile_dataset(source_dir, target_dir):
+    """
+    Compile the CSV source of a dataset version into one .npy file per column plus a dense index.
+
+    Args:
+        source_dir: Directory with manifest.json and benchmarks.csv
+        target_dir: Directory to write the compiled arrays to
+    """
+    source_dir, target_dir = Path(source_dir), Path(target_dir)
+    with open(source_dir / "manifest.json", "r") as f:
+        manifest = json.load(f)
+    vocabularies = {
+        "sector": {name: code for code, name in enumerate(manifest["sectors"])},
+        "country": {name: code for code, name in enumerate(manifest["countries"])},
+        "metric": {name: code for code, name in enumerate(manifest["metrics"])}
+    }
+
+    with open(source_dir / "benchmarks.csv", "r", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    columns = {
+        "sector": np.empty(len(rows), dtype=np.int16),
+        "country": np.empty(len(rows), dtype=np.int16),
+        "metric": np.empty(len(rows), dtype=np.int16),
+        "low": np.empty(len(rows), dtype=np.float64),
+        "high": np.empty(len(rows), dtype=np.float64)
+    }
+    for i, row in enumerate(rows):
+        for column, vocabulary in vocabularies.items():
+            if row[column] not in vocabulary:
+                raise ValueError(f"Unknown {column} '{row[column]}' on line {i + 2} of {source_dir / 'benchmarks.csv'}")
+            columns[column][i] = vocabulary[row[column]]
+        columns["low"][i] = float(row["low"])
+        columns["high"][i] = float(row["high"])
+
+    # Dense (sector, country, metric) -> row index, -1 where there is no value
+    index = np.full([len(vocabularies[column]) for column in ("sector", "country", "metric")], -1, dtype=np.int32)
+    index[columns["sector"], columns["country"], columns["metric"]] = np.arange(len(rows), dtype=np.int32)
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for column in COLUMNS:
+        _save_array(target_dir / f"{column}.npy", columns[column])
+    _save_array(target_dir / "index.npy", index)
+
+class BenchmarkDataset:
+    """
+    Read-only GCC/MENA benchmarks held in columnar NumPy arrays.
+
+    Every value is a low-high range for one (sector, country, metric). The
+    arrays are memory-mapped from the compiled dataset, so all processes on
+    the machine share one copy through the page cache.
+    """
+
+    def __init__(self, manifest, arrays):
+        self.version = manifest["version"]
+        self.manifest = manifest
+        self.sectors = tuple(manifest["sectors"])
+        self.countries = tuple(manifest["countries"])
+        self.metrics = tuple(manifest["metrics"])
+        self._codes = {
+            "sector": {name: code for code, name in enumerate(self.sectors)},
+            "country": {name: code for code, name in enumerate(self.countries)},
+            "metric": {name: code for code, name in enumerate(self.metrics)}
+        }
+        self.columns = {column: arrays[column] for column in COLUMNS}
+        self.index = arrays["index"]
+
+    def __len__(self):
+        return len(self.columns["low"])
+
+    def code(self, column, name):
+        """Return the code of a sector, country or metric name."""
+        try:
+            return self._codes[column][name]
+        except KeyError:
+            raise KeyError(f"Unknown {column} '{name}' in benchmark dataset {self.version}") from None
+
+    def rows(self, sector=None, country=None, metric=None):
+        """Return the row indices matching the given sector, country and metric (any when not given)."""
+        mask = np.ones(len(self), dtype=bool)
+        for column, name in (("sector", sector), ("country", country), ("metric", metric)):
+            if name is not None:
+                mask &= self.columns[column] == self.code(column, name)
+        return np.flatnonzero(mask)
+
+    def value(self, sector, metric, country=DEFAULT_COUNTRY):
+        """
+        Return the (low, high) range of a metric, falling back to the GCC average.
+
+        Args:
+            sector: Sector ID
+            metric: Metric ID
+            country: Country code
+
+        Returns:
+            Tuple of (low, high) floats, or None if the dataset has no value
+        """
+        sector_code, metric_code = self.code("sector", sector), self.code("metric", metric)
+        row = self.index[sector_code, self.code("country", country), metric_code]
+        if row < 0 and country != DEFAULT_COUNTRY:
+            row = self.index[sector_code, self.code("country", DEFAULT_COUNTRY), metric_code]
+        if row < 0:
+            return None
+        return float(self.columns["low"][row]), float(self.columns["high"][row])
+
+    def values(self, sector, metric, countries=None):
+        """
+        Return the ranges of a metric for several countries at once.
+
+        Args:
+            sector: Sector ID
+            metric: Metric ID
+            countries: Country codes (defaults to all countries)
+
+        Returns:
+            Tuple of (low, high) arrays, NaN where the dataset has no value
+        """
+        codes = [self.code("country", country) for country in (countries or self.countries)]
+        rows = self.index[self.code("sector", sector), codes, self.code("metric", metric)]
+        low = np.where(rows >= 0, self.columns["low"][rows], np.nan)
+        high = np.where(rows >= 0, self.columns["high"][rows], np.nan)
+        return low, high
+
+    def sector_metrics(self, sector, country=DEFAULT_COUNTRY):
+        """Return the (metric, low, high) rows of a sector for one country, in file order."""
+        return [(self.metrics[self.columns["metric"][row]], float(self.columns["low"][row]), float(self.columns["high"][row]))
+                for row in self.rows(sector=sector, country=country)]
+
+    def country_values(self, sector, metric):
+        """Return the (country, low, high) rows of a metric other than the GCC average."""
+        default_code = self.code("country", DEFAULT_COUNTRY)
+        return [(self.countries[self.columns["country"][row]], float(self.columns["low"][row]), float(self.columns["high"][row]))
+                for row in self.rows(sector=sector, metric=metric) if self.columns["country"][row] != default_code]
+
+    def match_sector(self, text):
+        """Return the first sector whose keywords appear in a text, or None."""
+        text = text.lower()
+        for sector, sector_info in self.manifest["sectors"].items():
+            if any(keyword in text for keyword in sector_info["keywords"]):
+                return sector
+        return None
+
+    def label(self, column, name):
+        """Return the display label of a sector, country or metric."""
+        entry = self.manifest[{"sector": "sectors", "country": "countries", "metric": "metrics"}[column]][name]
+        return entry["label"] if isinstance(entry, dict) else entry
+
+    def format_value(self, metric, low, high):
+        """Format a range in the unit of its metric, e.g. "$25-40 per customer" or "15-20%"."""
+        metric_info = self.manifest["metrics"][metric]
+        number = "{:,.0f}" if metric_info["unit"] == "usd" else "{:g}"
+        text = number.format(low) if low == high else f"{number.format(low)}-{number.format(high)}"
+        text = {"usd": f"${text}", "percent": f"{text}%", "months": f"{text} months",
+                "weeks": f"{text} weeks"}.get(metric_info["unit"], text)
+        if metric_info.get("suffix"):
+            text += f" {metric_info['suffix']}"
+        return text
+
+def load_benchmarks(version=BENCHMARK_DATA_VERSION, data_dir=BENCHMARK_DATA_DIR, cache_dir=BENCHMARK_CACHE_DIR):
+    """
+    Load a version of the benchmark dataset, compiling it on first use.
+
+    The dataset is loaded once per process; the compiled arrays are shared
+    between processes through memory mapping.
+
+    Args:
+        version: Dataset version (a directory under data_dir)
+        data_dir: Directory of the versioned source files
+        cache_dir: Directory of the compiled arrays
+
+    Returns:
+        The BenchmarkDataset
+    """
+    # The source files ship with the code, so a relative data_dir is relative to this module
+    data_dir = Path(data_dir)
+    if not data_dir.is_absolute():
+        data_dir = Path(__file__).resolve().parent / data_dir
+    source_dir = data_dir / version
+    key = (str(source_dir.resolve()), str(Path(cache_dir).resolve()))
+    with _lock:
+        if key not in _datasets:
+            with open(source_dir / "manifest.json", "r") as f:
+                manifest = json.load(f)
+            target_dir = Path(cache_dir) / f"{version}-{_source_digest(source_dir)}"
+            if not (target_dir / "index.npy").exists():
+                compile_dataset(source_dir, target_dir)
+            arrays = {name: np.load(target_dir / f"{name}.npy", mmap_mode="r") for name in COLUMNS + ("index",)}
+            _datasets[key] = BenchmarkDataset(manifest, arrays)
+        return _datasets[key]
@@ -0,0 +1,104 @@
+"""
+Per-call latency of LLM clients with their own connections against the shared HTTP pool.
+
+Starts a local OpenAI-compatible stub that answers chat completions and
+delays every new connection by --handshake-ms to stand in for TCP and TLS
+setup to the real API. Each simulated run creates its LLM clients the way a
+workshop does (one per run, plus one per hierarchical manager) and makes
+--calls calls. Without the pool every client opens its own connections; with
+it, all clients reuse the pooled ones.
+
+Usage:
+    python benchmarks/http_pool.py --runs 20 --calls 10 --handshake-ms 40
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+COMPLETION = {
+    "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "gpt-4.1",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Final Answer: ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15}
+}
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40 ms to every kept-alive call
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        data = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handshake_seconds = 0.0
+
+    def get_request(self):
+        request = super().get_request()
+        # Every new connection pays the simulated handshake once
+        time.sleep(self.handshake_seconds)
+        return request
+
+def _time_runs(runs, calls, make_llm):
+    latencies = []
+    for _ in range(runs):
+        # A run's agents and its hierarchical manager each get a client
+        clients = [make_llm(), make_llm()]
+        for n in range(calls):
+            started = time.perf_counter()
+            clients[n % 2].call([{"role": "user", "content": f"Call {n}"}])
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Number of simulated runs")
+    parser.add_argument("--calls", type=int, default=10, help="LLM calls per run")
+    parser.add_argument("--handshake-ms", type=float, default=40.0, help="Simulated connection setup time")
+    args = parser.parse_args()
+
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    server.handshake_seconds = args.handshake_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    from crewai import LLM
+    from http_pool import HTTPPool
+
+    pool = HTTPPool()
+
+    def own_connections():
+        return LLM(model="gpt-4.1", temperature=0.2, api_key="stub")
+
+    def pooled():
+        return pool.attach(LLM(model="gpt-4.1", temperature=0.2, api_key="stub"))
+
+    own_mean, own_p95 = _time_runs(args.runs, args.calls, own_connections)
+    pooled_mean, pooled_p95 = _time_runs(args.runs, args.calls, pooled)
+    stats = pool.snapshot()
+    server.shutdown()
+
+    print(f"Calls:                   {args.runs * args.calls:,} ({args.handshake_ms:.0f} ms simulated handshake)")
+    print(f"Own connections:         {own_mean * 1000:.1f} ms mean, {own_p95 * 1000:.1f} ms p95")
+    print(f"Shared pool:             {pooled_mean * 1000:.1f} ms mean, {pooled_p95 * 1000:.1f} ms p95")
+    print(f"Pool connections:        {stats['connections_opened']} opened, {stats['connections_reused']} reused")
+
+if __name__ == "__main__":
+    main()
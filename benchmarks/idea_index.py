@@ -0,0 +1,83 @@
+"""
+Lookup time of the near-duplicate idea index with many past runs.
+
+Fills a fresh index with synthetic venture ideas, then times find_similar for
+rephrasings of ideas in the index (which must be found) and for unrelated
+ideas, and compares the LSH lookup with a full scan of every stored idea.
+
+Usage:
+    python benchmarks/idea_index.py --ideas 50000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODELS = ["B2B SaaS", "marketplace", "subscription app", "on-demand service", "platform", "API", "agency", "kiosk network"]
+CUSTOMERS = ["clinics", "restaurants", "schools", "logistics firms", "freelancers", "retailers", "families", "gyms",
+             "real estate brokers", "pharmacies", "salons", "car workshops", "event organisers", "tutors"]
+PURPOSES = ["bookings", "payroll", "inventory", "loyalty", "deliveries", "compliance", "hiring", "financing",
+            "marketing", "procurement", "scheduling", "invoicing", "training", "maintenance"]
+PLACES = ["GCC", "UAE", "Saudi Arabia", "Qatar", "Kuwait", "Bahrain", "Oman", "Riyadh", "Dubai", "Jeddah"]
+EXTRAS = ["with Arabic support", "powered by AI", "with WhatsApp integration", "with Islamic financing",
+          "for SMEs", "with offline mode", "with government API integration", "for women-owned businesses"]
+
+def _idea(rng):
+    parts = [rng.choice(MODELS), "for", rng.choice(CUSTOMERS), "to manage", rng.choice(PURPOSES), "in", rng.choice(PLACES)]
+    return " ".join(parts + rng.sample(EXTRAS, rng.randint(0, 2)) + [f"variant {rng.randrange(10**6)}"])
+
+def _rephrase(idea):
+    # Same words in a different order and case, as a user retyping the idea would
+    words = idea.split()
+    return " ".join(words[3:] + words[:3]).upper()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=50000, help="Number of past runs in the index")
+    parser.add_argument("--lookups", type=int, default=200, help="Number of lookups of each kind")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the ideas")
+    args = parser.parse_args()
+
+    from idea_index import IdeaIndex, idea_tokens, jaccard
+
+    rng = random.Random(args.seed)
+    ideas = [_idea(rng) for _ in range(args.ideas)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = IdeaIndex(Path(directory) / "idea_index.sqlite3")
+        started = time.perf_counter()
+        index.add_many((f"run-{n}", idea, None, None) for n, idea in enumerate(ideas))
+        fill_seconds = time.perf_counter() - started
+
+        known = [(n, _rephrase(ideas[n])) for n in rng.sample(range(args.ideas), args.lookups)]
+        started = time.perf_counter()
+        found = sum(1 for n, idea in known if any(match["run_id"] == f"run-{n}" for match in index.find_similar(idea)))
+        known_seconds = time.perf_counter() - started
+
+        unrelated = [f"Desalination membranes for farms number {n}" for n in range(args.lookups)]
+        started = time.perf_counter()
+        false_matches = sum(len(index.find_similar(idea)) for idea in unrelated)
+        unrelated_seconds = time.perf_counter() - started
+
+        stored = [idea_tokens(idea) for idea in ideas]
+        started = time.perf_counter()
+        for _, idea in known[:10]:
+            tokens = idea_tokens(idea)
+            [jaccard(tokens, other) for other in stored]
+        scan_seconds = (time.perf_counter() - started) / 10
+
+    lookup_seconds = known_seconds / args.lookups
+    print(f"Past runs:                 {args.ideas:,}")
+    print(f"Index fill:                {fill_seconds:.1f} s")
+    print(f"Lookup, near duplicate:    {lookup_seconds * 1000:.1f} ms ({found} of {args.lookups} found)")
+    print(f"Lookup, unrelated:         {unrelated_seconds / args.lookups * 1000:.1f} ms ({false_matches} matches)")
+    print(f"Full scan (no index):      {scan_seconds * 1000:.1f} ms ({scan_seconds / lookup_seconds:.1f}x)")
+    if found < args.lookups or lookup_seconds >= 1:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Retrieval time and prompt size of the cross-run knowledge store with many facts.
+
+Fills a fresh store with synthetic facts of the kind agents state (metric
+ranges per sector and country), then times the per-task lookups a workshop
+makes and reports the size of the context they inject, which stays within
+the configured max_facts and max_chars however large the store grows.
+
+Usage:
+    python benchmarks/knowledge_store.py --facts 20000
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SECTORS = ["fintech", "e_commerce", "saas", "healthcare", "education", "food_delivery", "logistics", "gaming"]
+COUNTRIES = [("AE", "the UAE"), ("SA", "Saudi Arabia"), ("QA", "Qatar"), ("KW", "Kuwait"), (None, "the GCC")]
+METRICS = ["Customer acquisition cost", "Trial-to-paid conversion", "Monthly churn", "Average order value",
+           "Gross margin", "Payback period", "Annual contract value", "Take rate"]
+TASKS = ["venture definition", "revenue estimation", "expense estimation", "validation strategy"]
+
+def _fact(rng, sector, country):
+    low = rng.randint(2, 80)
+    unit = "%" if rng.random() < 0.5 else ""
+    value = f"{low}-{low + rng.randint(1, 20)}{unit}" if unit else f"${low}-{low + rng.randint(5, 60)}"
+    return f"{rng.choice(METRICS)} for {sector.replace('_', ' ')} ventures in {country} is {value} (sample {rng.randrange(10**6)})."
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--facts", type=int, default=20000, help="Number of facts in the store")
+    parser.add_argument("--lookups", type=int, default=200, help="Number of lookups")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the facts")
+    args = parser.parse_args()
+
+    from knowledge_store import DEFAULT_KNOWLEDGE, KnowledgeStore, format_facts
+
+    rng = random.Random(args.seed)
+    facts = []
+    for _ in range(args.facts):
+        sector = rng.choice(SECTORS)
+        code, country = rng.choice(COUNTRIES)
+        facts.append((_fact(rng, sector, country), sector, code))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = KnowledgeStore(Path(directory) / "knowledge.sqlite3")
+        started = time.perf_counter()
+        for n in range(0, len(facts), 1000):
+            store.add_facts(facts[n:n + 1000], run_id=f"run-{n // 1000}")
+        fill_seconds = time.perf_counter() - started
+
+        timings, sizes, found = [], [], 0
+        for _ in range(args.lookups):
+            sector = rng.choice(SECTORS)
+            query = f"{sector.replace('_', ' ')} app for freelancers in {rng.choice(COUNTRIES)[1]} {rng.choice(TASKS)}"
+            started = time.perf_counter()
+            results = store.search(query, sector=sector)
+            timings.append(time.perf_counter() - started)
+            found += bool(results)
+            sizes.append(len(format_facts(results)) if results else 0)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"Stored facts:              {args.facts:,}")
+    print(f"Store fill:                {fill_seconds:.1f} s")
+    print(f"Lookup, median:            {statistics.median(timings) * 1000:.2f} ms")
+    print(f"Lookup, p95:               {p95 * 1000:.2f} ms")
+    print(f"Lookups with facts:        {found} of {args.lookups}")
+    print(f"Injected context, max:     {max(sizes):,} chars (limit {DEFAULT_KNOWLEDGE['max_chars']:,} "
+          f"+ formatting, {DEFAULT_KNOWLEDGE['max_facts']} facts)")
+    if found < args.lookups or p95 >= 0.1:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Peak RSS of report rendering with large task outputs.
+
+Renders the progress reports after every step and the final report for a
+workshop with large synthetic task outputs, once the way the workshop did
+before outputs were stored on disk (all outputs held and concatenated in
+memory) and once with the OutputStore and streamed rendering. Each mode runs
+in its own process so the peak RSS figures do not affect each other.
+
+Usage:
+    python benchmarks/output_memory.py --tasks 8 --size-mb 16
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def _synthetic_output(step, size_bytes):
+    line = f"| Stream {step} | Conservative GCC/MENA estimate | $12,500 | 4.5% | 6 months |\n"
+    body = line * (size_bytes // len(line))
+    return f"# Outcome\n\nStep {step} recommendation.\n\n{body}\n# Collaboration Summary\n\nAll agents agreed.\n"
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _legacy_run(tasks, size_bytes, directory):
+    """The in-memory rendering used before task outputs were stored on disk."""
+    from utils import format_workshop_output
+
+    completed_tasks = {}
+    for step in range(1, tasks + 1):
+        completed_tasks[f"Step {step}"] = _synthetic_output(step, size_bytes)
+
+        progress_report = "# GCC/MENA Venture Monetization Workshop - Progress Report\n\n## Completed Steps\n\n"
+        for i, (task_name, task_output) in enumerate(completed_tasks.items(), 1):
+            outcome = task_output.split("# Outcome")[1].split("# Collaboration Summary")[0].strip()
+            progress_report += f"### Step {i}: {task_name}\n\n#### Outcome\n{outcome}\n\n"
+        progress_report += "## Detailed Explanations\n\n"
+        for i, (task_name, task_output) in enumerate(completed_tasks.items(), 1):
+            progress_report += f"### Step {i}: {task_name} - Details\n\n{task_output}\n\n"
+        with open(os.path.join(directory, "progress.md"), "w") as f:
+            f.write(progress_report)
+
+    formatted_result = format_workshop_output("\n\n".join(completed_tasks.values()))
+    with open(os.path.join(directory, "final.md"), "w") as f:
+        f.write(formatted_result)
+
+def _stored_run(tasks, size_bytes, directory):
+    """The OutputStore and streamed rendering used by WorkshopRun."""
+    from output_store import OutputStore
+    from utils import atomic_writer, iter_workshop_output
+    from workshop_record import WorkshopRecord
+
+    store = OutputStore(os.path.join(directory, "outputs"))
+    record = WorkshopRecord("Synthetic venture")
+    for step in range(1, tasks + 1):
+        output = store.put(f"{step:02d}", _synthetic_output(step, size_bytes))
+        record.add_task(f"step_{step}", f"Step {step}", "Benchmark Agent", output)
+        with atomic_writer(os.path.join(directory, "progress.md")) as f:
+            f.writelines(record.iter_progress_report(tasks))
+
+    with atomic_writer(os.path.join(directory, "final.md")) as f:
+        f.writelines(iter_workshop_output(documentation=record.iter_documentation(), summary=record.summary()))
+
+def _measure(mode, tasks, size_bytes, results):
+    # Import the rendering modules before taking the baseline
+    import output_store, utils, workshop_record  # noqa: F401
+
+    baseline = _peak_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        (_legacy_run if mode == "legacy" else _stored_run)(tasks, size_bytes, directory)
+    results[mode] = (baseline, _peak_rss_mb())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak RSS of in-memory and streamed report rendering.")
+    parser.add_argument("--tasks", type=int, default=8, help="Number of workshop steps")
+    parser.add_argument("--size-mb", type=float, default=16, help="Size of each synthetic task output in MB")
+    args = parser.parse_args()
+
+    size_bytes = int(args.size_mb * 1024 * 1024)
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for mode in ("legacy", "stored"):
+        process = context.Process(target=_measure, args=(mode, args.tasks, size_bytes, results))
+        process.start()
+        process.join()
+
+    print(f"{args.tasks} steps with {args.size_mb:g} MB outputs")
+    for mode in ("legacy", "stored"):
+        baseline, peak = results[mode]
+        print(f"  {mode:<7} peak RSS {peak:8.1f} MB (+{peak - baseline:.1f} MB over baseline)")
+
+if __name__ == "__main__":
+    main()
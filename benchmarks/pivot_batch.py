@@ -0,0 +1,74 @@
+"""
+Throughput of the pivot rule engine on many streams.
+
+Generates synthetic stream descriptions from the rule keywords, evaluates them
+against one original description with pivot_analysis_tool once per stream and
+with a single PivotRules.evaluate call, checks that both find the same pivots,
+and times the ranking and the pairwise distance matrix.
+
+Usage:
+    python benchmarks/pivot_batch.py --streams 5000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ORIGINAL = "A B2C subscription app for GCC consumers sold direct through the app stores"
+FILLER = ["tier", "for", "clinics", "retailers", "with", "bundled", "pricing", "offering", "program"]
+
+def _descriptions(keywords, count, seed):
+    rng = random.Random(seed)
+    descriptions = []
+    for _ in range(count):
+        words = rng.sample(keywords, rng.randint(0, 4)) + rng.sample(FILLER, rng.randint(2, 5))
+        rng.shuffle(words)
+        descriptions.append(" ".join(words).capitalize())
+    return descriptions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--streams", type=int, default=5000, help="Number of synthetic streams")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the descriptions")
+    args = parser.parse_args()
+
+    from pivot_engine import load_pivot_rules
+    from tools import pivot_analysis_tool
+
+    rules = load_pivot_rules()
+    descriptions = _descriptions(rules.keywords, args.streams, args.seed)
+
+    started = time.perf_counter()
+    single = [json.loads(pivot_analysis_tool.func(json.dumps({"original_description": ORIGINAL,
+                                                              "stream_description": description})))
+              for description in descriptions]
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = rules.evaluate(ORIGINAL, descriptions)
+    evaluate_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results.ranking()
+    ranking_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    distances = results.distance_matrix()
+    matrix_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for i, analysis in enumerate(single) if analysis["pivot_dimensions"] != results.dimensions(i))
+    print(f"Streams:                  {args.streams:,}")
+    print(f"One tool call per stream: {single_seconds:.3f} s")
+    print(f"Batch evaluation:         {evaluate_seconds:.3f} s ({single_seconds / evaluate_seconds:.1f}x)")
+    print(f"Ranking:                  {ranking_seconds:.4f} s")
+    print(f"Distance matrix:          {matrix_seconds:.3f} s ({distances.nbytes / 2**20:.0f} MB)")
+    print(f"Mismatching results:      {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
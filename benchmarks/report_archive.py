@@ -0,0 +1,118 @@
+"""
+Storage size and write throughput of the report archive against one file per report.
+
+Generates synthetic workshop runs whose progress reports grow step by step
+like the real ones, writes every report once as a markdown file and once
+into a report archive per available codec, and compares the bytes on disk,
+the write throughput (one transaction per report as a workshop writes
+them, and per run as the migration does) and the time to reconstruct a
+report.
+
+Usage:
+    python benchmarks/report_archive.py --runs 200 --steps 9
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = ("revenue subscription clinics GCC UAE Saudi validation budget churn conversion pricing tier enterprise "
+         "marketplace commission onboarding retention pilot partners payback margin acquisition channel Arabic "
+         "compliance licensing integration analytics forecast customers monthly annual segment launch").split()
+
+def _paragraph(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return f"{text.capitalize()}. CAC ${rng.randint(10, 90)}-{rng.randint(91, 200)}, conversion {rng.randint(1, 9)}%."
+
+def _run_reports(rng, run, steps):
+    """Return the progress reports of one synthetic run, followed by its final report."""
+    outcomes = ["\n\n".join(_paragraph(rng, rng.randint(60, 140)) for _ in range(rng.randint(3, 8)))
+                for _ in range(steps)]
+    reports = []
+    for step in range(1, steps + 1):
+        parts = [f"# Workshop - Progress Report\n\n## Venture Idea\n\nVenture {run}\n\n"
+                 f"## Progress: {step} of {steps} steps completed\n\n## Cost Summary\n\n"
+                 f"- **Total Cost**: ${step * 0.04:.4f}\n\n## Completed Steps\n\n"]
+        for n in range(step):
+            parts.append(f"### Step {n + 1}: Task {n + 1}\n\n#### Outcome\n{outcomes[n][:400]}\n\n"
+                         f"#### Task Metrics\n- **Cost**: $0.04\n\n[View detailed explanation](#step-{n + 1}-details)\n\n")
+        parts.append("## Detailed Explanations\n\n")
+        for n in range(step):
+            parts.append(f"<a id='step-{n + 1}-details'></a>\n### Step {n + 1}: Task {n + 1} - Details\n\n{outcomes[n]}\n\n")
+        reports.append((step, "".join(parts)))
+    reports.append((None, "# Workshop Results\n\n" + "\n\n".join(outcomes) + "\n"))
+    return reports
+
+def _disk_bytes(paths):
+    # Allocated blocks, which is what many small files really cost
+    return sum(os.stat(path).st_blocks * 512 for path in paths)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="Number of workshop runs")
+    parser.add_argument("--steps", type=int, default=9, help="Steps per run")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the reports")
+    args = parser.parse_args()
+
+    from report_archive import ReportArchive, _zstd
+
+    rng = random.Random(args.seed)
+    runs = [(f"run-{run}", _run_reports(rng, run, args.steps)) for run in range(args.runs)]
+    logical = sum(len(text.encode("utf-8")) for _, reports in runs for _, text in reports)
+    print(f"Runs: {args.runs:,} with {args.steps} steps, {logical / 1e6:.1f} MB of reports\n")
+    print(f"{'Storage':<16} {'On disk':>12} {'Ratio':>7} {'Write MB/s':>11} {'Read ms':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        files_dir = Path(directory) / "files"
+        files_dir.mkdir()
+        started = time.perf_counter()
+        paths = []
+        for run_id, reports in runs:
+            for step, text in reports:
+                name = f"workshop_progress_{run_id}_step{step}.md" if step else f"workshop_final_{run_id}.md"
+                paths.append(files_dir / name)
+                paths[-1].write_text(text, encoding="utf-8")
+        seconds = time.perf_counter() - started
+        files_bytes = _disk_bytes(paths)
+        print(f"{'files':<16} {files_bytes / 1e6:>9.2f} MB {1.0:>6.1f}x {logical / 1e6 / seconds:>11.1f} {'-':>8}")
+
+        failed = False
+        for codec in [codec for codec in ("zstd", "gzip") if codec != "zstd" or _zstd is not None]:
+            path = Path(directory) / f"archive_{codec}.sqlite3"
+            archive = ReportArchive(path, codec=codec)
+            started = time.perf_counter()
+            for run_id, reports in runs:
+                for step, text in reports:
+                    archive.put(run_id, text, step=step)
+            seconds = time.perf_counter() - started
+            with sqlite3.connect(path) as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            archive_bytes = _disk_bytes([path] + list(path.parent.glob(f"{path.name}-*")))
+
+            samples = [(run_id, rng.choice(reports)) for run_id, reports in rng.sample(runs, min(50, len(runs)))]
+            started = time.perf_counter()
+            failed |= any(archive.read(run_id, step) != text for run_id, (step, text) in samples)
+            read_ms = (time.perf_counter() - started) / len(samples) * 1000
+            print(f"{'archive (' + codec + ')':<16} {archive_bytes / 1e6:>9.2f} MB {files_bytes / archive_bytes:>6.1f}x "
+                  f"{logical / 1e6 / seconds:>11.1f} {read_ms:>8.2f}")
+
+            # Migration stores each run's reports in one transaction
+            archive = ReportArchive(Path(directory) / f"migrated_{codec}.sqlite3", codec=codec)
+            started = time.perf_counter()
+            for run_id, reports in runs:
+                archive.put_many((run_id, text, step) for step, text in reports)
+            seconds = time.perf_counter() - started
+            print(f"{'  per run':<16} {'':>12} {'':>7} {logical / 1e6 / seconds:>11.1f} {'':>8}")
+
+    if failed:
+        print("\nA reconstructed report differs from the original")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
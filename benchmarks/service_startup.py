@@ -0,0 +1,82 @@
+"""
+Per-run startup overhead of a one-shot process against the warm workshop service.
+
+A one-shot run starts a Python process that imports crewai, loads the
+environment, creates the LLM client and parses the configuration before it
+can set up the run's agents and tasks. In the workshop service only the run
+setup is left. This times both without making any LLM call: the cold case as
+a fresh process up to a constructed run, the warm case as the same run setup
+repeated in a process warmed up like the service.
+
+Usage:
+    python benchmarks/service_startup.py --runs 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SETUP = """
+import sys
+sys.path.insert(0, {root!r})
+from metering import RunMeter
+from config import OPENAI_MODEL
+import venture_workshop
+run = venture_workshop.WorkshopRun("Benchmark venture idea", {config!r}, {run_id!r}, venture_workshop.llm,
+                                   RunMeter(OPENAI_MODEL), lambda *args, **kwargs: None)
+run.close()
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Number of warm run setups")
+    parser.add_argument("--cold-runs", type=int, default=3, help="Number of one-shot processes")
+    parser.add_argument("--config", default=str(ROOT / "workshop_config.json"), help="Workshop configuration")
+    args = parser.parse_args()
+
+    # No LLM call is made, so any key will do
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark"),
+           "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+    os.environ.update(env)
+
+    cold = []
+    for n in range(args.cold_runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", SETUP.format(root=str(ROOT), config=args.config, run_id=f"bench_cold_{n}")],
+                       env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        cold.append(time.perf_counter() - started)
+
+    from workshop_service import WorkshopService
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        WorkshopService().warm([args.config])
+        warm_up_seconds = time.perf_counter() - started
+
+        import venture_workshop
+        from config import OPENAI_MODEL
+        from metering import RunMeter
+
+        warm = []
+        for n in range(args.runs):
+            started = time.perf_counter()
+            run = venture_workshop.WorkshopRun("Benchmark venture idea", args.config, f"bench_warm_{n}",
+                                               venture_workshop.llm, RunMeter(OPENAI_MODEL), lambda *a, **k: None)
+            warm.append(time.perf_counter() - started)
+            run.close()
+
+    cold_seconds = sorted(cold)[len(cold) // 2]
+    warm_seconds = sorted(warm)[len(warm) // 2]
+    print(f"One-shot process, median:   {cold_seconds * 1000:.0f} ms")
+    print(f"Service warm-up (once):     {warm_up_seconds * 1000:.0f} ms")
+    print(f"Warm run setup, median:     {warm_seconds * 1000:.1f} ms ({cold_seconds / warm_seconds:.0f}x less)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Throughput of the batch technical estimator against one tool call per stream.
+
+Generates synthetic stream descriptions from the complexity vocabulary, runs
+technical_assessment_tool once per description and technical_assessment_tool_batch
+once over all of them, checks that both give identical results and prints the
+time of each. The numeric estimate alone (without formatting) is timed too.
+
+Usage:
+    python benchmarks/technical_batch.py --streams 10000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FILLER = ["GCC", "SMEs", "premium", "tier", "for", "clinics", "retailers", "with", "local", "bundled", "pricing"]
+
+def _descriptions(count, seed):
+    from technical_estimator import COMPLEXITY_FACTORS
+
+    rng = random.Random(seed)
+    vocabulary = list(COMPLEXITY_FACTORS)
+    descriptions = []
+    for _ in range(count):
+        words = rng.sample(vocabulary, rng.randint(0, 5)) + rng.sample(FILLER, rng.randint(2, 6))
+        rng.shuffle(words)
+        text = " ".join(words)
+        descriptions.append(text.upper() if rng.random() < 0.1 else text.capitalize())
+    return descriptions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--streams", type=int, default=10000, help="Number of synthetic streams")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the descriptions")
+    args = parser.parse_args()
+
+    from technical_estimator import estimate_technical
+    from tools import technical_assessment_tool, technical_assessment_tool_batch
+
+    descriptions = _descriptions(args.streams, args.seed)
+    technical_assessment_tool.func(descriptions[0])  # Load the benchmark dataset outside the timings
+
+    started = time.perf_counter()
+    single = [technical_assessment_tool.func(description) for description in descriptions]
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = technical_assessment_tool_batch(descriptions)
+    batch_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    estimate_technical(descriptions)
+    numeric_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(single, batch) if a != b)
+    print(f"Streams:              {args.streams:,}")
+    print(f"One call per stream:  {single_seconds:.3f} s")
+    print(f"Batch, formatted:     {batch_seconds:.3f} s ({single_seconds / batch_seconds:.1f}x)")
+    print(f"Batch, numeric only:  {numeric_seconds:.3f} s ({single_seconds / numeric_seconds:.1f}x)")
+    print(f"Mismatching results:  {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
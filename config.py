@@ -25,3 +25,56 @@ WORKSHOP_STEPS = [
 
 # Agent Configuration
 AGENT_TEMPERATURE = 0.2  # Lower temperature for more conservative estimates
+
+# Concurrency and shared state
+MAX_CONCURRENT_WORKSHOPS = 4  # Workshops allowed to run at the same time on this machine
+RUN_REGISTRY_PATH = "cache/run_registry.sqlite3"  # Registry of queued, running and finished runs
+RESPONSE_CACHE_PATH = "cache/llm_responses.sqlite3"  # On-disk LLM response cache shared between processes
+OUTPUT_STORE_DIR = "cache/outputs"  # Task outputs of running workshops, streamed into the reports
+IDEA_INDEX_PATH = "cache/idea_index.sqlite3"  # Past venture ideas and their early-stage outputs, for reuse
+TASK_RESULTS_PATH = "cache/task_results.sqlite3"  # Task outputs by input fingerprint, for incremental re-runs
+VARIANTS_DIR = "cache/variants"  # Task results shared by the variants of one multi-variant run
+DELEGATION_PLANS_PATH = "cache/delegation_plans.sqlite3"  # Hierarchical managers' delegation plans per task, for replay
+
+# Cross-run knowledge store ("knowledge" in the workshop configuration)
+KNOWLEDGE_STORE_PATH = "cache/knowledge.sqlite3"  # Facts and figures recorded from earlier workshops
+KNOWLEDGE_MAX_STORED_FACTS = 20000  # Facts kept at most; the least recently used are evicted first
+KNOWLEDGE_FACTS_PER_TASK = 12  # Facts recorded at most from one task's outcome
+
+# Report archive (--archive-reports)
+REPORT_ARCHIVE = False  # Store progress reports in the archive instead of one file per step
+REPORT_ARCHIVE_PATH = "reports/archive.sqlite3"  # Compressed, deduplicated chunks of all archived reports
+REPORT_ARCHIVE_CHUNK_CHARS = 16384  # Sections longer than this are split into several chunks
+
+# Profiling of a run's phases (--profile)
+PROFILE_DIR = "reports/profiles"  # Per-phase profiles and allocation sites, in a directory per run
+PROFILE_TOP_ENTRIES = 25  # Functions and allocation sites listed per phase
+
+# Benchmark dataset used by the tools
+BENCHMARK_DATA_DIR = "data/benchmarks"  # Versioned source files, relative to the code
+BENCHMARK_DATA_VERSION = "v1"  # Dataset version the tools read
+BENCHMARK_CACHE_DIR = "cache/benchmarks"  # Compiled, memory-mapped arrays of each dataset version
+PIVOT_RULES_PATH = "data/pivot_rules.json"  # Pivot dimension rules of pivot_analysis_tool, relative to the code
+
+# Metrics of running workshops (opt-in)
+METRICS_HOST = "127.0.0.1"  # Interface the metrics endpoint listens on
+METRICS_PORT = 9464  # Default port of the metrics endpoint
+METRICS_SNAPSHOT_PATH = "cache/metrics.json"  # Default file of the periodic JSON snapshot
+METRICS_SNAPSHOT_INTERVAL = 15  # Seconds between JSON snapshots
+
+# Long-running workshop service
+SERVICE_HOST = "127.0.0.1"  # Interface the service listens on
+SERVICE_PORT = 8470  # Default port of the service
+SERVICE_RETAINED_RUNS = 200  # Finished runs whose status and events the service keeps in memory
+
+# Scheduling of queued workshops across tenants
+SCHEDULER_TENANT_WEIGHTS = {}  # Share of each tenant, e.g. {"acme": 2}; unlisted tenants weigh 1
+SCHEDULER_LLM_CALLS_PER_MINUTE = None  # Global LLM call budget shared fairly by the tenants (None for no limit)
+SCHEDULER_DEFAULT_EXPECTED_SECONDS = 900  # Expected duration of a run of a configuration without history
+
+# HTTP connection pool shared by all LLM clients of a process
+HTTP_POOL_ENABLED = True  # Route every LLM client through the shared keep-alive pool
+HTTP_POOL_MAX_CONNECTIONS = 20  # Open connections at most (all LLM calls go to the same API host)
+HTTP_POOL_MAX_KEEPALIVE = 10  # Idle connections kept open for reuse
+HTTP_POOL_KEEPALIVE_EXPIRY = 60  # Seconds an idle connection is kept open
+HTTP_POOL_HTTP2 = False  # Multiplex requests over HTTP/2 (needs httpx[http2])
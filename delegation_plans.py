@@ -0,0 +1,202 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import DELEGATION_PLANS_PATH
+
+DEFAULT_DELEGATION_PLANS = {
+    "enabled": False,
+    "replay": True,
+    "max_failures": 2
+}
+
+# The hierarchical manager's delegation tools, by the names tool events carry, and the plan actions they map to
+DELEGATION_TOOLS = {"delegate_work_to_coworker": "delegate", "ask_question_to_coworker": "ask"}
+
+# Expected output of an "ask" step, which contributes to the task rather than completing it
+ASK_EXPECTED_OUTPUT = "Your input on the task from the perspective of your role, accounting for the context shared."
+
+def config_hash(config):
+    """Return a hash of the parts of a configuration that shape the manager's delegations."""
+    fields = {key: config.get(key) for key in ("agents", "tasks", "negotiation_instructions", "output_schemas", "roster", "historian")}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _coworker(tool_args):
+    if isinstance(tool_args, str):
+        try:
+            tool_args = json.loads(tool_args)
+        except json.JSONDecodeError:
+            return None
+    coworker = tool_args.get("coworker") or tool_args.get("co_worker") if isinstance(tool_args, dict) else None
+    if isinstance(coworker, str) and coworker.startswith("[") and coworker.endswith("]"):
+        # Some models pass a list of roles; the delegation tools use the first one
+        coworker = coworker[1:-1].split(",")[0]
+    return " ".join(coworker.replace('"', "").split()) if isinstance(coworker, str) else None
+
+class DelegationRecorder:
+    """
+    Records the delegations the hierarchical manager makes while executing one task.
+
+    The manager's tool calls are observed on crewai's event bus, keeping only
+    the delegation tool calls made for the given task; the coworkers' own tool
+    calls belong to the tasks delegated to them and are ignored.
+    """
+
+    def __init__(self, task):
+        self.task_id = str(task.id)
+        self.steps = []
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def _on_tool_used(self, source, event):
+        action = DELEGATION_TOOLS.get("_".join(event.tool_name.lower().split()))
+        if event.task_id != self.task_id or action is None:
+            return
+        coworker = _coworker(event.tool_args)
+        if coworker:
+            with self._lock:
+                self._calls.append((event.started_at, action, coworker))
+
+    @contextmanager
+    def recording(self):
+        """Record the manager's delegations made within the block into steps."""
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+
+        crewai_event_bus.on(ToolUsageFinishedEvent)(self._on_tool_used)
+        try:
+            yield self
+        finally:
+            # Handlers run on the event bus's threads; wait for the ones still pending
+            crewai_event_bus.flush(timeout=5.0)
+            crewai_event_bus.off(ToolUsageFinishedEvent, self._on_tool_used)
+            with self._lock:
+                self.steps = [{"action": action, "coworker": coworker}
+                              for _, action, coworker in sorted(self._calls, key=lambda call: call[0])]
+
+def replay_delegations(steps, task, agents_by_role):
+    """
+    Execute a recorded delegation plan without the manager.
+
+    Each step gives the task to its coworker directly, as the manager's
+    delegation tools would: a "delegate" step asks for the task's expected
+    output, an "ask" step for the coworker's input. The results of earlier
+    steps are passed on as context, and the last delegated result is the
+    task's output.
+
+    Args:
+        steps: The plan's steps, dictionaries with action and coworker
+        task: The task to execute
+        agents_by_role: Dictionary of lowercase role to agent
+
+    Returns:
+        The task's output
+
+    Raises:
+        ValueError: If a coworker is not part of the task's crew or a step produced no output
+    """
+    from crewai import Task
+
+    results, output = [], None
+    for step in steps:
+        agent = agents_by_role.get(step["coworker"].casefold())
+        if agent is None:
+            raise ValueError(f"The plan delegates to '{step['coworker']}', who is not part of the task's crew")
+        delegated = Task(description=task.description, agent=agent,
+                         expected_output=task.expected_output if step["action"] == "delegate" else ASK_EXPECTED_OUTPUT)
+        result = str(agent.execute_task(delegated, "\n\n".join(results) or None) or "").strip()
+        if not result:
+            raise ValueError(f"{agent.role} returned no output")
+        results.append(f"{agent.role}:\n{result}")
+        if step["action"] == "delegate":
+            output = result
+    if output is None:
+        if not results:
+            raise ValueError("The plan has no steps")
+        output = results[-1].split("\n", 1)[1]
+    return output
+
+class DelegationPlanStore:
+    """
+    On-disk store of the hierarchical manager's delegation plans.
+
+    A plan is the ordered list of delegations (coworker and delegate or ask)
+    the manager made for a task, kept per configuration hash and task ID with
+    the number of manager turns the task took when it was recorded.
+    """
+
+    def __init__(self, path=DELEGATION_PLANS_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS delegation_plans ("
+                "config_hash TEXT NOT NULL, task_id TEXT NOT NULL, steps TEXT NOT NULL, manager_turns INTEGER NOT NULL, "
+                "run_id TEXT, recorded_at REAL NOT NULL, replays INTEGER NOT NULL DEFAULT 0, "
+                "failures INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (config_hash, task_id))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, config_hash, task_id):
+        """
+        Look up the plan of a task.
+
+        Returns:
+            Dictionary with steps, manager_turns, run_id, replays and failures, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT steps, manager_turns, run_id, replays, failures FROM delegation_plans "
+                "WHERE config_hash = ? AND task_id = ?",
+                (config_hash, task_id)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"steps": json.loads(row[0]), "manager_turns": row[1], "run_id": row[2], "replays": row[3],
+                "failures": row[4]}
+
+    def put(self, config_hash, task_id, steps, manager_turns, run_id=None):
+        """Store the plan of a task, keeping the failure count if the plan is unchanged."""
+        encoded = json.dumps(steps)
+        with self._connect() as conn:
+            row = conn.execute("SELECT steps, failures FROM delegation_plans WHERE config_hash = ? AND task_id = ?",
+                               (config_hash, task_id)).fetchone()
+            failures = row[1] if row and row[0] == encoded else 0
+            conn.execute(
+                "INSERT OR REPLACE INTO delegation_plans "
+                "(config_hash, task_id, steps, manager_turns, run_id, recorded_at, failures) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (config_hash, task_id, encoded, manager_turns, run_id, time.time(), failures)
+            )
+
+    def record_replay(self, config_hash, task_id, succeeded, max_failures=DEFAULT_DELEGATION_PLANS["max_failures"]):
+        """
+        Count a replay of a plan; a plan that failed max_failures times is dropped.
+
+        Returns:
+            True if the plan was dropped
+        """
+        with self._connect() as conn:
+            if succeeded:
+                conn.execute("UPDATE delegation_plans SET replays = replays + 1 WHERE config_hash = ? AND task_id = ?",
+                             (config_hash, task_id))
+                return False
+            conn.execute("UPDATE delegation_plans SET failures = failures + 1 WHERE config_hash = ? AND task_id = ?",
+                         (config_hash, task_id))
+            return conn.execute(
+                "DELETE FROM delegation_plans WHERE config_hash = ? AND task_id = ? AND failures >= ?",
+                (config_hash, task_id, max_failures)
+            ).rowcount > 0
@@ -1,24 +1,32 @@
 # This file is kept for backward compatibility
-# The historian agent is now defined in the workshop_config.json file
-# and loaded by the create_agents function in agents.py
+# The historian agent is now defined in the workshop_config.json file.
+# Workshop documentation is built by the WorkshopRecord aggregator in
+# workshop_record.py, so the agent no longer takes part in workshop runs.
+
+import json
 
 from config import OPENAI_MODEL, AGENT_TEMPERATURE
 
-def create_historian_agent(llm):
+def create_historian_agent(llm, config_file="workshop_config.json"):
     """
     Create a Workshop Historian agent responsible for documenting the entire workshop process.
     This function is kept for backward compatibility.
 
     Args:
         llm: The language model to use
+        config_file: Path to the JSON configuration file
 
     Returns:
-        The Workshop Historian agent from the agents dictionary
+        The Workshop Historian agent defined in the configuration file
     """
-    from agents import create_agents
+    from agents import create_agent
+
+    with open(config_file, "r") as f:
+        config = json.load(f)
 
-    # Create all agents from the config file
-    agents = create_agents(llm)
+    # Only build the historian rather than every agent in the config
+    for agent_config in config["agents"]:
+        if agent_config["id"] == "historian":
+            return create_agent(agent_config, llm)
 
-    # Return the historian agent
-    return agents["historian"]
+    raise KeyError(f"No agent with id 'historian' in {config_file}")
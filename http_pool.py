@@ -0,0 +1,186 @@
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+import httpx
+
+from config import HTTP_POOL_ENABLED, HTTP_POOL_HTTP2, HTTP_POOL_KEEPALIVE_EXPIRY, HTTP_POOL_MAX_CONNECTIONS, \
+    HTTP_POOL_MAX_KEEPALIVE
+
+_shared_pool = None
+_lock = threading.Lock()
+
+class _PoolStats:
+    """Request and connection counters shared by the sync and async transports of a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+
+    def started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def finished(self, opened_connection):
+        with self._lock:
+            self.in_flight -= 1
+            if opened_connection:
+                self.connections_opened += 1
+
+def _connection_counts(transport):
+    """Return (in use, idle) connections of a transport's connection pool."""
+    connections = list(transport._pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return len(connections) - idle, idle
+
+class _CountingTransport(httpx.HTTPTransport):
+    # httpcore reports a TCP connect through the request's trace extension only
+    # when the request could not reuse a pooled connection
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request):
+        opened = []
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.started":
+                opened.append(True)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self.stats.started()
+        try:
+            return super().handle_request(request)
+        finally:
+            self.stats.finished(bool(opened))
+
+class _AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request):
+        opened = []
+
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.started":
+                opened.append(True)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self.stats.started()
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.stats.finished(bool(opened))
+
+class HTTPPool:
+    """
+    HTTP connection pool shared by every LLM client of the process.
+
+    One keep-alive pool per process means a run's agents, its hierarchical
+    managers and concurrent runs all reuse the same open connections to the
+    API instead of each client paying for its own TCP and TLS setup. The sync
+    client is shared by all threads; async clients are kept per event loop,
+    since async connections cannot move between loops.
+    """
+
+    def __init__(self, max_connections=HTTP_POOL_MAX_CONNECTIONS, max_keepalive=HTTP_POOL_MAX_KEEPALIVE,
+                 keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY, http2=HTTP_POOL_HTTP2):
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("HTTP/2 requires the h2 package (pip install 'httpx[http2]'); using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.stats = _PoolStats()
+        self._transport = _CountingTransport(self.stats, limits=self.limits, http2=http2)
+        self.client = httpx.Client(transport=self._transport)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_transports = weakref.WeakSet()
+        self._loopless_client = None
+        self._lock = threading.Lock()
+
+    def async_client(self):
+        """Return the async client of the running event loop (or of the next one, outside a loop)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            if loop is None:
+                # No loop yet (e.g. a client created before asyncio.run); httpx binds it on first use
+                if self._loopless_client is None:
+                    self._loopless_client = self._new_async_client()
+                return self._loopless_client
+            if loop not in self._async_clients:
+                self._async_clients[loop] = self._new_async_client()
+            return self._async_clients[loop]
+
+    def _new_async_client(self):
+        transport = _AsyncCountingTransport(self.stats, limits=self.limits, http2=self.http2)
+        self._async_transports.add(transport)
+        return httpx.AsyncClient(transport=transport)
+
+    def attach(self, llm):
+        """
+        Route an LLM's API clients through this pool.
+
+        Only OpenAI-compatible clients are replaced; other LLMs are left as they are.
+
+        Args:
+            llm: A crewai LLM
+
+        Returns:
+            The same LLM
+        """
+        client = getattr(llm, "_client", None)
+        async_client = getattr(llm, "_async_client", None)
+        if client is not None and hasattr(client, "copy"):
+            llm._client = client.copy(http_client=self.client)
+        if async_client is not None and hasattr(async_client, "copy"):
+            llm._async_client = async_client.copy(http_client=self.async_client())
+        return llm
+
+    def snapshot(self):
+        """
+        Return the pool's counters and current utilization.
+
+        Returns:
+            Dictionary with requests, connections_opened, connections_reused, requests_in_flight,
+            connections_in_use, connections_idle and max_connections
+        """
+        in_use, idle = _connection_counts(self._transport)
+        for transport in list(self._async_transports):
+            transport_in_use, transport_idle = _connection_counts(transport)
+            in_use += transport_in_use
+            idle += transport_idle
+        with self.stats._lock:
+            requests, opened, in_flight = self.stats.requests, self.stats.connections_opened, self.stats.in_flight
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": max(0, requests - in_flight - opened),
+            "requests_in_flight": in_flight,
+            "connections_in_use": in_use,
+            "connections_idle": idle,
+            "max_connections": self.limits.max_connections
+        }
+
+def shared_http_pool():
+    """
+    Return the process-wide HTTP pool, creating it on first use.
+
+    Returns:
+        The shared HTTPPool, or None if HTTP_POOL_ENABLED is off
+    """
+    global _shared_pool
+    if not HTTP_POOL_ENABLED:
+        return None
+    with _lock:
+        if _shared_pool is None:
+            _shared_pool = HTTPPool()
+        return _shared_pool
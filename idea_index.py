@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import IDEA_INDEX_PATH
+
+DEFAULT_IDEA_INDEX = {
+    "enabled": False,
+    "threshold": 0.7,
+    "reuse_tasks": ["venture_definition", "high_level_streams"]
+}
+
+# Words that carry no meaning for comparing venture ideas
+STOPWORDS = frozenset("""
+    a an and are as at based by for from in into is it its of on or our that the their this to
+    using via we which who with within
+""".split())
+
+# MinHash signature size and LSH banding: 16 bands of 4 rows find pairs with a
+# Jaccard similarity of 0.7 with a probability above 99%
+NUM_PERM = 64
+BANDS = 16
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+def idea_tokens(text):
+    """
+    Return the set of normalized words of a venture idea.
+
+    Words are lowercased, stopwords dropped and a plural "s" removed, so
+    rephrasings such as "B2B SaaS for GCC clinics" and "SaaS for clinics in
+    the GCC, B2B" give the same set.
+    """
+    tokens = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+def minhash_signature(tokens):
+    """Return the MinHash signature (NUM_PERM uint64 values) of a token set."""
+    if not tokens:
+        return np.full(NUM_PERM, _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.array([int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+                       for token in sorted(tokens)], dtype=np.uint64)
+    # (a * x + b) mod p with 32-bit a, b and x stays below 2**64
+    permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % np.uint64(_MERSENNE_PRIME)
+    return permuted.min(axis=0)
+
+def _band_keys(signature):
+    """Return one bucket key per LSH band of a signature."""
+    rows = NUM_PERM // BANDS
+    return [int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+                           "little", signed=True)
+            for band in range(BANDS)]
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def task_fingerprint(task_config):
+    """Return a hash of the parts of a task's configuration that shape its output."""
+    fields = {key: task_config.get(key) for key in ("description", "agent_id", "expected_output", "context", "collaborators")}
+    if task_config.get("output_schema"):
+        fields["output_schema"] = task_config["output_schema"]
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+class IdeaIndex:
+    """
+    On-disk index of past venture ideas for finding near-duplicate submissions.
+
+    Ideas are compared as sets of normalized words. A MinHash signature split
+    into LSH bands finds the candidates with a few indexed lookups, and the
+    exact Jaccard similarity of the candidates decides the matches, so a lookup
+    stays fast with tens of thousands of past runs. The outputs of the
+    early-stage tasks of each run are stored with it, to seed a new run of a
+    near-duplicate idea.
+    """
+
+    def __init__(self, path=IDEA_INDEX_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ideas ("
+                "run_id TEXT PRIMARY KEY, venture_idea TEXT NOT NULL, tokens TEXT NOT NULL, "
+                "config_file TEXT, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS idea_bands (band INTEGER NOT NULL, bucket INTEGER NOT NULL, run_id TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idea_bands_bucket ON idea_bands (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idea_bands_run ON idea_bands (run_id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idea_outputs ("
+                "run_id TEXT NOT NULL, task_id TEXT NOT NULL, fingerprint TEXT NOT NULL, output TEXT NOT NULL, "
+                "PRIMARY KEY (run_id, task_id))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, run_id, venture_idea, config_file=None, outputs=None):
+        """
+        Add a finished run to the index.
+
+        Args:
+            run_id: ID of the run
+            venture_idea: The run's venture idea
+            config_file: Configuration file the run used
+            outputs: Optional dictionary of task ID to (task fingerprint, output text)
+                for the tasks whose outputs can seed later runs
+        """
+        self.add_many([(run_id, venture_idea, config_file, outputs)])
+
+    def add_many(self, runs):
+        """
+        Add many finished runs in one transaction, e.g. to backfill the index.
+
+        Args:
+            runs: Iterable of (run_id, venture_idea, config_file, outputs) tuples, as for add()
+        """
+        with self._connect() as conn:
+            for run_id, venture_idea, config_file, outputs in runs:
+                tokens = idea_tokens(venture_idea)
+                bands = _band_keys(minhash_signature(tokens))
+                conn.execute("DELETE FROM idea_bands WHERE run_id = ?", (run_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO ideas (run_id, venture_idea, tokens, config_file, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (run_id, venture_idea, " ".join(sorted(tokens)), config_file, time.time())
+                )
+                conn.executemany("INSERT INTO idea_bands (band, bucket, run_id) VALUES (?, ?, ?)",
+                                 [(band, bucket, run_id) for band, bucket in enumerate(bands)])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO idea_outputs (run_id, task_id, fingerprint, output) VALUES (?, ?, ?, ?)",
+                    [(run_id, task_id, fingerprint, output) for task_id, (fingerprint, output) in (outputs or {}).items()]
+                )
+
+    def find_similar(self, venture_idea, threshold=DEFAULT_IDEA_INDEX["threshold"], limit=5):
+        """
+        Find past runs whose venture idea is a near duplicate of the given one.
+
+        Args:
+            venture_idea: The new venture idea
+            threshold: Minimum Jaccard similarity of the normalized words (0 to 1)
+            limit: Maximum number of matches
+
+        Returns:
+            List of dictionaries with run_id, venture_idea, similarity and created_at,
+            most similar first
+        """
+        tokens = idea_tokens(venture_idea)
+        bands = _band_keys(minhash_signature(tokens))
+        with self._connect() as conn:
+            clause = " OR ".join(["(band = ? AND bucket = ?)"] * len(bands))
+            params = [value for band, bucket in enumerate(bands) for value in (band, bucket)]
+            candidates = conn.execute(
+                f"SELECT ideas.run_id, venture_idea, tokens, created_at FROM ideas WHERE run_id IN "
+                f"(SELECT DISTINCT run_id FROM idea_bands WHERE {clause})", params
+            ).fetchall()
+
+        matches = []
+        for run_id, idea, idea_tokens_text, created_at in candidates:
+            similarity = jaccard(tokens, set(idea_tokens_text.split()))
+            if similarity >= threshold:
+                matches.append({"run_id": run_id, "venture_idea": idea, "similarity": similarity, "created_at": created_at})
+        matches.sort(key=lambda match: (-match["similarity"], -match["created_at"]))
+        return matches[:limit]
+
+    def seed_outputs(self, run_id, fingerprints):
+        """
+        Return the stored outputs of a run for the tasks whose configuration is unchanged.
+
+        Args:
+            run_id: ID of the earlier run
+            fingerprints: Dictionary of task ID to the task's current fingerprint
+
+        Returns:
+            Dictionary of task ID to output text
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT task_id, fingerprint, output FROM idea_outputs WHERE run_id = ?",
+                                (run_id,)).fetchall()
+        return {task_id: output for task_id, fingerprint, output in rows if fingerprints.get(task_id) == fingerprint}
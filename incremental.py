@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from config import AGENT_TEMPERATURE, OPENAI_MODEL, TASK_RESULTS_PATH
+from structured_output import resolve_output_schema
+from utils import load_config
+
+DEFAULT_INCREMENTAL = {
+    "enabled": False
+}
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def task_input_fingerprint(config, i, instructions, upstream_outputs, model=OPENAI_MODEL, temperature=AGENT_TEMPERATURE):
+    """
+    Return a hash of everything that determines a task's output.
+
+    This covers the task's rendered description (with the venture idea),
+    its expected output and output schema, the definitions of the agents in its crew, the
+    model settings, its limits and prompt budget, and the hashes of its
+    upstream outputs. A task with an unchanged fingerprint would run on
+    exactly the same inputs again.
+
+    Args:
+        config: The workshop configuration
+        i: Index of the task
+        instructions: The task's description rendered without upstream outputs
+        upstream_outputs: Dictionary of context task ID to output text
+        model: Model the task runs on
+        temperature: Sampling temperature
+
+    Returns:
+        Hex digest of the task's inputs
+    """
+    task_config = config["tasks"][i]
+    agents = {agent_config["id"]: agent_config for agent_config in config["agents"]}
+    # The first task involves the whole team, the others their lead and collaborators
+    agent_ids = list(agents) if i == 0 else [task_config["agent_id"], *task_config.get("collaborators", [])]
+    tools = {tool_name for agent_id in agent_ids for tool_name in agents.get(agent_id, {}).get("tools", [])}
+    payload = {
+        "task_id": task_config["id"],
+        "instructions": instructions,
+        "expected_output": task_config["expected_output"],
+        "agents": [agents.get(agent_id) for agent_id in agent_ids],
+        "tool_plugins": {name: declaration for name, declaration in config.get("tool_plugins", {}).items()
+                         if name in tools},
+        "roster": config.get("roster") if i == 0 else None,
+        "historian": config.get("historian"),
+        "model": model,
+        "temperature": temperature,
+        "limits": [config.get("limits", {}).get("task"), task_config.get("limits")],
+        "prompt_budget": [config.get("prompt_budget"), task_config.get("prompt_budget")],
+        "upstream": {context_id: _sha256(output) for context_id, output in sorted(upstream_outputs.items())}
+    }
+    # Only tasks with a schema carry it, so the fingerprints of the other tasks stay as they were
+    output_schema = resolve_output_schema(config, task_config)
+    if output_schema:
+        payload["output_schema"] = output_schema
+    return _sha256(json.dumps(payload, sort_keys=True, default=str))
+
+class TaskResultStore:
+    """
+    Content-addressed store of task outputs, keyed by their input fingerprint.
+
+    A re-run looks up each task's fingerprint before running it; a hit means
+    the task would get the same inputs as before, so its stored output is used
+    instead. Only outputs of tasks that finished within their limits are stored.
+    """
+
+    def __init__(self, path=TASK_RESULTS_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_results ("
+                "fingerprint TEXT PRIMARY KEY, task_id TEXT NOT NULL, output TEXT NOT NULL, metrics TEXT, "
+                "run_id TEXT, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS task_results_task ON task_results (task_id, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, fingerprint):
+        """Return the stored result for a fingerprint as a dictionary, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT task_id, output, metrics, run_id FROM task_results WHERE fingerprint = ?",
+                               (fingerprint,)).fetchone()
+        if row is None:
+            return None
+        task_id, output, metrics, run_id = row
+        return {"task_id": task_id, "output": output, "metrics": json.loads(metrics or "{}"), "run_id": run_id}
+
+    def put(self, fingerprint, task_id, output, metrics=None, run_id=None):
+        """Store a task's output under its input fingerprint."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_results (fingerprint, task_id, output, metrics, run_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint, task_id, output, json.dumps(metrics or {}, default=str), run_id, time.time())
+            )
+
+    def latest_metrics(self, task_id):
+        """Return the metrics of the most recent stored result of a task, whatever its inputs, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT metrics FROM task_results WHERE task_id = ? ORDER BY created_at DESC LIMIT 1",
+                               (task_id,)).fetchone()
+        return json.loads(row[0] or "{}") if row else None
+
+def plan_incremental_run(venture_idea, config_file="workshop_config.json", store=None):
+    """
+    Work out which tasks a re-run would execute, without running anything.
+
+    A task is reused if all of its context tasks are reused and its
+    fingerprint, computed from their stored outputs, is in the store. Every
+    other task executes, and with it every task downstream of it, since its
+    new output cannot be known in advance.
+
+    Args:
+        venture_idea: A brief description of the venture idea
+        config_file: Path to the JSON configuration file
+        store: TaskResultStore to look in (defaults to the shared store)
+
+    Returns:
+        List of dictionaries with task_id, action ("reuse" or "execute"), reason,
+        and the cost and execution_time the task took last time (None if unknown)
+    """
+    from tasks import compile_task_prompts
+
+    store = store or TaskResultStore()
+    config = load_config(config_file)
+    prompts = compile_task_prompts(venture_idea, config_file)
+
+    outputs, plan = {}, []
+    for i, task_config in enumerate(config["tasks"]):
+        task_id = task_config["id"]
+        prompt = prompts[task_id]
+        stale = [context_id for context_id in prompt.context_ids if context_id not in outputs]
+        stored = None
+        if not stale:
+            _, instructions, _ = prompt.render({})
+            upstream = {context_id: outputs[context_id] for context_id in prompt.context_ids}
+            stored = store.get(task_input_fingerprint(config, i, instructions, upstream))
+
+        if stored is not None:
+            outputs[task_id] = stored["output"]
+            metrics, action, reason = stored["metrics"], "reuse", f"unchanged since run {stored['run_id']}"
+        else:
+            metrics, action = store.latest_metrics(task_id) or {}, "execute"
+            reason = f"upstream {', '.join(stale)} will run again" if stale else "inputs changed or never run"
+        plan.append({"task_id": task_id, "action": action, "reason": reason,
+                     "cost": metrics.get("cost"), "execution_time": metrics.get("execution_time")})
+    return plan
+
+def print_incremental_plan(plan):
+    """Print which tasks a re-run would execute and what reusing the others saves."""
+    print("\nIncremental re-run plan:")
+    for step in plan:
+        estimate = f" (last run ${step['cost']:.4f}, {step['execution_time']:.0f}s)" if step["cost"] is not None else ""
+        print(f"- {step['task_id']}: {step['action']}, {step['reason']}{estimate}")
+
+    reused = [step for step in plan if step["action"] == "reuse"]
+    saved_cost = sum(step["cost"] or 0 for step in reused)
+    saved_seconds = sum(step["execution_time"] or 0 for step in reused)
+    print(f"\n{len(plan) - len(reused)} of {len(plan)} tasks would execute; reusing {len(reused)} saves an estimated "
+          f"${saved_cost:.4f} and {saved_seconds:.0f} seconds")
@@ -0,0 +1,256 @@
+from contextlib import contextmanager
+import datetime
+import hashlib
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from config import KNOWLEDGE_FACTS_PER_TASK, KNOWLEDGE_MAX_STORED_FACTS, KNOWLEDGE_STORE_PATH
+from idea_index import STOPWORDS
+
+DEFAULT_KNOWLEDGE = {
+    "enabled": False,
+    "inject": True,
+    "record": True,
+    "max_facts": 6,
+    "max_chars": 1200,
+    "max_age_days": 180
+}
+
+# Terms of a retrieval query at most, so a long query cannot make the lookup slow
+MAX_QUERY_TERMS = 24
+
+# Facts are single sentences or table rows; shorter ones lack context, longer ones are paragraphs
+MIN_FACT_CHARS = 30
+MAX_FACT_CHARS = 300
+
+_FIGURE = re.compile(r"\$\s?[0-9][0-9,]*(?:\.[0-9]+)?|[0-9]+(?:\.[0-9]+)?\s?%")
+_SEPARATOR_CELL = re.compile(r":?-{3,}:?")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[A-Z$])")
+
+def _clean(text):
+    text = re.sub(r"[*_`]+", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def extract_facts(outcome, limit=KNOWLEDGE_FACTS_PER_TASK):
+    """
+    Return the statements of a task outcome that carry a figure.
+
+    A statement is a sentence of a paragraph or list item, or a table row
+    written as "Header: value" pairs, that mentions a dollar amount or a
+    percentage, such as "CAC for B2C fintech apps in the UAE: $25-40".
+
+    Args:
+        outcome: The Outcome section of a task output
+        limit: Maximum number of statements to return
+
+    Returns:
+        List of statements in order of appearance, without duplicates
+    """
+    statements = []
+    header = None
+    for line in outcome.splitlines():
+        line = line.strip()
+        if line.startswith("|"):
+            cells = [_clean(cell) for cell in line.strip("|").split("|")]
+            if all(_SEPARATOR_CELL.fullmatch(cell) for cell in cells if cell):
+                continue
+            if header is None:
+                header = cells
+                continue
+            pairs = zip(header, cells) if len(header) == len(cells) else (("", cell) for cell in cells)
+            statements.append("; ".join(f"{name}: {cell}" if name else cell for name, cell in pairs if cell))
+        else:
+            header = None
+            text = _clean(line.lstrip("#>-*+ ").lstrip("0123456789.) "))
+            statements.extend(_SENTENCE_END.split(text))
+
+    facts = [statement for statement in dict.fromkeys(statements)
+             if MIN_FACT_CHARS <= len(statement) <= MAX_FACT_CHARS and _FIGURE.search(statement)]
+    return facts[:limit]
+
+def fact_tags(text, default_sector=None):
+    """
+    Return the (sector, country) a fact is about, from the benchmark dataset's names.
+
+    The sector is the first whose keywords the fact mentions, or default_sector
+    (usually the venture's); the country is the only one the fact names, or
+    None for facts about the whole region or several countries.
+    """
+    from benchmark_data import DEFAULT_COUNTRY, load_benchmarks
+
+    data = load_benchmarks()
+    countries = [code for code in data.countries if code != DEFAULT_COUNTRY
+                 and re.search(rf"\b{re.escape(data.label('country', code))}\b", text, re.IGNORECASE)]
+    return data.match_sector(text) or default_sector, countries[0] if len(countries) == 1 else None
+
+def fact_key(text):
+    """Return the key under which a fact is stored; restatements differing in case or spacing share it."""
+    return hashlib.sha256(re.sub(r"\s+", " ", text.lower()).strip().encode("utf-8")).hexdigest()
+
+def _match_query(text):
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word not in STOPWORDS and len(word) > 1 and word not in terms:
+            terms.append(word)
+    return " OR ".join(f'"{term}"' for term in terms[:MAX_QUERY_TERMS])
+
+def format_facts(facts):
+    """Format retrieved facts as the text injected into a prompt or returned by the lookup tool."""
+    lines = ["Facts recorded by earlier workshops (verify them before relying on them; "
+             "newer data in this workshop takes precedence):"]
+    for fact in facts:
+        tags = [tag for tag in (fact["sector"], fact["country"]) if tag]
+        tags.append(datetime.date.fromtimestamp(fact["confirmed_at"]).isoformat())
+        lines.append(f"- {fact['fact']} [{', '.join(tags)}]")
+    return "\n".join(lines)
+
+class KnowledgeStore:
+    """
+    Local store of the facts and figures agents produced in earlier workshops.
+
+    Facts are kept in SQLite with their source (run, task and agent role),
+    country, sector and the last time a run stated them. A full-text index
+    (SQLite FTS5) ranks them by BM25 relevance to a query, so a lookup reads
+    only the few matching rows however large the store grows. Facts that no
+    run has restated within max_age_days are evicted as stale, and the
+    store is capped at max_facts, dropping the least recently used first.
+    """
+
+    def __init__(self, path=KNOWLEDGE_STORE_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS facts ("
+                "id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, fact TEXT NOT NULL, sector TEXT, country TEXT, "
+                "run_id TEXT, task_id TEXT, agent_role TEXT, created_at REAL NOT NULL, confirmed_at REAL NOT NULL, "
+                "confirmations INTEGER NOT NULL DEFAULT 1, last_used_at REAL, uses INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS facts_confirmed ON facts (confirmed_at)")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS facts_fts USING fts5 (fact, tokenize='porter unicode61')")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add_facts(self, facts, run_id=None, task_id=None, agent_role=None):
+        """
+        Record facts stated by a task, or confirm them if an earlier run stated them too.
+
+        Args:
+            facts: Iterable of (text, sector, country) tuples, e.g. from extract_facts() and fact_tags()
+            run_id: ID of the run that produced them
+            task_id: ID of the task that produced them
+            agent_role: Role of the agent that led the task
+
+        Returns:
+            Number of facts that were new to the store
+        """
+        now = time.time()
+        added = 0
+        with self._connect() as conn:
+            for fact, sector, country in facts:
+                key = fact_key(fact)
+                updated = conn.execute(
+                    "UPDATE facts SET confirmed_at = ?, confirmations = confirmations + 1, run_id = ?, task_id = ?, "
+                    "agent_role = ? WHERE key = ?",
+                    (now, run_id, task_id, agent_role, key)
+                ).rowcount
+                if updated:
+                    continue
+                fact_id = conn.execute(
+                    "INSERT INTO facts (key, fact, sector, country, run_id, task_id, agent_role, created_at, confirmed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, fact, sector, country, run_id, task_id, agent_role, now, now)
+                ).lastrowid
+                conn.execute("INSERT INTO facts_fts (rowid, fact) VALUES (?, ?)", (fact_id, fact))
+                added += 1
+        return added
+
+    def search(self, query, sector=None, country=None, limit=DEFAULT_KNOWLEDGE["max_facts"],
+               max_chars=DEFAULT_KNOWLEDGE["max_chars"], max_age_days=DEFAULT_KNOWLEDGE["max_age_days"]):
+        """
+        Find the facts most relevant to a query.
+
+        Facts tagged with another sector or country than the given ones are
+        left out; untagged facts always qualify. The result is bounded both in
+        count and in total characters, and the returned facts are marked as used.
+
+        Args:
+            query: Free text, e.g. the venture idea and the task name
+            sector: Sector of the venture, if known
+            country: Country of the venture, if known
+            limit: Maximum number of facts
+            max_chars: Maximum total length of the facts' texts
+            max_age_days: Leave out facts not restated within this many days
+
+        Returns:
+            List of fact dictionaries (fact, sector, country, run_id, task_id, agent_role,
+            confirmed_at, confirmations), most relevant first
+        """
+        match = _match_query(query)
+        if not match or limit <= 0:
+            return []
+        conditions, parameters = ["facts_fts MATCH ?"], [match]
+        if max_age_days is not None:
+            conditions.append("f.confirmed_at >= ?")
+            parameters.append(time.time() - max_age_days * 86400)
+        for column, value in (("sector", sector), ("country", country)):
+            if value:
+                conditions.append(f"(f.{column} IS NULL OR f.{column} = ?)")
+                parameters.append(value)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT f.id, f.fact, f.sector, f.country, f.run_id, f.task_id, f.agent_role, f.confirmed_at, "
+                "f.confirmations FROM facts_fts JOIN facts f ON f.id = facts_fts.rowid "
+                f"WHERE {' AND '.join(conditions)} ORDER BY bm25(facts_fts) LIMIT ?",
+                (*parameters, limit)
+            ).fetchall()
+
+            facts, chars = [], 0
+            for row in rows:
+                if chars + len(row["fact"]) > max_chars:
+                    continue
+                chars += len(row["fact"])
+                facts.append(dict(row))
+            conn.executemany("UPDATE facts SET last_used_at = ?, uses = uses + 1 WHERE id = ?",
+                             [(time.time(), fact["id"]) for fact in facts])
+        for fact in facts:
+            del fact["id"]
+        return facts
+
+    def evict(self, max_age_days=DEFAULT_KNOWLEDGE["max_age_days"], max_facts=KNOWLEDGE_MAX_STORED_FACTS):
+        """
+        Remove stale facts, then the least recently used ones beyond max_facts.
+
+        Returns:
+            Number of facts removed
+        """
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else 0
+        with self._connect() as conn:
+            removed = [row[0] for row in conn.execute("SELECT id FROM facts WHERE confirmed_at < ?", (cutoff,))]
+            excess = conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0] - len(removed) - max_facts
+            if excess > 0:
+                removed += [row[0] for row in conn.execute(
+                    "SELECT id FROM facts WHERE confirmed_at >= ? "
+                    "ORDER BY MAX(COALESCE(last_used_at, 0), confirmed_at) LIMIT ?", (cutoff, excess)
+                )]
+            conn.executemany("DELETE FROM facts WHERE id = ?", [(fact_id,) for fact_id in removed])
+            conn.executemany("DELETE FROM facts_fts WHERE rowid = ?", [(fact_id,) for fact_id in removed])
+        return len(removed)
+
+    def stats(self):
+        """Return the number of stored facts and of facts used at least once."""
+        with self._connect() as conn:
+            total, used = conn.execute("SELECT COUNT(*), COUNT(last_used_at) FROM facts").fetchone()
+        return {"facts": total, "used": used}
@@ -0,0 +1,382 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+
+import tiktoken
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+
+from config import OPENAI_MODEL, AGENT_TEMPERATURE
+from http_pool import shared_http_pool
+
+# Cost tracking constants
+MODEL_COSTS = {
+    "gpt-4-1106-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
+    "gpt-4-0125-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
+    "gpt-4-turbo-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
+    "gpt-4": {"input": 0.03, "output": 0.06},  # $0.03 per 1K input tokens, $0.06 per 1K output tokens
+    "gpt-4-32k": {"input": 0.06, "output": 0.12},  # $0.06 per 1K input tokens, $0.12 per 1K output tokens
+    "gpt-3.5-turbo": {"input": 0.0015, "output": 0.002},  # $0.0015 per 1K input tokens, $0.002 per 1K output tokens
+    "gpt-4.1-mini": {"input": 0.0004, "output": 0.0016}  # $0.0004 per 1K input tokens, $0.0016 per 1K output tokens
+}
+
+@lru_cache(maxsize=None)
+def _get_encoding(model):
+    return tiktoken.encoding_for_model(model)
+
+# Function to count tokens
+def count_tokens(text, model="gpt-4"):
+    """Count the number of tokens in a text string."""
+    try:
+        encoding = _get_encoding(model)
+        return len(encoding.encode(text))
+    except Exception as e:
+        print(f"Error counting tokens: {e}")
+        # Fallback: estimate tokens as words / 0.75 (rough approximation)
+        return int(len(text.split()) / 0.75)
+
+def truncate_tokens(text, max_tokens, model="gpt-4"):
+    """Cut a text string down to at most max_tokens tokens."""
+    try:
+        encoding = _get_encoding(model)
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    except Exception:
+        # Fallback: keep the same words-per-token ratio as count_tokens
+        words = text.split(" ")
+        return " ".join(words[:int(max_tokens * 0.75)])
+
+# Function to calculate cost
+def calculate_cost(input_tokens, output_tokens, model=OPENAI_MODEL):
+    """Calculate the cost of API usage based on tokens and model."""
+    # Default to gpt-4 costs if model not found
+    costs = MODEL_COSTS.get(model, MODEL_COSTS["gpt-4"])
+    input_cost = (input_tokens / 1000) * costs["input"]
+    output_cost = (output_tokens / 1000) * costs["output"]
+    return input_cost + output_cost
+
+def messages_to_text(messages):
+    """Flatten a string or a list of chat messages into a single text for token counting."""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages:
+        content = message.get("content", "") if isinstance(message, dict) else message
+        parts.append(content if isinstance(content, str) else json.dumps(content, default=str))
+    return "\n".join(parts)
+
+# Limits that can be set for a whole run and for each task
+LIMIT_KEYS = ("max_seconds", "max_llm_calls", "max_tokens", "max_cost")
+
+class BudgetExceeded(Exception):
+    """Raised by the metering layer when a run or task limit has been reached."""
+
+    def __init__(self, scope, limit, value, maximum):
+        self.scope = scope
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        super().__init__(f"{scope.title()} limit {limit}={maximum} reached ({value:,.4g})")
+
+class RunAborted(Exception):
+    """Raised by the metering layer when a run was aborted by its owner."""
+
+class RunMeter:
+    """
+    Thread-safe counters for the LLM traffic of a single workshop run.
+
+    The meter is fed by MeteredLLM on every call, so the numbers reflect the
+    real requests made by agents and hierarchical managers rather than an
+    estimate based on the task description. It also enforces the run and
+    task limits (wall time, LLM calls, tokens and dollars) before each call.
+
+    An optional call_gate is called before every request that is not served
+    from the response cache and blocks until the request may be sent, e.g.
+    to share a global LLM rate budget between runs.
+
+    A meter with a parent (e.g. that of a speculative task) sends its calls
+    through the parent's call gate, and its usage counts against the parent's
+    run limits until it is merged into the parent with add_usage.
+    """
+
+    def __init__(self, model=OPENAI_MODEL, listener=None, run_limits=None, call_gate=None, parent=None):
+        self.model = model
+        self.listener = listener
+        self.parent = parent
+        self.call_gate = call_gate or (parent.call_gate if parent else None)
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        # Each call is priced at the rates of the model that served it
+        self._cost = 0.0
+        # Calls and input tokens per LLM label, e.g. the hierarchical manager's turns
+        self.label_usage = {}
+
+        self.run_limits = run_limits or {}
+        self.run_started_at = time.time()
+        self.run_exceeded = None
+        self.aborted = None
+
+        self.task_limits = {}
+        self.task_started_at = self.run_started_at
+        self._task_base = (0, 0, 0, 0.0)
+        self._task_label_base = {}
+        self.task_exceeded = None
+        self.partial_output = ""
+
+    def start_task(self, limits=None):
+        """Reset the per-task counters and limits at the start of a task."""
+        with self._lock:
+            self.task_limits = limits or {}
+            self.task_started_at = time.time()
+            self._task_base = (self.llm_calls, self.input_tokens, self.output_tokens, self._cost)
+            self._task_label_base = {label: tuple(usage) for label, usage in self.label_usage.items()}
+            self.task_exceeded = None
+            self.partial_output = ""
+
+    def record_call(self, input_tokens, output_tokens, cached=False, response=None, label=None, model=None):
+        """Record one LLM call (or one response served from the cache), priced for model or the meter's model."""
+        with self._lock:
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.llm_calls += 1
+                self.input_tokens += input_tokens
+                self.output_tokens += output_tokens
+                self._cost += calculate_cost(input_tokens, output_tokens, model or self.model)
+                if label:
+                    usage = self.label_usage.setdefault(label, [0, 0])
+                    usage[0] += 1
+                    usage[1] += input_tokens
+            # Keep the most substantial response of the task as its partial output
+            if isinstance(response, str) and len(response) > len(self.partial_output):
+                self.partial_output = response
+        if self.listener:
+            self.listener({
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached": cached,
+                **self.snapshot()
+            })
+
+    def add_usage(self, usage):
+        """Add the usage recorded by another meter (e.g. of a speculative task) to this one."""
+        with self._lock:
+            self.llm_calls += usage["llm_calls"]
+            self.cache_hits += usage["cache_hits"]
+            self.input_tokens += usage["input_tokens"]
+            self.output_tokens += usage["output_tokens"]
+            self._cost += usage["cost"]
+
+    def abort(self, reason):
+        """Make every further LLM call metered by this meter raise RunAborted."""
+        self.aborted = reason
+
+    @property
+    def cost(self):
+        return self._cost
+
+    def snapshot(self):
+        """Return the current counters as a plain dictionary."""
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "cache_hits": self.cache_hits,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "cost": self._cost
+            }
+
+    def task_usage(self):
+        """Return the LLM usage since the current task started."""
+        with self._lock:
+            base_calls, base_input, base_output, base_cost = self._task_base
+            return {
+                "llm_calls": self.llm_calls - base_calls,
+                "input_tokens": self.input_tokens - base_input,
+                "output_tokens": self.output_tokens - base_output,
+                "cost": self._cost - base_cost
+            }
+
+    def task_label_usage(self, label):
+        """Return (calls, input tokens) of the LLM with the given label since the current task started."""
+        with self._lock:
+            calls, input_tokens = self.label_usage.get(label, (0, 0))
+            base_calls, base_input = self._task_label_base.get(label, (0, 0))
+            return calls - base_calls, input_tokens - base_input
+
+    def _usage_values(self, usage, started_at):
+        return {
+            "max_seconds": time.time() - started_at,
+            "max_llm_calls": usage["llm_calls"],
+            "max_tokens": usage["input_tokens"] + usage["output_tokens"],
+            "max_cost": usage["cost"]
+        }
+
+    def _exceeded(self, scope, limits, usage, started_at):
+        values = self._usage_values(usage, started_at)
+        for limit in LIMIT_KEYS:
+            maximum = limits.get(limit)
+            if maximum is not None and values[limit] >= maximum:
+                return BudgetExceeded(scope, limit, values[limit], maximum)
+        return None
+
+    def run_limit_exceeded(self, extra=None):
+        """Return the run limit reached by this meter's usage plus the extra usage of a child meter, or None."""
+        if self.run_exceeded or not self.run_limits:
+            return self.run_exceeded
+        usage = self.snapshot()
+        if extra:
+            usage = {key: usage[key] + extra[key] for key in ("llm_calls", "input_tokens", "output_tokens", "cost")}
+        return self._exceeded("run", self.run_limits, usage, self.run_started_at)
+
+    def check_limits(self):
+        """
+        Raise BudgetExceeded if the run or the current task has reached one of its limits.
+
+        Called before every LLM call with the usage consumed so far, so a task is
+        stopped at the first call after it reached a limit. The call that crosses a
+        token or cost limit is still made, so those limits can be exceeded by one
+        call. Raises RunAborted instead once the meter was aborted.
+        """
+        if self.aborted:
+            raise RunAborted(self.aborted)
+        if self.run_exceeded:
+            raise self.run_exceeded
+        if self.parent is not None:
+            # Leave the parent's state to its own thread; it finds the limit at its next call
+            exceeded = self.parent.run_limit_exceeded(self.snapshot())
+            if exceeded is not None:
+                self.task_exceeded = exceeded
+                raise exceeded
+
+        for scope, limits, usage, started_at in (
+            ("run", self.run_limits, self.snapshot(), self.run_started_at),
+            ("task", self.task_limits, self.task_usage(), self.task_started_at)
+        ):
+            if not limits:
+                continue
+            exceeded = self._exceeded(scope, limits, usage, started_at)
+            if exceeded is not None:
+                if scope == "run":
+                    self.run_exceeded = exceeded
+                self.task_exceeded = exceeded
+                raise exceeded
+
+class MeteredLLM(BaseLLM):
+    """
+    CrewAI LLM that delegates to a regular LLM while metering every call and
+    optionally serving repeated prompts from a shared response cache.
+
+    A label (e.g. "manager") lets the meter report the calls of one role separately.
+    """
+
+    def __init__(self, inner, meter=None, cache=None, label=None):
+        super().__init__(model=inner.model, temperature=inner.temperature)
+        self.inner = inner
+        self.meter = meter
+        self.cache = cache
+        self.label = label
+
+    def with_label(self, label):
+        """Return a MeteredLLM sharing this one's model, meter and cache whose calls carry a label."""
+        return MeteredLLM(self.inner, meter=self.meter, cache=self.cache, label=label)
+
+    def _cache_key(self, messages, tools):
+        payload = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "stop": list(self.stop_sequences),
+            "messages": messages,
+            "tools": [tool.get("name") if isinstance(tool, dict) else str(tool) for tool in tools or []]
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _lookup(self, messages, tools, available_functions):
+        """Return (cache key, cached response); the key is None when the call is not cacheable."""
+        # Only plain text completions are cacheable; native tool calls have side effects
+        if self.cache is None or available_functions:
+            return None, None
+        cache_key = self._cache_key(messages, tools)
+        cached = self.cache.get(cache_key)
+        if cached is not None and self.meter:
+            self.meter.record_call(0, 0, cached=True, response=cached)
+        return cache_key, cached
+
+    def _record(self, messages, response, cache_key):
+        if self.meter:
+            input_tokens = count_tokens(messages_to_text(messages), self.model)
+            output_tokens = count_tokens(response, self.model) if isinstance(response, str) else 0
+            self.meter.record_call(input_tokens, output_tokens, response=response, label=self.label, model=self.model)
+
+        if cache_key is not None and isinstance(response, str):
+            self.cache.set(cache_key, response)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if self.meter:
+            self.meter.check_limits()
+        cache_key, cached = self._lookup(messages, tools, available_functions)
+        if cached is not None:
+            return cached
+
+        if self.meter and self.meter.call_gate:
+            self.meter.call_gate()
+        # Agents set ReAct stop words on the LLM they were given, so pass them on for this call only;
+        # the inner LLM is shared by concurrent calls and by the labelled copies of this one
+        with call_stop_override(self.inner, list(self.stop_sequences)):
+            response = self.inner.call(messages, tools, callbacks, available_functions, **kwargs)
+        self._record(messages, response, cache_key)
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if self.meter:
+            self.meter.check_limits()
+        cache_key, cached = self._lookup(messages, tools, available_functions)
+        if cached is not None:
+            return cached
+
+        if self.meter and self.meter.call_gate:
+            # The gate blocks, so wait for it off the event loop
+            await asyncio.to_thread(self.meter.call_gate)
+        with call_stop_override(self.inner, list(self.stop_sequences)):
+            response = await self.inner.acall(messages, tools, callbacks, available_functions, **kwargs)
+        self._record(messages, response, cache_key)
+        return response
+
+    def supports_function_calling(self):
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self):
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self):
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self.inner.get_token_usage_summary()
+
+def create_llm(api_key, model=OPENAI_MODEL, temperature=AGENT_TEMPERATURE, meter=None, cache=None, http_pool=None):
+    """
+    Create the LLM used by agents and hierarchical managers.
+
+    Args:
+        api_key: OpenAI API key
+        model: Model name
+        temperature: Sampling temperature
+        meter: Optional RunMeter that records every call
+        cache: Optional ResponseCache shared between runs and processes
+        http_pool: HTTPPool to send the API requests through (defaults to the shared pool of the process)
+
+    Returns:
+        A MeteredLLM instance
+    """
+    inner = LLM(model=model, temperature=temperature, api_key=api_key)
+    http_pool = http_pool or shared_http_pool()
+    if http_pool:
+        http_pool.attach(inner)
+    return MeteredLLM(inner, meter=meter, cache=cache)
@@ -0,0 +1,96 @@
+import codecs
+import mmap
+import shutil
+from pathlib import Path
+
+# Size of the pieces task outputs are streamed in
+CHUNK_SIZE = 64 * 1024
+
+def _outcome_span(data):
+    """Return the byte range of the Outcome section (the whole output if it has none), without surrounding whitespace."""
+    start, end = 0, len(data)
+    marker = data.find(b"# Outcome")
+    if marker != -1:
+        start = marker + len(b"# Outcome")
+        for stop_marker in (b"# Outcome", b"# Collaboration Summary"):
+            stop = data.find(stop_marker, start)
+            if stop != -1:
+                end = min(end, stop)
+    while start < end and data[start:start + 1].isspace():
+        start += 1
+    while end > start and data[end - 1:end].isspace():
+        end -= 1
+    return start, end
+
+class OutputHandle:
+    """
+    Lightweight reference to a task output stored on disk.
+
+    Only the path and a few offsets are kept in memory; the text is read
+    through a memory map in chunks when it is rendered.
+    """
+
+    __slots__ = ("path", "size", "outcome_span")
+
+    def __init__(self, path, size, outcome_span):
+        self.path = path
+        self.size = size
+        self.outcome_span = outcome_span
+
+    def iter_chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        """Yield the text between two byte offsets in decoded chunks."""
+        end = self.size if end is None else end
+        if end <= start:
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for position in range(start, end, chunk_size):
+                chunk = decoder.decode(data[position:min(position + chunk_size, end)])
+                if chunk:
+                    yield chunk
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def read(self):
+        """Return the whole output as a string."""
+        return "".join(self.iter_chunks())
+
+    def iter_outcome(self, chunk_size=CHUNK_SIZE):
+        """Yield the Outcome section of the output in chunks."""
+        return self.iter_chunks(*self.outcome_span, chunk_size=chunk_size)
+
+    def read_outcome(self):
+        """Return the Outcome section of the output as a string."""
+        return "".join(self.iter_outcome())
+
+    def __str__(self):
+        return self.read()
+
+class OutputStore:
+    """Directory of the task outputs of one workshop run, one file per output."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def put(self, name, text):
+        """
+        Write a task output to disk.
+
+        Args:
+            name: File name of the output, unique within the run
+            text: The output text
+
+        Returns:
+            OutputHandle referring to the stored output
+        """
+        data = text.encode("utf-8")
+        path = self.directory / f"{name}.md"
+        with open(path, "wb") as f:
+            f.write(data)
+        return OutputHandle(str(path), len(data), _outcome_span(data))
+
+    def cleanup(self):
+        """Remove the stored outputs of the run."""
+        shutil.rmtree(self.directory, ignore_errors=True)
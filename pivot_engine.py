@@ -0,0 +1,177 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from config import PIVOT_RULES_PATH
+
+_rule_sets = {}
+_lock = threading.Lock()
+
+def _keyword_presence(texts, keywords):
+    """Return an (N, K) boolean matrix of which keywords appear, as lowercase substrings, in which texts."""
+    lowered = np.char.lower(np.asarray(texts, dtype=str))
+    if lowered.size == 0 or not keywords:
+        return np.zeros((lowered.size, len(keywords)), dtype=bool)
+    return np.stack([np.char.find(lowered, keyword) >= 0 for keyword in keywords], axis=1)
+
+class PivotRules:
+    """
+    Pivot dimension rules compiled into keyword matrices.
+
+    Every rule has four keyword conditions (stream has any of, stream has none
+    of, original has any of, original has none of). Each condition is compiled
+    to a (keywords x rules) matrix, so all rules are evaluated for all streams
+    with a few matrix products.
+    """
+
+    def __init__(self, rule_set):
+        self.version = rule_set["version"]
+        self.magnitudes = sorted(rule_set["magnitudes"], key=lambda magnitude: -magnitude["min_pivots"])
+        self.dimensions = [dimension["id"] for dimension in rule_set["dimensions"]]
+        self.dimension_labels = [dimension["label"] for dimension in rule_set["dimensions"]]
+        self.weights = np.array([dimension["weight"] for dimension in rule_set["dimensions"]], dtype=np.float64)
+
+        rules = [(d, rule) for d, dimension in enumerate(rule_set["dimensions"]) for rule in dimension["rules"]]
+        self.rule_dimension = np.array([d for d, _ in rules], dtype=np.intp)
+        self.rule_original = [rule["original"] for _, rule in rules]
+        self.rule_new = [rule["new"] for _, rule in rules]
+
+        # Rules with the same new value are the same position on their dimension
+        self.position_labels = [list(dict.fromkeys(rule["new"] for rule in dimension["rules"]))
+                                for dimension in rule_set["dimensions"]]
+        self.rule_position = np.array([self.position_labels[d].index(rule["new"]) for d, rule in rules], dtype=np.intp)
+
+        conditions = ("stream_has", "stream_lacks", "original_has", "original_lacks")
+        self.keywords = list(dict.fromkeys(keyword.lower() for _, rule in rules
+                                           for condition in conditions for keyword in rule.get(condition, [])))
+        keyword_index = {keyword: k for k, keyword in enumerate(self.keywords)}
+        self.condition_matrices = {}
+        for condition in conditions:
+            matrix = np.zeros((len(self.keywords), len(rules)), dtype=np.int32)
+            for r, (_, rule) in enumerate(rules):
+                for keyword in rule.get(condition, []):
+                    matrix[keyword_index[keyword.lower()], r] = 1
+            self.condition_matrices[condition] = matrix
+        self.requires_stream = self.condition_matrices["stream_has"].any(axis=0)
+        self.requires_original = self.condition_matrices["original_has"].any(axis=0)
+
+    def evaluate(self, original_description, stream_descriptions):
+        """
+        Evaluate every pivot dimension for many streams against the original description.
+
+        Args:
+            original_description: Description of the original venture
+            stream_descriptions: Sequence of stream descriptions
+
+        Returns:
+            PivotResults for the streams
+        """
+        streams = _keyword_presence(stream_descriptions, self.keywords).astype(np.int32)
+        original = _keyword_presence([original_description], self.keywords).astype(np.int32)[0]
+        matrices = self.condition_matrices
+
+        # (N, R) matrix of the rules that apply to each stream
+        applies = (((streams @ matrices["stream_has"]) > 0) | ~self.requires_stream)
+        applies &= (streams @ matrices["stream_lacks"]) == 0
+        applies &= (((original @ matrices["original_has"]) > 0) | ~self.requires_original)
+        applies &= (original @ matrices["original_lacks"]) == 0
+
+        # The first rule that applies on each dimension decides the stream's position there
+        rule_ids = np.full((len(stream_descriptions), len(self.dimensions)), -1, dtype=np.intp)
+        for d in range(len(self.dimensions)):
+            dimension_rules = np.flatnonzero(self.rule_dimension == d)
+            if len(dimension_rules) == 0:
+                continue
+            dimension_applies = applies[:, dimension_rules]
+            first = dimension_applies.argmax(axis=1)
+            rule_ids[:, d] = np.where(dimension_applies.any(axis=1), dimension_rules[first], -1)
+
+        return PivotResults(self, original_description, list(stream_descriptions), rule_ids)
+
+class PivotResults:
+    """
+    Pivot analysis of N streams against one original description.
+
+    rule_ids holds, per stream and dimension, the rule that detected a pivot
+    (-1 where no pivot is required).
+    """
+
+    def __init__(self, rules, original_description, stream_descriptions, rule_ids):
+        self.rules = rules
+        self.original_description = original_description
+        self.stream_descriptions = stream_descriptions
+        self.rule_ids = rule_ids
+        self.required = rule_ids >= 0
+        self.pivot_count = self.required.sum(axis=1)
+        self.pivot_cost = self.required @ rules.weights
+        self.positions = np.where(self.required, rules.rule_position[rule_ids], -1)
+
+    def __len__(self):
+        return len(self.stream_descriptions)
+
+    def magnitude(self, i):
+        """Return the pivot magnitude label of stream i."""
+        return next(magnitude["label"] for magnitude in self.rules.magnitudes
+                    if self.pivot_count[i] >= magnitude["min_pivots"])
+
+    def distance_matrix(self):
+        """
+        Return the (N, N) pivot distance between every pair of streams.
+
+        The distance is the total weight of the dimensions on which the two
+        streams end up in different positions; the distance of a stream to the
+        original description is its pivot cost.
+        """
+        count = len(self)
+        distances = np.zeros((count, count), dtype=np.float32)
+        for d, weight in enumerate(self.rules.weights):
+            positions = self.positions[:, d]
+            distances += np.float32(weight) * (positions[:, None] != positions[None, :])
+        return distances
+
+    def ranking(self):
+        """Return the stream indices ordered from the cheapest to the most expensive pivot."""
+        return np.argsort(self.pivot_cost, kind="stable")
+
+    def dimensions(self, i):
+        """Return the pivot dimensions of stream i in the format of pivot_analysis_tool."""
+        rules = self.rules
+        dimensions = {}
+        for d, dimension in enumerate(rules.dimensions):
+            rule = self.rule_ids[i, d]
+            dimensions[dimension] = {
+                "original": rules.rule_original[rule] if rule >= 0 else "",
+                "new": rules.rule_new[rule] if rule >= 0 else "",
+                "pivot_required": bool(rule >= 0)
+            }
+        return dimensions
+
+    def adjusted_description(self, i):
+        """Return the original description with the labels of the pivoted dimensions replaced."""
+        # This is a simplistic approach - a real implementation would rewrite the description with NLP
+        adjusted = self.original_description
+        for dimension in self.dimensions(i).values():
+            if dimension["pivot_required"] and dimension["original"] in adjusted:
+                adjusted = adjusted.replace(dimension["original"], dimension["new"])
+        return adjusted
+
+def load_pivot_rules(path=PIVOT_RULES_PATH):
+    """
+    Load and compile a pivot rule set, once per process.
+
+    Args:
+        path: Path of the rule set; a relative path is relative to this module
+
+    Returns:
+        The compiled PivotRules
+    """
+    path = Path(path)
+    if not path.is_absolute():
+        path = Path(__file__).resolve().parent / path
+    with _lock:
+        if str(path) not in _rule_sets:
+            with open(path, "r") as f:
+                _rule_sets[str(path)] = PivotRules(json.load(f))
+        return _rule_sets[str(path)]
@@ -0,0 +1,163 @@
+import cProfile
+import importlib.util
+import io
+import json
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from config import PROFILE_DIR, PROFILE_TOP_ENTRIES
+
+PROFILE_SAMPLERS = ("cprofile", "pyinstrument")
+
+class NullProfiler:
+    """Stand-in for RunProfiler when profiling is off; its phases cost a single call."""
+
+    enabled = False
+    _phase = nullcontext()
+
+    def phase(self, name):
+        return self._phase
+
+    def close(self):
+        return None
+
+NULL_PROFILER = NullProfiler()
+
+class RunProfiler:
+    """
+    Profiles the phases of one workshop run: configuration loading, agent
+    and task creation, each task's prompt, crew and kickoff, each progress
+    report and the final report.
+
+    Every phase is profiled on its own with cProfile (or sampled with
+    pyinstrument when installed), and tracemalloc snapshots taken before and
+    after it give the phase's top allocation sites. For each phase the
+    directory receives NN_<phase>.prof (pstats, loadable by snakeviz or
+    pstats.Stats), NN_<phase>.txt (top functions by cumulative time) and
+    NN_<phase>.alloc.txt (top allocation sites); summary.json and summary.txt
+    list the wall time, CPU time and memory of all phases.
+
+    Only the thread that enters a phase is profiled, and a phase entered
+    inside another one is counted as part of the outer phase.
+    """
+
+    enabled = True
+
+    def __init__(self, run_id, directory=None, sampler="cprofile", memory=True, top=PROFILE_TOP_ENTRIES):
+        if sampler not in PROFILE_SAMPLERS:
+            raise ValueError(f"Unknown profile sampler '{sampler}'. Expected one of {', '.join(PROFILE_SAMPLERS)}")
+        if sampler == "pyinstrument" and importlib.util.find_spec("pyinstrument") is None:
+            print("Sampling profiles require pyinstrument (pip install pyinstrument); using cProfile")
+            sampler = "cprofile"
+        self.sampler = sampler
+        self.memory = memory
+        self.top = top
+        self.directory = Path(directory or Path(PROFILE_DIR) / run_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.phases = []
+        self._active = None
+        self._started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            # Keep a few frames per allocation so the sites point past helper functions
+            tracemalloc.start(5)
+            self._started_tracemalloc = True
+
+    @contextmanager
+    def phase(self, name):
+        """Profile the enclosed block as one phase of the run."""
+        if self._active is not None:
+            yield
+            return
+        self._active = name
+        index = len(self.phases) + 1
+        stem = f"{index:02d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}"
+
+        before = None
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        profile = self._start_sampler()
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_started
+            cpu_seconds = time.process_time() - cpu_started
+            self._stop_sampler(profile, stem)
+            entry = {"phase": name, "file": stem, "wall_seconds": wall_seconds, "cpu_seconds": cpu_seconds}
+            if before is not None:
+                memory_after, peak = tracemalloc.get_traced_memory()
+                entry["memory_net_bytes"] = memory_after - memory_before
+                entry["memory_peak_bytes"] = max(0, peak - memory_before)
+                self._write_allocations(before, tracemalloc.take_snapshot(), stem)
+            self.phases.append(entry)
+            self._active = None
+
+    def _start_sampler(self):
+        if self.sampler == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profile = Profiler(interval=0.001)
+            profile.start()
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+        return profile
+
+    def _stop_sampler(self, profile, stem):
+        if self.sampler == "pyinstrument":
+            profile.stop()
+            (self.directory / f"{stem}.txt").write_text(profile.output_text(unicode=True), encoding="utf-8")
+            (self.directory / f"{stem}.html").write_text(profile.output_html(), encoding="utf-8")
+            return
+        profile.disable()
+        profile.dump_stats(self.directory / f"{stem}.prof")
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+        (self.directory / f"{stem}.txt").write_text(text.getvalue(), encoding="utf-8")
+
+    def _write_allocations(self, before, after, stem):
+        # Leave out what the profiler itself allocates
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                  tracemalloc.Filter(False, cProfile.__file__), tracemalloc.Filter(False, pstats.__file__)]
+        differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        lines = [f"Top {self.top} allocation sites by net growth during the phase:\n"]
+        for difference in differences[:self.top]:
+            frame = difference.traceback[0]
+            lines.append(f"{difference.size_diff / 1024:+10.1f} KiB {difference.count_diff:+8d} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        (self.directory / f"{stem}.alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def summary_lines(self):
+        """Return the per-phase summary table as lines of text, slowest phases first."""
+        lines = [f"{'Phase':<40} {'Wall s':>9} {'CPU s':>9} {'Net KiB':>10} {'Peak KiB':>10}"]
+        for entry in sorted(self.phases, key=lambda entry: -entry["wall_seconds"]):
+            lines.append(f"{entry['phase'][:40]:<40} {entry['wall_seconds']:>9.3f} {entry['cpu_seconds']:>9.3f} "
+                         f"{entry.get('memory_net_bytes', 0) / 1024:>10.1f} "
+                         f"{entry.get('memory_peak_bytes', 0) / 1024:>10.1f}")
+        return lines
+
+    def close(self):
+        """
+        Write the summary of all phases and stop tracing allocations.
+
+        Returns:
+            Path of the profile directory
+        """
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        (self.directory / "summary.json").write_text(
+            json.dumps({"sampler": self.sampler, "phases": self.phases}, indent=2), encoding="utf-8")
+        lines = self.summary_lines()
+        (self.directory / "summary.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        print(f"\nProfile of {len(self.phases)} phases written to {self.directory}")
+        for line in lines[:11]:
+            print(line)
+        return self.directory
@@ -0,0 +1,71 @@
+import re
+import textwrap
+
+# Matches {name} and {name.attribute} slots; JSON braces and other text are left alone
+SLOT_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?)\}")
+
+def compact_whitespace(text):
+    """Dedent a prompt fragment, strip trailing spaces and collapse runs of blank lines."""
+    text = textwrap.dedent(text).strip()
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+def output_slot(task_id):
+    """Return the slot name that refers to the output of an upstream task."""
+    return f"{task_id}_task.output"
+
+class PromptTemplate:
+    """
+    A prompt text compiled once into literal parts and named slots.
+
+    Rendering only joins the parts, so slot values are never scanned for
+    placeholders again (upstream outputs may contain braces of their own).
+    """
+
+    def __init__(self, text):
+        self.literals = []
+        self.slot_names = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.literals.append(text[position:match.start()])
+            self.slot_names.append(match.group(1))
+            position = match.end()
+        self.literals.append(text[position:])
+
+    @property
+    def slots(self):
+        """Names of the slots in the template, in order of first appearance."""
+        return tuple(dict.fromkeys(self.slot_names))
+
+    def render(self, values, default=None):
+        """
+        Fill the slots of the template.
+
+        Args:
+            values: Dictionary of slot values
+            default: Callable returning the text for a slot without a value;
+                missing slots are kept as placeholders when not given
+
+        Returns:
+            The rendered text
+        """
+        parts = [self.literals[0]]
+        for slot, literal in zip(self.slot_names, self.literals[1:]):
+            if slot in values:
+                parts.append(str(values[slot]))
+            else:
+                parts.append(default(slot) if default else f"{{{slot}}}")
+            parts.append(literal)
+        return "".join(parts)
+
+    def partial(self, values):
+        """Return a new template with some of the slots filled in and the others kept."""
+        template = PromptTemplate("")
+        template.literals = [self.literals[0]]
+        for slot, literal in zip(self.slot_names, self.literals[1:]):
+            if slot in values:
+                template.literals[-1] += str(values[slot]) + literal
+            else:
+                template.slot_names.append(slot)
+                template.literals.append(literal)
+        return template
@@ -0,0 +1,325 @@
+import argparse
+from contextlib import contextmanager
+import gzip
+import hashlib
+import importlib.util
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from config import REPORT_ARCHIVE_CHUNK_CHARS, REPORT_ARCHIVE_PATH
+from utils import atomic_writer
+
+_zstd = None
+if importlib.util.find_spec("zstandard") is not None:
+    import zstandard as _zstd
+
+ARCHIVE_CODECS = ("zstd", "gzip")
+FINAL = "final"
+
+# Lines that start a section; chunks break before them so a section that
+# reappears in later reports maps to the same chunk
+_SECTION_START = re.compile(r"#{1,3} |<a id=")
+
+_PROGRESS_FILE = re.compile(r"^workshop_progress_(?P<run_id>.+)_step(?P<step>[0-9]+)\.md$")
+_FINAL_FILE = re.compile(r"^workshop_final_(?P<run_id>.+)\.md$")
+
+def _iter_lines(pieces):
+    buffered = ""
+    for piece in pieces:
+        buffered += piece
+        if "\n" in buffered:
+            *lines, buffered = buffered.split("\n")
+            for line in lines:
+                yield line + "\n"
+    if buffered:
+        yield buffered
+
+def _copied(pieces, f):
+    for piece in pieces:
+        f.write(piece)
+        yield piece
+
+def iter_report_chunks(pieces, max_chars=REPORT_ARCHIVE_CHUNK_CHARS):
+    """
+    Split a report into content-defined chunks.
+
+    A chunk starts at every section heading (#, ## or ###) or step anchor,
+    and a section longer than max_chars is cut at the next line boundary.
+    Chunk boundaries therefore depend on the content only, so the sections a
+    progress report repeats from the previous step become identical chunks.
+
+    Args:
+        pieces: The report as a string or an iterable of strings
+    """
+    chunk, size = [], 0
+    for line in _iter_lines([pieces] if isinstance(pieces, str) else pieces):
+        if chunk and (size >= max_chars or _SECTION_START.match(line)):
+            yield "".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line)
+    if chunk:
+        yield "".join(chunk)
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return _zstd.ZstdCompressor(level=9).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def _decompress(data, codec):
+    if codec == "raw":
+        return data
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("This archive has zstd-compressed chunks; install zstandard (pip install zstandard)")
+        return _zstd.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class ReportArchive:
+    """
+    Compressed, deduplicated store of workshop reports.
+
+    Each progress report repeats everything of the one before it, so a run
+    writing one file per step stores its content many times over. The
+    archive splits every report into content-defined chunks (see
+    iter_report_chunks), keeps each distinct chunk once, addressed by its
+    SHA-256 and compressed with zstd (when zstandard is installed) or gzip,
+    and records a report as its list of chunk hashes. Chunks are shared
+    between all reports and runs in the archive, and any stored report can
+    be reconstructed on demand.
+    """
+
+    def __init__(self, path=REPORT_ARCHIVE_PATH, timeout=30.0, codec=None):
+        if codec is None:
+            codec = "zstd" if _zstd is not None else "gzip"
+        if codec not in ARCHIVE_CODECS:
+            raise ValueError(f"Unknown archive codec '{codec}'. Expected one of {', '.join(ARCHIVE_CODECS)}")
+        if codec == "zstd" and _zstd is None:
+            print("zstd compression requires zstandard (pip install zstandard); using gzip")
+            codec = "gzip"
+        self.codec = codec
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "hash TEXT PRIMARY KEY, codec TEXT NOT NULL, size INTEGER NOT NULL, data BLOB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "run_id TEXT NOT NULL, name TEXT NOT NULL, chunks TEXT NOT NULL, size INTEGER NOT NULL, "
+                "sha256 TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (run_id, name))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def report_name(step=None):
+        """Return the name a report is stored under: "step<N>" for progress reports, "final" for step None."""
+        return FINAL if step is None else f"step{int(step)}"
+
+    def put(self, run_id, pieces, step=None, copy_to=None):
+        """
+        Store a report of a run, replacing any earlier version of it.
+
+        Args:
+            run_id: ID of the run
+            pieces: The report as a string or an iterable of strings, e.g. a streamed report
+            step: Number of completed steps of a progress report, or None for the final report
+            copy_to: Optional open file that the report is also written to as it streams in
+
+        Returns:
+            Dictionary with the report's size and chunks, and the chunks and compressed bytes new to the archive
+        """
+        if copy_to is not None:
+            pieces = _copied([pieces] if isinstance(pieces, str) else pieces, copy_to)
+        with self._connect() as conn:
+            return self._put(conn, run_id, pieces, step)
+
+    def put_many(self, reports):
+        """
+        Store many reports in one transaction, e.g. to migrate a reports directory.
+
+        Args:
+            reports: Iterable of (run_id, pieces, step) tuples, as for put()
+        """
+        with self._connect() as conn:
+            for run_id, pieces, step in reports:
+                self._put(conn, run_id, pieces, step)
+
+    def _put(self, conn, run_id, pieces, step):
+        hashes, new_chunks, size = [], {}, 0
+        digest = hashlib.sha256()
+        for chunk in iter_report_chunks(pieces):
+            data = chunk.encode("utf-8")
+            digest.update(data)
+            size += len(data)
+            chunk_hash = hashlib.sha256(data).hexdigest()
+            hashes.append(chunk_hash)
+            new_chunks.setdefault(chunk_hash, data)
+
+        # Only chunks the archive does not have yet are compressed
+        candidates = list(new_chunks)
+        for n in range(0, len(candidates), 500):
+            batch = candidates[n:n + 500]
+            for row in conn.execute(f"SELECT hash FROM chunks WHERE hash IN ({', '.join('?' * len(batch))})", batch):
+                del new_chunks[row[0]]
+        stored_bytes = 0
+        for chunk_hash, data in new_chunks.items():
+            codec, compressed = self.codec, _compress(data, self.codec)
+            if len(compressed) >= len(data):
+                codec, compressed = "raw", data
+            stored_bytes += len(compressed)
+            conn.execute("INSERT OR IGNORE INTO chunks (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                         (chunk_hash, codec, len(data), compressed))
+        conn.execute(
+            "INSERT OR REPLACE INTO reports (run_id, name, chunks, size, sha256, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, self.report_name(step), " ".join(hashes), size, digest.hexdigest(), time.time())
+        )
+        return {"size": size, "chunks": len(hashes), "new_chunks": len(new_chunks), "stored_bytes": stored_bytes}
+
+    def iter_report(self, run_id, step=None):
+        """
+        Reconstruct a stored report chunk by chunk.
+
+        Args:
+            run_id: ID of the run
+            step: Number of completed steps of the progress report, or None for the final report
+
+        Raises:
+            KeyError: If the archive has no such report
+            ValueError: If the reconstructed report does not match its stored checksum
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT chunks, sha256 FROM reports WHERE run_id = ? AND name = ?",
+                               (run_id, self.report_name(step))).fetchone()
+            if row is None:
+                raise KeyError(f"No report '{self.report_name(step)}' of run '{run_id}' in the archive")
+            digest = hashlib.sha256()
+            for chunk_hash in row[0].split():
+                codec, data = conn.execute("SELECT codec, data FROM chunks WHERE hash = ?", (chunk_hash,)).fetchone()
+                data = _decompress(data, codec)
+                digest.update(data)
+                yield data.decode("utf-8")
+        if digest.hexdigest() != row[1]:
+            raise ValueError(f"Report '{self.report_name(step)}' of run '{run_id}' is corrupt")
+
+    def read(self, run_id, step=None):
+        """Return a stored report as text (see iter_report)."""
+        return "".join(self.iter_report(run_id, step))
+
+    def export(self, run_id, path, step=None):
+        """Write a stored report to a markdown file."""
+        with atomic_writer(path) as f:
+            f.writelines(self.iter_report(run_id, step))
+        return Path(path)
+
+    def reports(self, run_id=None):
+        """
+        List the stored reports.
+
+        Returns:
+            List of dictionaries with run_id, name, size and created_at, by run and step
+        """
+        query = "SELECT run_id, name, size, created_at FROM reports"
+        with self._connect() as conn:
+            rows = conn.execute(query + (" WHERE run_id = ?" if run_id else ""), (run_id,) if run_id else ()).fetchall()
+        reports = [{"run_id": row[0], "name": row[1], "size": row[2], "created_at": row[3]} for row in rows]
+        return sorted(reports, key=lambda report: (report["run_id"], report["name"] == FINAL,
+                                                   int(report["name"][4:] or 0) if report["name"] != FINAL else 0))
+
+    def stats(self):
+        """Return the number of runs, reports and chunks, and the logical and stored size in bytes."""
+        with self._connect() as conn:
+            runs, reports, logical = conn.execute(
+                "SELECT COUNT(DISTINCT run_id), COUNT(*), COALESCE(SUM(size), 0) FROM reports").fetchone()
+            chunks, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM chunks").fetchone()
+        return {"runs": runs, "reports": reports, "chunks": chunks, "logical_bytes": logical, "stored_bytes": stored}
+
+def migrate_reports(reports_dir="reports", archive=None, delete=False):
+    """
+    Move the report files of a reports directory into the archive.
+
+    Every workshop_progress_<run_id>_step<N>.md and workshop_final_<run_id>.md
+    is stored and read back from the archive; with delete, the file is only
+    removed once its reconstruction matches it byte for byte.
+
+    Returns:
+        Dictionary with the number of files migrated and deleted and their total size in bytes
+    """
+    archive = archive or ReportArchive()
+    runs = {}
+    for path in sorted(Path(reports_dir).glob("workshop_*.md")):
+        match = _PROGRESS_FILE.match(path.name) or _FINAL_FILE.match(path.name)
+        if match:
+            step = int(match.group("step")) if "step" in match.groupdict() else None
+            runs.setdefault(match.group("run_id"), []).append((path, step))
+
+    result = {"files": 0, "deleted": 0, "bytes": 0}
+    for run_id, files in runs.items():
+        # One transaction per run
+        texts = [path.read_text(encoding="utf-8") for path, _ in files]
+        archive.put_many((run_id, text, step) for (_, step), text in zip(files, texts))
+        result["files"] += len(files)
+        result["bytes"] += sum(len(text.encode("utf-8")) for text in texts)
+        if delete:
+            for (path, step), text in zip(files, texts):
+                if archive.read(run_id, step) != text:
+                    raise ValueError(f"{path} does not match its archived copy; it was not deleted")
+                path.unlink()
+                result["deleted"] += 1
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store, list and reconstruct workshop reports in the "
+                                                 "compressed, deduplicated report archive.")
+    parser.add_argument("--archive", default=REPORT_ARCHIVE_PATH, help="Path of the archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Move the report files of a reports directory into the archive")
+    migrate_parser.add_argument("--reports-dir", default="reports", help="Directory with the report files")
+    migrate_parser.add_argument("--delete", action="store_true",
+                                help="Delete each file once its archived copy has been verified")
+
+    list_parser = subparsers.add_parser("list", help="List the archived reports")
+    list_parser.add_argument("run_id", nargs="?", help="Only list the reports of this run")
+
+    show_parser = subparsers.add_parser("show", help="Reconstruct an archived report")
+    show_parser.add_argument("run_id", help="ID of the run")
+    show_parser.add_argument("--step", type=int, help="Progress report after this many steps (default: final report)")
+    show_parser.add_argument("--output", "-o", help="Write the report to this file instead of printing it")
+
+    subparsers.add_parser("stats", help="Print the size of the archive")
+    args = parser.parse_args()
+
+    archive = ReportArchive(args.archive)
+    if args.command == "migrate":
+        result = migrate_reports(args.reports_dir, archive, delete=args.delete)
+        stats = archive.stats()
+        print(f"Migrated {result['files']} report files ({result['bytes']:,} bytes), deleted {result['deleted']}")
+        print(f"Archive: {stats['reports']} reports of {stats['runs']} runs in {stats['stored_bytes']:,} bytes "
+              f"of chunks ({stats['logical_bytes']:,} bytes of reports)")
+    elif args.command == "list":
+        for report in archive.reports(args.run_id):
+            print(f"{report['run_id']}  {report['name']:<8} {report['size']:>10,} bytes")
+    elif args.command == "show":
+        if args.output:
+            print(f"Written to {archive.export(args.run_id, args.output, args.step)}")
+        else:
+            print(archive.read(args.run_id, args.step), end="")
+    else:
+        stats = archive.stats()
+        ratio = stats["logical_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+        print(f"{stats['runs']} runs, {stats['reports']} reports, {stats['chunks']} distinct chunks")
+        print(f"{stats['logical_bytes']:,} bytes of reports stored in {stats['stored_bytes']:,} bytes ({ratio:.1f}x)")
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+import sqlite3
+import time
+from pathlib import Path
+
+from config import RESPONSE_CACHE_PATH
+
+class ResponseCache:
+    """
+    On-disk LLM response cache backed by SQLite.
+
+    SQLite handles locking between processes, so one cache file can be shared
+    by every worker of a workshop pool. Each operation opens a short-lived
+    connection, which keeps the object cheap to pickle into worker processes.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Return the cached response for a key, or None if it is not cached."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, response):
+        """Store a response, replacing any previous value for the key."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
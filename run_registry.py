@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import psutil
+
+from config import RUN_REGISTRY_PATH, MAX_CONCURRENT_WORKSHOPS
+
+class RunRegistry:
+    """
+    Process-safe registry of workshop runs backed by SQLite.
+
+    Runs register themselves before starting, wait for a free slot when the
+    configured concurrency limit is reached, and record their outcome when
+    they finish. Runs whose process died without reporting back are marked
+    as failed the next time the registry is inspected.
+    """
+
+    def __init__(self, path=RUN_REGISTRY_PATH, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, pid INTEGER, venture_idea TEXT, config_file TEXT, "
+                "status TEXT NOT NULL, created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "cost REAL, report_path TEXT, error TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_latencies ("
+                "run_id TEXT NOT NULL, task_id TEXT NOT NULL, seconds REAL NOT NULL, recorded_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS task_latencies_run ON task_latencies (run_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def register(self, run_id, venture_idea, config_file):
+        """Add a run to the registry in the queued state."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, pid, venture_idea, config_file, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (run_id, os.getpid(), venture_idea, config_file, time.time())
+            )
+
+    def _reap_dead_runs(self, conn):
+        rows = conn.execute("SELECT run_id, pid FROM runs WHERE status IN ('queued', 'running')").fetchall()
+        for run_id, pid in rows:
+            if not psutil.pid_exists(pid):
+                conn.execute(
+                    "UPDATE runs SET status = 'failed', finished_at = ?, error = ? WHERE run_id = ?",
+                    (time.time(), "Process exited without reporting a result", run_id)
+                )
+
+    def acquire_slot(self, run_id, max_concurrent=MAX_CONCURRENT_WORKSHOPS, poll_interval=2.0):
+        """
+        Block until fewer than max_concurrent runs are active, then mark this run as running.
+
+        Args:
+            run_id: ID of a registered run
+            max_concurrent: Maximum number of runs allowed to execute at the same time
+            poll_interval: Seconds to wait between checks while queued
+
+        Returns:
+            True once the slot is acquired, False if the run left the queue (e.g. it was cancelled)
+        """
+        announced = False
+        while True:
+            with self._connect() as conn:
+                # BEGIN IMMEDIATE serializes slot checks across processes
+                conn.execute("BEGIN IMMEDIATE")
+                status = conn.execute("SELECT status FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+                if not status or status[0] != "queued":
+                    return False
+                self._reap_dead_runs(conn)
+                running = conn.execute("SELECT COUNT(*) FROM runs WHERE status = 'running'").fetchone()[0]
+                if running < max_concurrent:
+                    conn.execute(
+                        "UPDATE runs SET status = 'running', pid = ?, started_at = ? WHERE run_id = ?",
+                        (os.getpid(), time.time(), run_id)
+                    )
+                    return True
+
+            if not announced:
+                print(f"{running} workshop(s) already running (limit {max_concurrent}). Run {run_id} is queued...")
+                announced = True
+            time.sleep(poll_interval)
+
+    def finish(self, run_id, status, cost=None, report_path=None, error=None):
+        """Record the final status of a run."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, cost = ?, report_path = ?, error = ? WHERE run_id = ?",
+                (status, time.time(), cost, report_path, error, run_id)
+            )
+
+    def active_runs(self):
+        """Return the queued and running runs as a list of dictionaries."""
+        with self._connect() as conn:
+            self._reap_dead_runs(conn)
+            rows = conn.execute(
+                "SELECT run_id, pid, venture_idea, status, started_at FROM runs "
+                "WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [
+            {"run_id": run_id, "pid": pid, "venture_idea": venture_idea, "status": status, "started_at": started_at}
+            for run_id, pid, venture_idea, status, started_at in rows
+        ]
+
+    def record_task(self, run_id, task_id, seconds):
+        """Record how long a task of a run took, for estimating the length of future runs."""
+        with self._connect() as conn:
+            conn.execute("INSERT INTO task_latencies (run_id, task_id, seconds, recorded_at) VALUES (?, ?, ?, ?)",
+                         (run_id, task_id, seconds, time.time()))
+
+    def expected_duration(self, config_file, samples=20):
+        """
+        Estimate how long a run of a configuration takes from its past task latencies.
+
+        Args:
+            config_file: Configuration file of the run
+            samples: Number of recent latencies of each task to take the median of
+
+        Returns:
+            Sum of the median latency of each task in seconds, or None without history
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_latencies.task_id, task_latencies.seconds FROM task_latencies "
+                "JOIN runs ON runs.run_id = task_latencies.run_id WHERE runs.config_file = ? "
+                "ORDER BY task_latencies.recorded_at DESC",
+                (config_file,)
+            ).fetchall()
+        latencies = {}
+        for task_id, seconds in rows:
+            if len(latencies.setdefault(task_id, [])) < samples:
+                latencies[task_id].append(seconds)
+        if not latencies:
+            return None
+        return sum(sorted(values)[len(values) // 2] for values in latencies.values())
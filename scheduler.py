@@ -0,0 +1,274 @@
+import itertools
+import threading
+import time
+
+from config import MAX_CONCURRENT_WORKSHOPS, SCHEDULER_DEFAULT_EXPECTED_SECONDS, SCHEDULER_LLM_CALLS_PER_MINUTE, \
+    SCHEDULER_TENANT_WEIGHTS
+
+DEFAULT_TENANT = "default"
+
+def parse_tenant_weights(text):
+    """
+    Parse tenant weights given on the command line.
+
+    Args:
+        text: Comma-separated tenant=weight pairs, e.g. "acme=2,globex=1"
+
+    Returns:
+        Dictionary of tenant to weight
+
+    Raises:
+        ValueError: If a pair is malformed or a weight is not positive
+    """
+    weights = {}
+    for pair in filter(None, (part.strip() for part in (text or "").split(","))):
+        tenant, separator, weight = pair.partition("=")
+        if not separator or not tenant.strip():
+            raise ValueError(f"Expected tenant=weight, got '{pair}'")
+        weights[tenant.strip()] = float(weight)
+        if weights[tenant.strip()] <= 0:
+            raise ValueError(f"The weight of tenant '{tenant.strip()}' must be positive")
+    return weights
+
+class WorkshopScheduler:
+    """
+    Decides which submitted workshop runs next when more are submitted than can run at once.
+
+    Each tenant has its own queue. The next run is picked in three steps:
+
+    1. The highest priority among all queued runs goes first.
+    2. Among the tenants with a run at that priority, weighted fair queuing
+       picks the tenant that has received the least service for its weight:
+       every started run advances its tenant's virtual time by its expected
+       duration divided by the tenant's weight, and the tenant with the
+       lowest virtual time is next. A tenant that was idle rejoins at the
+       lowest virtual time of the active tenants, so it cannot claim the
+       time it was not using.
+    3. Within the tenant's queue, the shortest expected job goes first
+       (ties in submission order). Expected durations come from the run
+       registry's task latencies of the run's configuration.
+
+    The global LLM rate budget is shared the same way: llm_gate() returns a
+    per-tenant gate for the runs' meters that hands out calls from one token
+    bucket, always to the waiting tenant with the lowest LLM virtual time.
+
+    The scheduler only makes decisions; the caller starts the runs that
+    dispatch() returns and calls release() when they finish. It is
+    thread-safe.
+    """
+
+    def __init__(self, max_running=MAX_CONCURRENT_WORKSHOPS, tenant_weights=None,
+                 llm_calls_per_minute=SCHEDULER_LLM_CALLS_PER_MINUTE, registry=None,
+                 default_expected_seconds=SCHEDULER_DEFAULT_EXPECTED_SECONDS):
+        self.max_running = max_running
+        self.tenant_weights = {**SCHEDULER_TENANT_WEIGHTS, **(tenant_weights or {})}
+        self.llm_calls_per_minute = llm_calls_per_minute
+        self.registry = registry
+        self.default_expected_seconds = default_expected_seconds
+        self.queued = {}
+        self.running = {}
+        self._virtual_time = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.tenant_stats = {}
+
+        # Token bucket of the LLM rate budget, holding at most one second of calls
+        self._llm_condition = threading.Condition()
+        self._llm_rate = llm_calls_per_minute / 60 if llm_calls_per_minute else None
+        self._llm_capacity = max(1.0, self._llm_rate or 0)
+        self._llm_tokens = self._llm_capacity
+        self._llm_refilled_at = time.monotonic()
+        self._llm_waiters = []
+        self._llm_virtual_time = {}
+
+    def weight(self, tenant):
+        return self.tenant_weights.get(tenant, 1.0)
+
+    def expected_seconds(self, config_file):
+        """Return the expected duration of a run of a configuration, from history or the default."""
+        if self.registry is not None and config_file:
+            expected = self.registry.expected_duration(config_file)
+            if expected:
+                return expected
+        return self.default_expected_seconds
+
+    def _stats(self, tenant):
+        return self.tenant_stats.setdefault(tenant, {"submitted": 0, "started": 0, "finished": 0, "cancelled": 0,
+                                                     "wait_seconds": 0.0, "llm_calls": 0, "llm_wait_seconds": 0.0})
+
+    def submit(self, run_id, tenant=DEFAULT_TENANT, priority=0, config_file=None):
+        """
+        Queue a run.
+
+        Args:
+            run_id: ID of the run
+            tenant: Tenant the run belongs to
+            priority: Higher priorities start first, whatever their tenant
+            config_file: Configuration of the run, for its expected duration
+
+        Returns:
+            The run's ticket, a dictionary with run_id, tenant, priority and expected_seconds
+        """
+        tenant = tenant or DEFAULT_TENANT
+        expected = self.expected_seconds(config_file)
+        with self._lock:
+            active = self._active_tenants()
+            if tenant not in active:
+                # Rejoin at the current virtual time instead of spending credit saved while idle
+                floor = min((self._virtual_time.get(other, 0.0) for other in active), default=0.0)
+                self._virtual_time[tenant] = max(self._virtual_time.get(tenant, 0.0), floor)
+            ticket = {"run_id": run_id, "tenant": tenant, "priority": int(priority or 0), "expected_seconds": expected,
+                      "submitted_at": time.time(), "seq": next(self._counter), "started_at": None}
+            self.queued[run_id] = ticket
+            self._stats(tenant)["submitted"] += 1
+        return dict(ticket)
+
+    def _active_tenants(self):
+        return {ticket["tenant"] for ticket in (*self.queued.values(), *self.running.values())}
+
+    def _next_ticket(self):
+        top = max(ticket["priority"] for ticket in self.queued.values())
+        candidates = [ticket for ticket in self.queued.values() if ticket["priority"] == top]
+        tenant = min({ticket["tenant"] for ticket in candidates},
+                     key=lambda name: (self._virtual_time.get(name, 0.0), name))
+        return min((ticket for ticket in candidates if ticket["tenant"] == tenant),
+                   key=lambda ticket: (ticket["expected_seconds"], ticket["seq"]))
+
+    def dispatch(self):
+        """
+        Pick the queued runs to start now, as long as fewer than max_running are running.
+
+        Returns:
+            List of the tickets of the runs to start, in order, with their queue wait_seconds
+        """
+        started = []
+        with self._lock:
+            while self.queued and len(self.running) < self.max_running:
+                ticket = self.queued.pop(self._next_ticket()["run_id"])
+                ticket["started_at"] = time.time()
+                ticket["wait_seconds"] = ticket["started_at"] - ticket["submitted_at"]
+                self.running[ticket["run_id"]] = ticket
+                self._virtual_time[ticket["tenant"]] = (self._virtual_time.get(ticket["tenant"], 0.0)
+                                                        + ticket["expected_seconds"] / self.weight(ticket["tenant"]))
+                stats = self._stats(ticket["tenant"])
+                stats["started"] += 1
+                stats["wait_seconds"] += ticket["wait_seconds"]
+                started.append(dict(ticket))
+        return started
+
+    def release(self, run_id):
+        """
+        Forget a run that finished or was cancelled, freeing its slot.
+
+        Returns:
+            The run's ticket with "state" set to "finished" (it was running) or "cancelled"
+            (it was still queued), or None if the scheduler does not know the run
+        """
+        with self._lock:
+            if run_id in self.running:
+                ticket = self.running.pop(run_id)
+                ticket["state"] = "finished"
+                self._stats(ticket["tenant"])["finished"] += 1
+            elif run_id in self.queued:
+                ticket = self.queued.pop(run_id)
+                ticket["state"] = "cancelled"
+                ticket["wait_seconds"] = time.time() - ticket["submitted_at"]
+                self._stats(ticket["tenant"])["cancelled"] += 1
+            else:
+                return None
+            return ticket
+
+    def _dispatch_order(self):
+        # Replay dispatch() on copies of the queue and the virtual times
+        queued, virtual_time = dict(self.queued), dict(self._virtual_time)
+        order = []
+        try:
+            while self.queued:
+                ticket = self.queued.pop(self._next_ticket()["run_id"])
+                self._virtual_time[ticket["tenant"]] = (self._virtual_time.get(ticket["tenant"], 0.0)
+                                                        + ticket["expected_seconds"] / self.weight(ticket["tenant"]))
+                order.append(ticket)
+        finally:
+            self.queued, self._virtual_time = queued, virtual_time
+        return order
+
+    def queue_position(self, run_id):
+        """Return how many queued runs would start before a queued run, or None if it is not queued."""
+        with self._lock:
+            order = [ticket["run_id"] for ticket in self._dispatch_order()]
+        return order.index(run_id) if run_id in order else None
+
+    def snapshot(self):
+        """
+        Return the queues, running runs and per-tenant counters.
+
+        Returns:
+            Dictionary with max_running, llm_calls_per_minute, queued and running ticket lists
+            (queued in dispatch order) and per-tenant weight, virtual time and counters
+        """
+        with self._lock:
+            queued = self._dispatch_order()
+            tenants = {
+                tenant: {"weight": self.weight(tenant), "virtual_time": round(self._virtual_time.get(tenant, 0.0), 3),
+                         "queued": sum(1 for ticket in self.queued.values() if ticket["tenant"] == tenant),
+                         "running": sum(1 for ticket in self.running.values() if ticket["tenant"] == tenant),
+                         **stats}
+                for tenant, stats in self.tenant_stats.items()
+            }
+            return {"max_running": self.max_running, "llm_calls_per_minute": self.llm_calls_per_minute,
+                    "queued": [dict(ticket) for ticket in queued],
+                    "running": [dict(ticket) for ticket in self.running.values()], "tenants": tenants}
+
+    def llm_gate(self, tenant=DEFAULT_TENANT):
+        """
+        Return a callable that blocks until the tenant may make its next LLM call.
+
+        Pass it as the call_gate of a run's meter. Calls are granted from one
+        token bucket of llm_calls_per_minute for all tenants, each grant going
+        to the waiting tenant with the least LLM calls for its weight.
+
+        Returns:
+            The gate, or None without a global LLM rate budget
+        """
+        if not self._llm_rate:
+            return None
+        tenant = tenant or DEFAULT_TENANT
+        return lambda: self._acquire_llm_call(tenant)
+
+    def _refill_llm_tokens(self):
+        now = time.monotonic()
+        self._llm_tokens = min(self._llm_capacity, self._llm_tokens + (now - self._llm_refilled_at) * self._llm_rate)
+        self._llm_refilled_at = now
+
+    def _next_llm_waiter(self):
+        first = {}
+        for waiter in self._llm_waiters:
+            first.setdefault(waiter[0], waiter)
+        tenant = min(first, key=lambda name: (self._llm_virtual_time.get(name, 0.0), first[name][1]))
+        return first[tenant]
+
+    def _acquire_llm_call(self, tenant):
+        started = time.monotonic()
+        with self._llm_condition:
+            waiting = {waiter[0] for waiter in self._llm_waiters}
+            if tenant not in waiting:
+                floor = min((self._llm_virtual_time.get(other, 0.0) for other in waiting), default=0.0)
+                self._llm_virtual_time[tenant] = max(self._llm_virtual_time.get(tenant, 0.0), floor)
+            waiter = (tenant, next(self._counter))
+            self._llm_waiters.append(waiter)
+            try:
+                while True:
+                    self._refill_llm_tokens()
+                    if self._llm_tokens >= 1 and self._next_llm_waiter() == waiter:
+                        self._llm_tokens -= 1
+                        self._llm_virtual_time[tenant] += 1 / self.weight(tenant)
+                        break
+                    # Sleep until the next token, or until the tenant whose turn it is has taken it
+                    self._llm_condition.wait((1 - self._llm_tokens) / self._llm_rate if self._llm_tokens < 1 else None)
+            finally:
+                self._llm_waiters.remove(waiter)
+                self._llm_condition.notify_all()
+        with self._lock:
+            stats = self._stats(tenant)
+            stats["llm_calls"] += 1
+            stats["llm_wait_seconds"] += time.monotonic() - started
@@ -0,0 +1,85 @@
+import re
+import threading
+import time
+
+# Where the draft of the upstream output comes from: a quick call to the mini
+# model, or the partial output of the upstream task while it is still running
+SPECULATION_DRAFTS = ("mini", "partial")
+
+DEFAULT_SPECULATION = {
+    "enabled": False,
+    "draft": "mini",
+    "similarity_threshold": 0.5,
+    "min_partial_chars": 1500
+}
+
+def text_similarity(a, b):
+    """
+    Return the Jaccard similarity (0 to 1) of the word pairs of two texts.
+
+    Word pairs rather than single words make the check sensitive to changed
+    figures and stream names, not just to a shared vocabulary.
+    """
+    def shingles(text):
+        words = re.findall(r"\w+", text.lower())
+        return set(zip(words, words[1:])) or set(words)
+
+    a_shingles, b_shingles = shingles(a), shingles(b)
+    if not a_shingles and not b_shingles:
+        return 1.0
+    return len(a_shingles & b_shingles) / len(a_shingles | b_shingles)
+
+class SpeculativeTask:
+    """
+    A downstream task running ahead of its upstream task on a draft of the upstream output.
+
+    The speculative run has its own RunMeter, so its usage can be charged to
+    the task once the speculation is resolved, whether it was committed or not.
+    """
+
+    def __init__(self, index, upstream_id, meter):
+        self.index = index
+        self.upstream_id = upstream_id
+        self.meter = meter
+        self.draft = None
+        self.result = None
+        self.error = None
+        self.committed = False
+        self.started_at = time.time()
+        self.kickoff_at = None
+        self.finished_at = None
+        self.roster_tokens_saved_estimate = 0
+        self._thread = None
+
+    def start(self, target):
+        """Run target in a background thread; its return value becomes the result."""
+        def run():
+            try:
+                self.result = target(self)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.finished_at = time.time()
+
+        self._thread = threading.Thread(target=run, name=f"speculation-{self.index}", daemon=True)
+        self._thread.start()
+
+    @property
+    def aborted(self):
+        return self.meter.aborted is not None
+
+    def abort(self, reason):
+        """Stop the speculative run at its next LLM call."""
+        if not self.aborted:
+            self.meter.abort(reason)
+
+    def wait(self):
+        """Wait for the speculative run to finish."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def seconds_saved(self, upstream_finished_at):
+        """Wall-clock time of the downstream task that overlapped with its upstream task."""
+        if self.kickoff_at is None or self.finished_at is None:
+            return 0.0
+        return max(0.0, min(self.finished_at, upstream_finished_at) - self.kickoff_at)
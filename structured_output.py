@@ -0,0 +1,168 @@
+import importlib.util
+import json
+import re
+
+from utils import format_markdown_table
+
+_jsonschema = None
+if importlib.util.find_spec("jsonschema") is not None:
+    import jsonschema as _jsonschema
+
+def resolve_output_schema(config, task_config):
+    """
+    Return the JSON schema of a task's output, or None if the task answers in free text.
+
+    A task's "output_schema" is either a schema object or the name of one in the
+    configuration's top-level "output_schemas".
+
+    Raises:
+        ValueError: If the task names a schema that is not defined
+    """
+    schema = task_config.get("output_schema")
+    if isinstance(schema, str):
+        schemas = config.get("output_schemas", {})
+        if schema not in schemas:
+            raise ValueError(f"Task '{task_config['id']}' uses the undefined output schema '{schema}'")
+        schema = schemas[schema]
+    return schema or None
+
+def schema_instructions(schema):
+    """Return the expected output that asks the agents for a JSON answer matching a schema."""
+    return ("A single JSON object and nothing else (no markdown, no code fences, no prose around it) "
+            "that is valid against this JSON schema: " + compact_json(schema))
+
+def compact_json(data):
+    """Serialize data as JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def _extract_json(text):
+    # Models occasionally wrap the object in a code fence or a sentence despite the instructions
+    fenced = re.search(r"```(?:json)?\s*(\{.*\})\s*```", text, re.DOTALL)
+    if fenced:
+        return fenced.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    return text[start:end + 1] if start != -1 and end > start else text
+
+_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool, "null": type(None)}
+
+def _validate(data, schema, path="$"):
+    """Check data against the common subset of JSON schema; used when jsonschema is not installed."""
+    expected = schema.get("type")
+    types = expected if isinstance(expected, list) else [expected] if expected else []
+    if types:
+        def matches(name):
+            if name == "integer":
+                return isinstance(data, int) and not isinstance(data, bool)
+            if name == "number":
+                return isinstance(data, (int, float)) and not isinstance(data, bool)
+            return isinstance(data, _TYPES.get(name, object))
+        if not any(matches(name) for name in types):
+            raise ValueError(f"{path}: expected {' or '.join(types)}, got {type(data).__name__}")
+    if "enum" in schema and data not in schema["enum"]:
+        raise ValueError(f"{path}: {data!r} is not one of {schema['enum']}")
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        if "minimum" in schema and data < schema["minimum"]:
+            raise ValueError(f"{path}: {data} is below the minimum of {schema['minimum']}")
+        if "maximum" in schema and data > schema["maximum"]:
+            raise ValueError(f"{path}: {data} is above the maximum of {schema['maximum']}")
+    if isinstance(data, dict):
+        for key in schema.get("required", []):
+            if key not in data:
+                raise ValueError(f"{path}: missing required property '{key}'")
+        properties = schema.get("properties", {})
+        for key, value in data.items():
+            if key in properties:
+                _validate(value, properties[key], f"{path}.{key}")
+            elif schema.get("additionalProperties") is False:
+                raise ValueError(f"{path}: unexpected property '{key}'")
+    if isinstance(data, list):
+        if "minItems" in schema and len(data) < schema["minItems"]:
+            raise ValueError(f"{path}: expected at least {schema['minItems']} items")
+        if "items" in schema:
+            for n, item in enumerate(data):
+                _validate(item, schema["items"], f"{path}[{n}]")
+
+def parse_structured_output(text, schema):
+    """
+    Parse and validate a task's JSON answer.
+
+    Validation uses jsonschema when it is installed, and otherwise a built-in
+    check of the common keywords (type, properties, required, items, enum,
+    minimum, maximum, minItems, additionalProperties).
+
+    Args:
+        text: The task's raw output
+        schema: The task's output schema
+
+    Returns:
+        The parsed data
+
+    Raises:
+        ValueError: If the output is not JSON or does not match the schema
+    """
+    try:
+        data = json.loads(_extract_json(text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Output is not valid JSON: {e}") from None
+    if _jsonschema is not None:
+        try:
+            _jsonschema.validate(data, schema)
+        except _jsonschema.ValidationError as e:
+            location = "$" + "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in e.absolute_path)
+            raise ValueError(f"{location}: {e.message}") from None
+    else:
+        _validate(data, schema)
+    return data
+
+def _title(key, schema):
+    return schema.get("title") or key.replace("_", " ").capitalize()
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return compact_json(value)
+    if isinstance(value, float):
+        return f"{value:,.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"{value:,}"
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+def _render(data, schema, level, lines):
+    properties = schema.get("properties", {})
+    # Properties in schema order, followed by any the schema does not list
+    keys = [key for key in properties if key in data] + [key for key in data if key not in properties]
+    for key in keys:
+        value, value_schema = data[key], properties.get(key, {})
+        title = _title(key, value_schema)
+        if isinstance(value, dict):
+            lines.append(f"{'#' * level} {title}\n")
+            _render(value, value_schema, min(level + 1, 6), lines)
+        elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            item_schema = value_schema.get("items", {})
+            columns = list(item_schema.get("properties", {}))
+            columns += [column for item in value for column in item if column not in columns]
+            columns = list(dict.fromkeys(columns))
+            headers = [_title(column, item_schema.get("properties", {}).get(column, {})) for column in columns]
+            rows = [[_cell(item.get(column, "")) for column in columns] for item in value]
+            lines.append(f"{'#' * level} {title}\n")
+            lines.append(format_markdown_table(headers, rows) + "\n")
+        elif isinstance(value, list):
+            lines.append(f"{'#' * level} {title}\n")
+            lines.append("\n".join(f"- {_cell(item)}" for item in value) + "\n")
+        else:
+            lines.append(f"**{title}:** {_cell(value)}\n")
+
+def render_markdown(data, schema):
+    """
+    Render a validated structured output as markdown.
+
+    Nested objects become sections, lists of objects become tables with one
+    column per item property, lists of values become bullet lists and other
+    values "**Title:** value" lines. Titles come from each property's "title",
+    or from its name.
+
+    Returns:
+        Markdown text starting with an Outcome heading, like the free-text outputs
+    """
+    lines = ["# Outcome\n"]
+    _render(data, schema, 2, lines)
+    return "\n".join(lines).rstrip() + "\n"
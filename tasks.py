@@ -1,89 +1,181 @@
 from crewai import Task
-import json
 
-def create_tasks(agents, venture_idea, config_file="workshop_config.json"):
+from config import OPENAI_MODEL
+from metering import count_tokens, truncate_tokens
+from prompt_templates import PromptTemplate, compact_whitespace, output_slot
+from structured_output import resolve_output_schema, schema_instructions
+from utils import load_config
+
+# Collaboration instructions appended to the first task
+TEAM_COLLABORATION_INSTRUCTIONS = compact_whitespace("""
+    IMPORTANT: FULL TEAM COLLABORATION REQUIRED
+
+    This is the first and most critical task of the workshop. ALL TEAM MEMBERS must actively participate.
+
+    Before finalizing your answer:
+    1. You MUST consult with EVERY other agent in the crew
+    2. Each agent must provide their unique perspective based on their role and expertise
+    3. Document each agent's contribution in your final output
+    4. Synthesize all perspectives into a cohesive recommendation
+    5. Only proceed when you have incorporated feedback from the entire team
+
+    Your final output must include a detailed collaboration section listing input from each agent.
+
+    The success of the entire workshop depends on getting this foundation right with full team input.
+    """)
+
+# Collaboration instructions appended to all other tasks
+COLLABORATIVE_INSTRUCTIONS = compact_whitespace("""
+    Important: This is a collaborative task. You should actively consult with other agents in the crew to get their perspectives and expertise. Consider the following:
+    1. Ask other agents for their input on specific aspects of the task
+    2. Request feedback on your initial ideas
+    3. Incorporate diverse viewpoints into your final output
+    4. Acknowledge contributions from other agents
+
+    The final output should represent a synthesis of the collective intelligence of the crew.
+    """)
+
+class TaskPrompt:
     """
-    Create all the tasks for the workshop based on a JSON configuration file.
+    The compiled description of one task, rendered with upstream outputs just before it runs.
+
+    Upstream outputs referenced by a {<id>_task.output} slot are inlined at the
+    slot; the other context tasks are added in a single context section at the
+    end, so no output is sent twice.
+    """
+
+    def __init__(self, task_id, template, context_ids, expected_output):
+        self.task_id = task_id
+        self.template = template
+        self.context_ids = list(context_ids)
+        self.expected_output = expected_output
+        slots = template.slots
+        self.inlined_ids = [context_id for context_id in self.context_ids if output_slot(context_id) in slots]
+        self.appended_ids = [context_id for context_id in self.context_ids if context_id not in self.inlined_ids]
+
+    def render(self, outputs, max_context_tokens=None, model=OPENAI_MODEL):
+        """
+        Render the task description with the outputs of its upstream tasks.
+
+        Args:
+            outputs: Dictionary of upstream task outputs with their task IDs as keys
+            max_context_tokens: Optional cap on the tokens of all upstream outputs together;
+                each output gets an equal share when the cap is exceeded
+            model: Model used to count tokens
+
+        Returns:
+            Tuple of (description, instructions, context) where instructions is the
+            description without the upstream outputs and context is the outputs alone
+        """
+        context_outputs = {context_id: outputs[context_id] for context_id in self.context_ids if context_id in outputs}
+
+        if max_context_tokens and context_outputs:
+            total_tokens = sum(count_tokens(output, model) for output in context_outputs.values())
+            if total_tokens > max_context_tokens:
+                share = max_context_tokens // len(context_outputs)
+                context_outputs = {
+                    context_id: truncate_tokens(output, share, model) + "\n[... truncated to fit the prompt budget]"
+                    for context_id, output in context_outputs.items()
+                }
+
+        def pending(slot):
+            return f"[{slot.replace('_task.output', '')} output, added when the task runs]"
+
+        values = {output_slot(context_id): output for context_id, output in context_outputs.items()}
+        description = self.template.render(values, default=pending)
+        instructions = self.template.render({}, default=lambda slot: "")
+
+        appended = [f"### {context_id}\n{context_outputs[context_id]}"
+                    for context_id in self.appended_ids if context_id in context_outputs]
+        if appended:
+            description += "\n\nContext from earlier steps:\n\n" + "\n\n".join(appended)
+
+        return description, instructions, "\n\n".join(context_outputs.values())
+
+def compile_task_prompts(venture_idea, config_file="workshop_config.json"):
+    """
+    Compile the description of every task once, with the run-wide slots already filled.
 
     Args:
-        agents: Dictionary of agents with their IDs as keys
         venture_idea: Description of the venture idea
         config_file: Path to the JSON configuration file
 
     Returns:
-        Dictionary of tasks with their IDs as keys
+        Dictionary of TaskPrompt objects with their task IDs as keys
     """
-    # Load the configuration file
-    with open(config_file, "r") as f:
-        config = json.load(f)
+    config = load_config(config_file)
 
-    # Get the negotiation instructions from the config
-    negotiation_instructions = config.get("negotiation_instructions", "")
+    run_values = {
+        "venture_idea": venture_idea,
+        "negotiation_instructions": compact_whitespace(config.get("negotiation_instructions", ""))
+    }
 
-    # Create a dictionary to store tasks
-    tasks = {}
-    task_objects = {}
-
-    # Create tasks based on the configuration
+    prompts = {}
     for i, task_config in enumerate(config["tasks"]):
-        # Replace placeholders in the description
-        description = task_config["description"]
-        description = description.replace("{venture_idea}", venture_idea)
-        description = description.replace("{negotiation_instructions}", negotiation_instructions)
-
-        # Replace task output references with actual task outputs
-        for context_task_id in task_config.get("context", []):
-            if context_task_id in task_objects:
-                placeholder = f"{{{context_task_id}_task.output}}"
-                description = description.replace(placeholder, f"{{{task_objects[context_task_id].output}}}")
-
-        # Special handling for the first task - full team collaboration
-        if i == 0:  # First task
-            team_collaboration_instructions = """
-            IMPORTANT: FULL TEAM COLLABORATION REQUIRED
-
-            This is the first and most critical task of the workshop. ALL TEAM MEMBERS must actively participate.
-
-            Before finalizing your answer:
-            1. You MUST consult with EVERY other agent in the crew
-            2. Each agent must provide their unique perspective based on their role and expertise
-            3. Document each agent's contribution in your final output
-            4. Synthesize all perspectives into a cohesive recommendation
-            5. Only proceed when you have incorporated feedback from the entire team
-
-            Your final output must include a detailed collaboration section listing input from each agent.
-
-            The success of the entire workshop depends on getting this foundation right with full team input.
-            """
-            description = description + "\n\n" + team_collaboration_instructions
-        else:  # All other tasks
-            collaborative_instructions = """
-            Important: This is a collaborative task. You should actively consult with other agents in the crew to get their perspectives and expertise. Consider the following:
-            1. Ask other agents for their input on specific aspects of the task
-            2. Request feedback on your initial ideas
-            3. Incorporate diverse viewpoints into your final output
-            4. Acknowledge contributions from other agents
-
-            The final output should represent a synthesis of the collective intelligence of the crew.
-            """
-            description = description + "\n\n" + collaborative_instructions
-
-        # Create the task
-        task = Task(
-            description=description,
-            agent=agents[task_config["agent_id"]],
-            expected_output=task_config["expected_output"],
-            context=[task_objects[context_id] for context_id in task_config.get("context", []) if context_id in task_objects],
-            allow_delegation=True  # Enable delegation to encourage collaboration
+        # First task - full team collaboration, all other tasks - collaborative
+        instructions = TEAM_COLLABORATION_INSTRUCTIONS if i == 0 else COLLABORATIVE_INSTRUCTIONS
+        text = compact_whitespace(task_config["description"]) + "\n\n" + instructions
+        prompts[task_config["id"]] = TaskPrompt(
+            task_config["id"],
+            PromptTemplate(text).partial(run_values),
+            task_config.get("context", []),
+            expected_output(config, task_config)
         )
 
-        # Add the task to the dictionaries
-        tasks[task_config["id"]] = task
-        task_objects[task_config["id"]] = task
+    return prompts
+
+def expected_output(config, task_config):
+    """Return a task's expected output: its JSON schema instructions if it has an output schema."""
+    schema = resolve_output_schema(config, task_config)
+    return schema_instructions(schema) if schema else task_config["expected_output"]
+
+def create_task(agents, task_config, description, config=None):
+    """
+    Create a single task from its configuration and rendered description.
+
+    Args:
+        agents: Dictionary of agents with their IDs as keys
+        task_config: The task's entry in the configuration file
+        description: The task description, rendered from its TaskPrompt
+        config: The workshop configuration, for output schemas defined by name
+
+    Returns:
+        The CrewAI task
+    """
+    # Upstream outputs are rendered into the description, so the task gets no separate context
+    return Task(
+        description=description,
+        agent=agents[task_config["agent_id"]],
+        expected_output=expected_output(config or {}, task_config),
+        context=[],
+        allow_delegation=True  # Enable delegation to encourage collaboration
+    )
+
+def create_tasks(agents, venture_idea, config_file="workshop_config.json", prompts=None):
+    """
+    Create all the tasks for the workshop based on a JSON configuration file.
+
+    Upstream outputs are not part of the descriptions yet; render each task's
+    TaskPrompt with the completed outputs before the task runs.
+
+    Args:
+        agents: Dictionary of agents with their IDs as keys
+        venture_idea: Description of the venture idea
+        config_file: Path to the JSON configuration file
+        prompts: Compiled task prompts (compiled from the configuration if not given)
+
+    Returns:
+        List of tasks in the order specified in the config
+    """
+    # Load the configuration file
+    config = load_config(config_file)
 
-    # Return the list of tasks in the order specified in the config
+    prompts = prompts or compile_task_prompts(venture_idea, config_file)
+
+    # Create tasks based on the configuration
     ordered_tasks = []
     for task_config in config["tasks"]:
-        ordered_tasks.append(tasks[task_config["id"]])
+        description, _, _ = prompts[task_config["id"]].render({})
+        ordered_tasks.append(create_task(agents, task_config, description, config))
 
     return ordered_tasks
@@ -0,0 +1,159 @@
+import numpy as np
+
+from benchmark_data import load_benchmarks
+
+# Keywords that add to the complexity of a monetization stream, with their weights
+COMPLEXITY_FACTORS = {
+    "payment": 3,
+    "subscription": 2.5,
+    "marketplace": 4,
+    "ai": 3.5,
+    "machine learning": 4,
+    "analytics": 2,
+    "dashboard": 2,
+    "integration": 2.5,
+    "api": 2,
+    "mobile": 3,
+    "app": 3,
+    "web": 2,
+    "platform": 3.5,
+    "automation": 2.5,
+    "blockchain": 4.5,
+    "database": 2,
+    "user authentication": 2,
+    "social": 3,
+    "content": 2,
+    "video": 3.5,
+    "audio": 3,
+    "messaging": 3,
+    "notification": 2,
+    "recommendation": 3.5
+}
+
+# Base complexity of every stream and the cap of the complexity score
+BASE_COMPLEXITY = 1.0
+MAX_COMPLEXITY = 10.0
+
+# Shares of the development cost and monthly OPEX per component
+DEVELOPMENT_SHARES = {
+    "User interface development": 0.3,
+    "Backend development": 0.4,
+    "Integration work": 0.2,
+    "Testing and deployment": 0.1
+}
+OPEX_SHARES = {
+    "Cloud infrastructure": 0.4,
+    "Monitoring and maintenance": 0.3,
+    "Third-party services": 0.3
+}
+
+# Feasibility classes by complexity score: High below 5, Medium below 7.5, Low otherwise
+FEASIBILITY_CLASSES = ("High", "Medium", "Low")
+FEASIBILITY_THRESHOLDS = (5, 7.5)
+
+class TechnicalEstimates:
+    """
+    Technical estimates of many monetization streams as numeric arrays.
+
+    The matched complexity factors are kept as a sparse matrix in coordinate
+    form (one stream and factor index per match). Formatting is deferred to
+    assessment(), which returns the same dictionary as technical_assessment_tool.
+    """
+
+    def __init__(self, match_rows, match_factors, complexity, development_cost, monthly_opex,
+                 development_weeks, feasibility):
+        self.match_rows = match_rows
+        self.match_factors = match_factors
+        self.complexity = complexity
+        self.development_cost = development_cost
+        self.monthly_opex = monthly_opex
+        self.development_weeks = development_weeks
+        self.feasibility = feasibility
+        self._factor_names = list(COMPLEXITY_FACTORS)
+        self._row_starts = np.searchsorted(match_rows, np.arange(len(complexity) + 1))
+
+    def __len__(self):
+        return len(self.complexity)
+
+    @property
+    def development_breakdown(self):
+        """Development cost per component, one column per entry of DEVELOPMENT_SHARES."""
+        return self.development_cost[:, None] * np.array(list(DEVELOPMENT_SHARES.values()))
+
+    @property
+    def opex_breakdown(self):
+        """Monthly OPEX per component, one column per entry of OPEX_SHARES."""
+        return self.monthly_opex[:, None] * np.array(list(OPEX_SHARES.values()))
+
+    def matched_factors(self, i):
+        """Return the complexity factors matched by stream i, in vocabulary order."""
+        start, end = self._row_starts[i], self._row_starts[i + 1]
+        return [self._factor_names[factor] for factor in self.match_factors[start:end]]
+
+    def assessment(self, i):
+        """Return the assessment of stream i in the format of technical_assessment_tool."""
+        complexity_score = float(self.complexity[i])
+        dev_cost = float(self.development_cost[i])
+        monthly_opex = float(self.monthly_opex[i])
+        return {
+            "complexity_score": f"{complexity_score:.1f}/10",
+            "matched_complexity_factors": self.matched_factors(i),
+            "estimated_development_cost": f"${dev_cost:,.2f}",
+            "estimated_monthly_opex": f"${monthly_opex:,.2f}",
+            "estimated_development_time": f"{float(self.development_weeks[i]):.1f} weeks",
+            "technical_feasibility": FEASIBILITY_CLASSES[self.feasibility[i]],
+            "key_technical_components": [f"{component}: ${dev_cost * share:,.2f}"
+                                         for component, share in DEVELOPMENT_SHARES.items()],
+            "monthly_opex_breakdown": [f"{component}: ${monthly_opex * share:,.2f}"
+                                       for component, share in OPEX_SHARES.items()]
+        }
+
+def match_complexity_factors(descriptions):
+    """
+    Match the complexity vocabulary against many descriptions.
+
+    Args:
+        descriptions: Sequence of stream descriptions
+
+    Returns:
+        Tuple of (stream indices, factor indices) of every match, sorted by stream
+        and then by vocabulary order
+    """
+    lowered = np.char.lower(np.asarray(descriptions, dtype=str))
+    if lowered.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    matches = np.stack([np.char.find(lowered, factor) >= 0 for factor in COMPLEXITY_FACTORS], axis=1)
+    return np.nonzero(matches)
+
+def estimate_technical(descriptions):
+    """
+    Estimate complexity, costs, development time and feasibility for many streams at once.
+
+    Gives the same figures as calling technical_assessment_tool on each description.
+
+    Args:
+        descriptions: Sequence of stream descriptions
+
+    Returns:
+        TechnicalEstimates with one entry per description
+    """
+    data = load_benchmarks()
+    base_dev_cost = data.value("technology", "base_development_cost")[0]
+    base_monthly_opex = data.value("technology", "base_monthly_opex")[0]
+
+    match_rows, match_factors = match_complexity_factors(descriptions)
+    weights = np.array(list(COMPLEXITY_FACTORS.values()), dtype=np.float64)
+
+    # The weights are multiples of 0.5, so the sums are exact whatever the order
+    complexity = BASE_COMPLEXITY + np.bincount(match_rows, weights=weights[match_factors], minlength=len(descriptions))
+    complexity = np.minimum(complexity, MAX_COMPLEXITY)
+
+    return TechnicalEstimates(
+        match_rows,
+        match_factors,
+        complexity,
+        base_dev_cost * complexity,
+        base_monthly_opex * (complexity / 2),
+        complexity * 1.5,
+        np.searchsorted(np.array(FEASIBILITY_THRESHOLDS), complexity, side="right")
+    )
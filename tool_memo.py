@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+import contextvars
+import json
+import re
+import threading
+import uuid
+
+# How repeated tool calls are answered: a short reference to the earlier result,
+# the earlier result in compact form, or no memoization at all
+MEMO_MODES = ("reference", "compact", "off")
+
+# The context (one crew kickoff) whose agents are currently calling tools; None outside of any
+_scope = contextvars.ContextVar("tool_memo_scope", default=None)
+
+def normalize_tool_input(value):
+    """
+    Normalize a tool input so trivially different calls share one cache key.
+
+    JSON inputs are parsed and re-serialized with sorted keys; text is lowercased
+    and its whitespace collapsed. The tools only match lowercase keywords, so this
+    does not change their results.
+    """
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return re.sub(r"\s+", " ", value).strip().lower()
+        if not isinstance(parsed, (dict, list)):
+            return re.sub(r"\s+", " ", value).strip().lower()
+        value = parsed
+
+    if isinstance(value, dict):
+        return json.dumps({str(k): normalize_tool_input(v) for k, v in value.items()}, sort_keys=True)
+    if isinstance(value, list):
+        return json.dumps([normalize_tool_input(v) for v in value])
+    return json.dumps(value, default=str)
+
+def _compact(result):
+    try:
+        return json.dumps(json.loads(result), separators=(",", ":"))
+    except (TypeError, ValueError):
+        return result
+
+class ToolMemo:
+    """
+    Run-scoped memoization of tool results shared by every agent in a workshop.
+
+    The first call for a given (tool, normalized input) runs the tool and tags
+    the result with a reference ID. Repeated calls skip the tool. An agent
+    that has not received the result yet in the current scope (one crew's
+    execution of a task) gets it in full, or in compact form in "compact"
+    mode; an agent that already has it in its context gets a short reference
+    instead of the same large result again.
+    """
+
+    def __init__(self, mode="reference"):
+        if mode not in MEMO_MODES:
+            raise ValueError(f"Unknown tool memoization mode '{mode}'. Expected one of {', '.join(MEMO_MODES)}")
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._results = {}
+        self._delivered = set()
+        self._stats = {}
+
+    @contextmanager
+    def scope(self, name):
+        """
+        Treat the tool calls made within the block as one context, e.g. one crew's execution of a task.
+
+        Results delivered in earlier scopes are delivered again in full, since
+        the agents of this scope never saw them.
+
+        Args:
+            name: Label of the scope, such as the task ID
+        """
+        token = _scope.set((name, uuid.uuid4().hex))
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    def wrap_tool(self, tool, agent_id=None):
+        """
+        Return a copy of a CrewAI tool dictionary whose function is memoized.
+
+        Args:
+            tool: The tool dictionary
+            agent_id: ID of the agent the tool is given to, whose deliveries are tracked
+        """
+        if self.mode == "off":
+            return tool
+        return {**tool, "func": self._memoize(tool["name"], tool["func"], agent_id)}
+
+    def _memoize(self, tool_name, func, agent_id):
+        def memoized(*args, **kwargs):
+            key = (tool_name, normalize_tool_input([list(args), kwargs]))
+            scope = _scope.get()
+            # Outside of a scope there is no telling what the agent has seen, so it always gets the result
+            recipient = (scope, agent_id, key) if scope is not None else None
+            with self._lock:
+                stats = self._stats.setdefault(tool_name, {"calls": 0, "hits": 0})
+                stats["calls"] += 1
+                entry = self._results.get(key)
+                if entry is not None:
+                    stats["hits"] += 1
+                    delivered = recipient in self._delivered
+                    if recipient is not None:
+                        self._delivered.add(recipient)
+
+            if entry is not None:
+                ref, result = entry
+                if delivered:
+                    return (f"[{ref}] You already received the result of this exact {tool_name} call; "
+                            f"reuse result {ref} instead of calling the tool again.")
+                if self.mode == "compact":
+                    return f"[{ref}] (same input as an earlier call) {_compact(result)}"
+                return f"[{ref}]\n{result}"
+
+            result = func(*args, **kwargs)
+            with self._lock:
+                # Another agent may have stored the same call while the tool was running
+                if key not in self._results:
+                    stored = sum(1 for stored_tool, _ in self._results if stored_tool == tool_name)
+                    ref = f"{tool_name}#{stored + 1}"
+                    self._results[key] = (ref, result)
+                ref = self._results[key][0]
+                if recipient is not None:
+                    self._delivered.add(recipient)
+            return f"[{ref}]\n{result}"
+
+        return memoized
+
+    def stats(self):
+        """Return calls, hits and hit rate per tool."""
+        with self._lock:
+            return {
+                tool_name: {**stats, "hit_rate": stats["hits"] / stats["calls"] if stats["calls"] else 0.0}
+                for tool_name, stats in self._stats.items()
+            }
+
+    def log_stats(self):
+        """Print the hit rate of every tool that was called."""
+        for tool_name, stats in self.stats().items():
+            print(f"Tool {tool_name}: {stats['calls']} calls, {stats['hits']} memoized "
+                  f"({stats['hit_rate']:.0%} hit rate)")
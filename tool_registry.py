@@ -0,0 +1,210 @@
+import importlib
+import importlib.util
+import threading
+from collections.abc import Mapping
+
+# How the results of a tool are cached: memoized for the whole run (pure tools
+# only), or never cached
+CACHE_POLICIES = ("run", "none")
+
+# Tools shipped with the workshop; all but the knowledge lookup, which reads
+# what earlier workshops recorded, are pure functions of their input
+BUILTIN_TOOLS = {
+    "market_research_tool": {"module": "tools", "pure": True},
+    "financial_modeling_tool": {"module": "tools", "pure": True},
+    "technical_assessment_tool": {"module": "tools", "pure": True, "batchable": True},
+    "validation_experiment_tool": {"module": "tools", "pure": True},
+    "pivot_analysis_tool": {"module": "tools", "pure": True},
+    "knowledge_lookup_tool": {"module": "tools", "pure": False}
+}
+
+# Convert LangChain tools to CrewAI compatible format
+def convert_to_crewai_tool(lc_tool):
+    # Plain callables are used as they are; LangChain tools are called through
+    # their underlying function, since their _run needs a run config
+    func = getattr(lc_tool, "func", None) or lc_tool
+    return {
+        "name": getattr(lc_tool, "name", None) or lc_tool.__name__,
+        "description": getattr(lc_tool, "description", None) or (lc_tool.__doc__ or "").strip(),
+        "func": func
+    }
+
+def _with_timeout(tool_name, func, timeout):
+    """Wrap a tool function so a call that takes longer than timeout seconds returns an error instead."""
+    def timed(*args, **kwargs):
+        outcome = {}
+
+        def run():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=run, name=f"tool-{tool_name}", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            return f"Error in {tool_name}: no result within {timeout} seconds"
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    return timed
+
+class ToolSpec:
+    """
+    The declaration of one tool: where it lives and how its calls are handled.
+
+    The module is only imported the first time the tool is needed. When the
+    declaration has its own description, that is only when the tool is first
+    called; otherwise when the first agent using it is created.
+    """
+
+    def __init__(self, name, declaration):
+        if not isinstance(declaration, dict):
+            raise ValueError(f"Tool '{name}' must be declared as an object")
+        unknown = set(declaration) - {"module", "entry_point", "description", "cache", "timeout",
+                                      "pure", "batchable", "batch_entry_point"}
+        if unknown:
+            raise ValueError(f"Tool '{name}' has unknown settings: {', '.join(sorted(unknown))}")
+        if not isinstance(declaration.get("module"), str) or not declaration["module"]:
+            raise ValueError(f"Tool '{name}' must declare the module it is defined in")
+
+        self.name = name
+        self.module = declaration["module"]
+        self.entry_point = declaration.get("entry_point", name)
+        self.description = declaration.get("description")
+        self.pure = bool(declaration.get("pure", False))
+        self.cache = declaration.get("cache", "run" if self.pure else "none")
+        self.timeout = declaration.get("timeout")
+        self.batchable = bool(declaration.get("batchable", False))
+        self.batch_entry_point = declaration.get("batch_entry_point", f"{self.entry_point}_batch")
+
+        if self.cache not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy '{self.cache}' for tool '{name}'. "
+                             f"Expected one of {', '.join(CACHE_POLICIES)}")
+        if self.cache == "run" and not self.pure:
+            raise ValueError(f"Tool '{name}' can only be cached if it is declared pure")
+        if self.timeout is not None and (isinstance(self.timeout, bool)
+                                         or not isinstance(self.timeout, (int, float)) or self.timeout <= 0):
+            raise ValueError(f"Timeout of tool '{name}' must be a positive number of seconds")
+
+        # Check that the module can be found without importing it
+        try:
+            found = importlib.util.find_spec(self.module) is not None
+        except (ImportError, ValueError):
+            found = False
+        if not found:
+            raise ValueError(f"Module '{self.module}' of tool '{name}' cannot be found")
+
+        self._tool = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._tool is not None
+
+    def load(self):
+        """Import the tool's module and return the tool as a CrewAI tool dictionary."""
+        with self._lock:
+            if self._tool is None:
+                module = importlib.import_module(self.module)
+                try:
+                    entry = getattr(module, self.entry_point)
+                except AttributeError:
+                    raise ValueError(f"Module '{self.module}' has no entry point '{self.entry_point}' "
+                                     f"for tool '{self.name}'") from None
+                tool = convert_to_crewai_tool(entry)
+                tool["name"] = self.name
+                if self.description:
+                    tool["description"] = self.description
+                if self.timeout:
+                    tool["func"] = _with_timeout(self.name, tool["func"], self.timeout)
+                self._tool = tool
+            return self._tool
+
+    def tool(self):
+        """Return the tool as a CrewAI tool dictionary, importing it now only if it has no declared description."""
+        if self.loaded or not self.description:
+            return self.load()
+
+        def call(*args, **kwargs):
+            return self.load()["func"](*args, **kwargs)
+
+        return {"name": self.name, "description": self.description, "func": call}
+
+    def load_batch(self):
+        """
+        Return the batch entry point of a batchable tool.
+
+        The batch function takes a list of inputs and returns the list of results
+        the tool would return for each of them.
+        """
+        if not self.batchable:
+            raise ValueError(f"Tool '{self.name}' is not batchable")
+        module = importlib.import_module(self.module)
+        try:
+            return getattr(module, self.batch_entry_point)
+        except AttributeError:
+            raise ValueError(f"Module '{self.module}' has no batch entry point '{self.batch_entry_point}' "
+                             f"for tool '{self.name}'") from None
+
+class ToolRegistry(Mapping):
+    """
+    The tools available to the agents of a workshop, declared in the configuration.
+
+    The registry maps tool names to CrewAI tool dictionaries like the former
+    TOOL_MAP, but imports each tool's module only when the tool is first used.
+    Declarations are checked when the registry is created, so configuration
+    errors surface before the workshop starts.
+    """
+
+    def __init__(self, declarations=None):
+        merged = {name: dict(declaration) for name, declaration in BUILTIN_TOOLS.items()}
+        for name, declaration in (declarations or {}).items():
+            merged[name] = declaration
+        self.specs = {name: ToolSpec(name, declaration) for name, declaration in merged.items()}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create the registry of a workshop configuration and check the agents' tool names against it.
+
+        Args:
+            config: The loaded workshop configuration
+
+        Returns:
+            The ToolRegistry
+        """
+        registry = cls(config.get("tool_plugins"))
+        registry.validate_agents(config.get("agents", []))
+        return registry
+
+    def validate_agents(self, agent_configs):
+        """Raise a ValueError if an agent uses a tool that is not declared."""
+        for agent_config in agent_configs:
+            unknown = [tool_name for tool_name in agent_config.get("tools", []) if tool_name not in self.specs]
+            if unknown:
+                raise ValueError(f"Agent '{agent_config['id']}' uses unknown tools: {', '.join(unknown)}. "
+                                 f"Declare them under tool_plugins or use one of {', '.join(self.specs)}")
+
+    def __getitem__(self, tool_name):
+        return self.specs[tool_name].tool()
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def spec(self, tool_name):
+        return self.specs[tool_name]
+
+    def batch(self, tool_name):
+        """Return the batch entry point of a batchable tool."""
+        return self.specs[tool_name].load_batch()
+
+    @property
+    def loaded(self):
+        """Names of the tools whose modules have been imported."""
+        return [name for name, spec in self.specs.items() if spec.loaded]
@@ -1,6 +1,8 @@
 from langchain.tools import tool
 import json
 
+# Each tool imports its dependencies when called, so loading one tool does not import those of the others
+
 @tool
 def market_research_tool(query: str) -> str:
     """
@@ -12,56 +14,30 @@ def market_research_tool(query: str) -> str:
     Returns:
         Market insights and data relevant to the query
     """
-    # In a real implementation, this would connect to market research databases or APIs
-    # For now, we'll return some sample data based on common queries
-    
-    gcc_market_data = {
-        "digital adoption": "GCC digital adoption rates average 72% across the region, with UAE leading at 96%, followed by Saudi Arabia at 89%, Qatar at 86%, Bahrain at 78%, Kuwait at 72%, and Oman at 63%.",
-        
-        "e-commerce": "E-commerce penetration in GCC is approximately 65% with annual growth of 15-20%. Average order values range from $55-120 depending on category. Customer acquisition costs average $25-40 per customer.",
-        
-        "fintech": "Fintech adoption in GCC is growing at 30% annually. Payment processing fees range from 1.5-3.5%. Customer acquisition costs for fintech products average $30-60 per customer in the region.",
-        
-        "saas": "SaaS adoption in GCC businesses is approximately 45%, with 25-30% annual growth. Average contract values for B2B SaaS range from $3,000-15,000 annually. Sales cycles average 3-6 months.",
-        
-        "subscription": "Subscription model adoption in GCC is approximately 35% for digital services. Average monthly subscription values range from $10-25 for B2C and $50-500 for B2B services. Churn rates average 5-8% monthly.",
-        
-        "advertising": "Digital advertising CPM rates in GCC range from $2-8 depending on platform and targeting. Click-through rates average 0.5-2.5%. Conversion rates from ad click to purchase average 1.2-3.5%.",
-        
-        "marketplace": "Marketplace models in GCC typically charge 10-25% commission depending on category. Average customer acquisition costs range from $20-45. Retention rates after first purchase average 30-45%.",
-        
-        "b2b": "B2B sales cycles in GCC average 3-6 months. Customer acquisition costs range from $200-1,500 depending on sector. Average contract values range from $5,000-50,000 annually.",
-        
-        "b2c": "B2C customer acquisition costs in GCC range from $15-80 depending on sector. Conversion rates from website visit to purchase average 1.5-4%. Average customer lifetime value ranges from $100-500.",
-        
-        "mobile": "Mobile penetration in GCC exceeds 95%, with smartphone penetration at 85-92%. App download costs range from $1.50-4.00. In-app purchase conversion rates average 2-5%.",
-        
-        "ai": "AI adoption in GCC businesses is approximately 25%, with 40% annual growth. Implementation costs for basic AI solutions range from $20,000-100,000. ROI typically realized within 12-24 months.",
-        
-        "healthcare": "Digital healthcare adoption in GCC is growing at 25-30% annually. Telehealth consultation fees range from $30-150. Customer acquisition costs for health tech platforms average $50-120 per user.",
-        
-        "education": "EdTech adoption in GCC is growing at 20-25% annually. Average subscription values range from $15-50 monthly for B2C and $2,000-10,000 annually for B2B/institutional clients.",
-        
-        "real estate": "PropTech adoption in GCC is growing at 15-20% annually. Commission rates average 2-5% for sales and 5-10% for rentals. Customer acquisition costs range from $100-300 per lead.",
-        
-        "food delivery": "Food delivery penetration in GCC urban areas exceeds 70%. Commission rates range from 15-30%. Average order values range from $15-40. Customer acquisition costs average $20-50.",
-        
-        "logistics": "Last-mile delivery costs in GCC range from $5-15 per delivery. Fulfillment costs average $3-8 per order. Warehouse space costs $10-30 per square meter monthly depending on location.",
-        
-        "retail": "Retail customer acquisition costs in GCC range from $20-70. Conversion rates in physical stores average 20-30%, while e-commerce conversion rates average 1.5-4%. Average basket sizes range from $50-150.",
-        
-        "gaming": "Gaming market in GCC is growing at 25% annually. Average revenue per user (ARPU) ranges from $10-30 monthly. In-app purchase conversion rates average 3-7%. User acquisition costs range from $2-8.",
-        
-        "content": "Content subscription services in GCC have average monthly fees of $8-20. Churn rates average 4-7% monthly. Customer acquisition costs range from $25-60. Paid conversion rates from free to premium average 2-5%.",
-        
-        "enterprise": "Enterprise software adoption in GCC is growing at 15-20% annually. Average contract values range from $20,000-200,000 annually. Sales cycles average 6-12 months. Implementation costs typically add 20-40% to contract value."
-    }
-    
-    # Check if any of the keywords are in the query
-    for keyword, data in gcc_market_data.items():
-        if keyword.lower() in query.lower():
-            return f"GCC/MENA Market Data - {keyword.title()}: {data}"
-    
+    from benchmark_data import DEFAULT_COUNTRY, load_benchmarks
+
+    # Benchmarks come from the offline dataset (data/benchmarks)
+    data = load_benchmarks()
+    sector = data.match_sector(query)
+    if sector is not None:
+        # Use the values of a country named in the query where the dataset has them
+        country = next((code for code in data.countries
+                        if code != DEFAULT_COUNTRY and data.label("country", code).lower() in query.lower()
+                        and len(data.rows(sector=sector, country=code))),
+                       DEFAULT_COUNTRY)
+        facts = []
+        for metric, low, high in data.sector_metrics(sector):
+            if country != DEFAULT_COUNTRY:
+                low, high = data.value(sector, metric, country)
+            fact = f"{data.label('metric', metric)}: {data.format_value(metric, low, high)}"
+            by_country = data.country_values(sector, metric)
+            if by_country and country == DEFAULT_COUNTRY:
+                fact += " (" + ", ".join(f"{data.label('country', code)} {data.format_value(metric, country_low, country_high)}"
+                                         for code, country_low, country_high in by_country) + ")"
+            facts.append(fact)
+        scope = "GCC/MENA" if country == DEFAULT_COUNTRY else data.label("country", country)
+        return f"{scope} Market Data - {data.label('sector', sector)}: " + "; ".join(facts) + "."
+
     # Default response if no specific data is found
     return "No specific GCC/MENA market data found for this query. Consider refining your search terms to include specific business models or sectors like e-commerce, fintech, SaaS, subscription, advertising, marketplace, B2B, B2C, mobile, AI, healthcare, education, real estate, food delivery, logistics, retail, gaming, content, or enterprise."
 
@@ -146,55 +122,39 @@ def technical_assessment_tool(stream_description: str) -> str:
     Returns:
         Technical assessment and cost estimates
     """
+    from benchmark_data import load_benchmarks
+    from technical_estimator import (
+        BASE_COMPLEXITY,
+        COMPLEXITY_FACTORS,
+        DEVELOPMENT_SHARES,
+        FEASIBILITY_CLASSES,
+        FEASIBILITY_THRESHOLDS,
+        MAX_COMPLEXITY,
+        OPEX_SHARES
+    )
+
     # In a real implementation, this would use more sophisticated estimation models
     # For now, we'll provide a simple assessment based on keywords
     
-    # Define complexity factors
-    complexity_factors = {
-        "payment": 3,
-        "subscription": 2.5,
-        "marketplace": 4,
-        "ai": 3.5,
-        "machine learning": 4,
-        "analytics": 2,
-        "dashboard": 2,
-        "integration": 2.5,
-        "api": 2,
-        "mobile": 3,
-        "app": 3,
-        "web": 2,
-        "platform": 3.5,
-        "automation": 2.5,
-        "blockchain": 4.5,
-        "database": 2,
-        "user authentication": 2,
-        "social": 3,
-        "content": 2,
-        "video": 3.5,
-        "audio": 3,
-        "messaging": 3,
-        "notification": 2,
-        "recommendation": 3.5
-    }
-    
     # Calculate complexity score
-    complexity_score = 1.0  # Base complexity
+    complexity_score = BASE_COMPLEXITY
     matched_factors = []
     
-    for factor, weight in complexity_factors.items():
+    for factor, weight in COMPLEXITY_FACTORS.items():
         if factor.lower() in stream_description.lower():
             complexity_score += weight
             matched_factors.append(factor)
     
     # Cap complexity score
-    complexity_score = min(complexity_score, 10.0)
+    complexity_score = min(complexity_score, MAX_COMPLEXITY)
     
-    # Calculate cost estimates
-    base_dev_cost = 5000  # Base development cost in USD
+    # Calculate cost estimates from the benchmark base costs
+    data = load_benchmarks()
+    base_dev_cost = data.value("technology", "base_development_cost")[0]  # Base development cost in USD
     dev_cost = base_dev_cost * complexity_score
     
     # Calculate monthly OPEX
-    base_monthly_opex = 500  # Base monthly OPEX in USD
+    base_monthly_opex = data.value("technology", "base_monthly_opex")[0]  # Base monthly OPEX in USD
     monthly_opex = base_monthly_opex * (complexity_score / 2)
     
     # Estimate development time
@@ -207,22 +167,30 @@ def technical_assessment_tool(stream_description: str) -> str:
         "estimated_development_cost": f"${dev_cost:,.2f}",
         "estimated_monthly_opex": f"${monthly_opex:,.2f}",
         "estimated_development_time": f"{dev_time_weeks:.1f} weeks",
-        "technical_feasibility": "High" if complexity_score < 5 else "Medium" if complexity_score < 7.5 else "Low",
-        "key_technical_components": [
-            f"User interface development: ${dev_cost * 0.3:,.2f}",
-            f"Backend development: ${dev_cost * 0.4:,.2f}",
-            f"Integration work: ${dev_cost * 0.2:,.2f}",
-            f"Testing and deployment: ${dev_cost * 0.1:,.2f}"
-        ],
-        "monthly_opex_breakdown": [
-            f"Cloud infrastructure: ${monthly_opex * 0.4:,.2f}",
-            f"Monitoring and maintenance: ${monthly_opex * 0.3:,.2f}",
-            f"Third-party services: ${monthly_opex * 0.3:,.2f}"
-        ]
+        "technical_feasibility": FEASIBILITY_CLASSES[sum(complexity_score >= threshold for threshold in FEASIBILITY_THRESHOLDS)],
+        "key_technical_components": [f"{component}: ${dev_cost * share:,.2f}"
+                                     for component, share in DEVELOPMENT_SHARES.items()],
+        "monthly_opex_breakdown": [f"{component}: ${monthly_opex * share:,.2f}"
+                                   for component, share in OPEX_SHARES.items()]
     }
     
     return json.dumps(assessment, indent=2)
 
+def technical_assessment_tool_batch(stream_descriptions):
+    """
+    Assess many monetization streams at once.
+
+    Args:
+        stream_descriptions: List of stream descriptions
+
+    Returns:
+        List with the result technical_assessment_tool gives for each description
+    """
+    from technical_estimator import estimate_technical
+
+    estimates = estimate_technical(stream_descriptions)
+    return [json.dumps(estimates.assessment(i), indent=2) for i in range(len(estimates))]
+
 @tool
 def validation_experiment_tool(stream_description: str) -> str:
     """
@@ -241,15 +209,15 @@ def validation_experiment_tool(stream_description: str) -> str:
     is_content = "content" in stream_description.lower() or "media" in stream_description.lower()
     is_service = "service" in stream_description.lower() or "consulting" in stream_description.lower()
     
-    # Design appropriate validation approach
+    # Design appropriate validation approach; step costs, timeline and budget come from the benchmarks
     if is_b2b:
-        approach = "B2B Sales Validation"
+        plan = "validation_b2b"
         steps = [
-            "Create a simple landing page with value proposition ($500-1,000)",
-            "Develop a basic pitch deck and sales materials ($500-1,000)",
-            "Conduct 15-20 customer discovery interviews ($2,000-3,000)",
-            "Build a simplified demo or mockup ($5,000-10,000)",
-            "Run 5-10 pilot proposals with potential customers ($3,000-5,000)"
+            ("Create a simple landing page with value proposition", "landing_page_cost"),
+            ("Develop a basic pitch deck and sales materials", "sales_materials_cost"),
+            ("Conduct 15-20 customer discovery interviews", "discovery_interviews_cost"),
+            ("Build a simplified demo or mockup", "demo_cost"),
+            ("Run 5-10 pilot proposals with potential customers", "pilot_proposals_cost")
         ]
         metrics = [
             "Number of meetings secured",
@@ -258,17 +226,15 @@ def validation_experiment_tool(stream_description: str) -> str:
             "Pilot conversion rate",
             "Feature priority feedback"
         ]
-        timeline = "8-12 weeks"
-        budget = "$15,000-25,000"
         
     elif is_marketplace:
-        approach = "Marketplace MVP Validation"
+        plan = "validation_marketplace"
         steps = [
-            "Build a simple landing page for both sides of the marketplace ($1,000-2,000)",
-            "Create manual matching process before building technology ($1,000-2,000)",
-            "Recruit 10-20 supply-side participants ($3,000-5,000)",
-            "Generate demand through targeted outreach ($5,000-8,000)",
-            "Facilitate 20-30 transactions manually ($2,000-4,000)"
+            ("Build a simple landing page for both sides of the marketplace", "landing_page_cost"),
+            ("Create manual matching process before building technology", "manual_matching_cost"),
+            ("Recruit 10-20 supply-side participants", "supply_recruitment_cost"),
+            ("Generate demand through targeted outreach", "demand_generation_cost"),
+            ("Facilitate 20-30 transactions manually", "manual_transactions_cost")
         ]
         metrics = [
             "Supply-side acquisition cost and conversion rate",
@@ -277,17 +243,15 @@ def validation_experiment_tool(stream_description: str) -> str:
             "User satisfaction scores (both sides)",
             "Repeat usage rates"
         ]
-        timeline = "10-14 weeks"
-        budget = "$20,000-30,000"
         
     elif is_subscription:
-        approach = "Subscription Model Validation"
+        plan = "validation_subscription"
         steps = [
-            "Create a landing page with subscription offering ($1,000-2,000)",
-            "Build a minimum viable product with core features ($10,000-15,000)",
-            "Set up payment processing for subscriptions ($1,000-2,000)",
-            "Run targeted acquisition campaign ($5,000-8,000)",
-            "Implement basic retention mechanisms ($2,000-4,000)"
+            ("Create a landing page with subscription offering", "landing_page_cost"),
+            ("Build a minimum viable product with core features", "mvp_cost"),
+            ("Set up payment processing for subscriptions", "payment_setup_cost"),
+            ("Run targeted acquisition campaign", "acquisition_campaign_cost"),
+            ("Implement basic retention mechanisms", "retention_cost")
         ]
         metrics = [
             "Visitor-to-signup conversion rate",
@@ -296,17 +260,15 @@ def validation_experiment_tool(stream_description: str) -> str:
             "30-day retention rate",
             "Feature usage patterns"
         ]
-        timeline = "12-16 weeks"
-        budget = "$25,000-35,000"
         
     elif is_content:
-        approach = "Content Monetization Validation"
+        plan = "validation_content"
         steps = [
-            "Produce 5-10 pieces of sample content ($3,000-5,000)",
-            "Create a simple content delivery platform ($5,000-10,000)",
-            "Implement basic paywall or monetization mechanism ($2,000-4,000)",
-            "Run targeted promotion campaign ($5,000-8,000)",
-            "Collect user feedback and usage data ($1,000-2,000)"
+            ("Produce 5-10 pieces of sample content", "sample_content_cost"),
+            ("Create a simple content delivery platform", "content_platform_cost"),
+            ("Implement basic paywall or monetization mechanism", "paywall_cost"),
+            ("Run targeted promotion campaign", "acquisition_campaign_cost"),
+            ("Collect user feedback and usage data", "user_feedback_cost")
         ]
         metrics = [
             "Content engagement metrics (views, time spent)",
@@ -315,17 +277,15 @@ def validation_experiment_tool(stream_description: str) -> str:
             "Retention and repeat consumption",
             "Sharing and virality metrics"
         ]
-        timeline = "8-12 weeks"
-        budget = "$20,000-30,000"
         
     elif is_service:
-        approach = "Service Offering Validation"
+        plan = "validation_service"
         steps = [
-            "Define service packages and pricing ($500-1,000)",
-            "Create service delivery process and templates ($2,000-4,000)",
-            "Build a simple booking/request system ($5,000-8,000)",
-            "Recruit initial service providers if needed ($3,000-5,000)",
-            "Run limited-time promotion to acquire first customers ($5,000-8,000)"
+            ("Define service packages and pricing", "service_packages_cost"),
+            ("Create service delivery process and templates", "service_process_cost"),
+            ("Build a simple booking/request system", "booking_system_cost"),
+            ("Recruit initial service providers if needed", "provider_recruitment_cost"),
+            ("Run limited-time promotion to acquire first customers", "acquisition_campaign_cost")
         ]
         metrics = [
             "Lead-to-customer conversion rate",
@@ -334,17 +294,15 @@ def validation_experiment_tool(stream_description: str) -> str:
             "Customer satisfaction scores",
             "Repeat purchase rate"
         ]
-        timeline = "6-10 weeks"
-        budget = "$15,000-25,000"
         
     else:
-        approach = "General MVP Validation"
+        plan = "validation_general"
         steps = [
-            "Create a landing page with clear value proposition ($1,000-2,000)",
-            "Build a simplified version of the core offering ($10,000-15,000)",
-            "Implement basic analytics and feedback collection ($1,000-2,000)",
-            "Run targeted customer acquisition campaign ($5,000-8,000)",
-            "Conduct user testing and interviews ($2,000-4,000)"
+            ("Create a landing page with clear value proposition", "landing_page_cost"),
+            ("Build a simplified version of the core offering", "mvp_cost"),
+            ("Implement basic analytics and feedback collection", "analytics_cost"),
+            ("Run targeted customer acquisition campaign", "acquisition_campaign_cost"),
+            ("Conduct user testing and interviews", "user_testing_cost")
         ]
         metrics = [
             "Visitor-to-user conversion rate",
@@ -353,8 +311,14 @@ def validation_experiment_tool(stream_description: str) -> str:
             "Feature usage patterns",
             "User satisfaction and feedback"
         ]
-        timeline = "10-14 weeks"
-        budget = "$20,000-30,000"
+    
+    from benchmark_data import load_benchmarks
+
+    data = load_benchmarks()
+    approach = data.label("sector", plan)
+    steps = [f"{step} ({data.format_value(metric, *data.value(plan, metric))})" for step, metric in steps]
+    timeline = data.format_value("validation_timeline", *data.value(plan, "validation_timeline"))
+    budget = data.format_value("validation_budget", *data.value(plan, "validation_budget"))
     
     # Compile validation plan
     validation_plan = {
@@ -380,120 +344,63 @@ def pivot_analysis_tool(parameters: str) -> str:
     Analyze pivot implications for monetization streams.
     
     Args:
-        parameters: JSON string containing pivot analysis parameters
+        parameters: JSON string with "original_description" and either "stream_description"
+            for one stream or "stream_descriptions" (a list) to compare and rank several streams
         
     Returns:
         Pivot analysis and recommendations
     """
+    import numpy as np
+    from pivot_engine import load_pivot_rules
+
     try:
         params = json.loads(parameters)
         
         # Extract parameters
         original_description = params.get("original_description", "")
-        stream_description = params.get("stream_description", "")
-        
-        # Analyze potential pivot dimensions
-        pivot_dimensions = {
-            "business_model": {
-                "original": "",
-                "new": "",
-                "pivot_required": False
-            },
-            "target_market": {
-                "original": "",
-                "new": "",
-                "pivot_required": False
-            },
-            "value_proposition": {
-                "original": "",
-                "new": "",
-                "pivot_required": False
-            },
-            "revenue_model": {
-                "original": "",
-                "new": "",
-                "pivot_required": False
-            },
-            "distribution_channel": {
-                "original": "",
-                "new": "",
-                "pivot_required": False
+        rules = load_pivot_rules()
+        
+        # Several streams: rank them by pivot cost and compare them with each other
+        if "stream_descriptions" in params:
+            streams = [str(stream) for stream in params["stream_descriptions"]]
+            results = rules.evaluate(original_description, streams)
+            ranking = []
+            for rank, i in enumerate(results.ranking(), 1):
+                ranking.append({
+                    "rank": rank,
+                    "stream_description": streams[i],
+                    "pivot_magnitude": results.magnitude(i),
+                    "pivot_count": int(results.pivot_count[i]),
+                    "pivot_cost": float(results.pivot_cost[i]),
+                    "pivots": {dimension: values["new"] for dimension, values in results.dimensions(i).items()
+                               if values["pivot_required"]}
+                })
+            comparison = {
+                "ranking": ranking,
+                "pivot_distance_matrix": np.round(results.distance_matrix(), 2).tolist(),
+                "dimension_weights": dict(zip(rules.dimensions, rules.weights.tolist()))
             }
-        }
-        
-        # Business model analysis
-        if "b2b" in stream_description.lower() and "b2c" in original_description.lower():
-            pivot_dimensions["business_model"]["original"] = "B2C"
-            pivot_dimensions["business_model"]["new"] = "B2B"
-            pivot_dimensions["business_model"]["pivot_required"] = True
-        elif "b2c" in stream_description.lower() and "b2b" in original_description.lower():
-            pivot_dimensions["business_model"]["original"] = "B2B"
-            pivot_dimensions["business_model"]["new"] = "B2C"
-            pivot_dimensions["business_model"]["pivot_required"] = True
-        elif "b2g" in stream_description.lower() and "b2g" not in original_description.lower():
-            pivot_dimensions["business_model"]["original"] = "B2B/B2C"
-            pivot_dimensions["business_model"]["new"] = "B2G"
-            pivot_dimensions["business_model"]["pivot_required"] = True
+            return json.dumps(comparison, indent=2)
         
-        # Revenue model analysis
-        if "subscription" in stream_description.lower() and "subscription" not in original_description.lower():
-            pivot_dimensions["revenue_model"]["original"] = "One-time/Transactional"
-            pivot_dimensions["revenue_model"]["new"] = "Subscription"
-            pivot_dimensions["revenue_model"]["pivot_required"] = True
-        elif "transactional" in stream_description.lower() and "subscription" in original_description.lower():
-            pivot_dimensions["revenue_model"]["original"] = "Subscription"
-            pivot_dimensions["revenue_model"]["new"] = "Transactional"
-            pivot_dimensions["revenue_model"]["pivot_required"] = True
-        elif "freemium" in stream_description.lower() and "freemium" not in original_description.lower():
-            pivot_dimensions["revenue_model"]["original"] = "Paid"
-            pivot_dimensions["revenue_model"]["new"] = "Freemium"
-            pivot_dimensions["revenue_model"]["pivot_required"] = True
-        elif "marketplace" in stream_description.lower() and "marketplace" not in original_description.lower():
-            pivot_dimensions["revenue_model"]["original"] = "Direct"
-            pivot_dimensions["revenue_model"]["new"] = "Marketplace/Commission"
-            pivot_dimensions["revenue_model"]["pivot_required"] = True
-        
-        # Distribution channel analysis
-        if "direct" in stream_description.lower() and "partner" in original_description.lower():
-            pivot_dimensions["distribution_channel"]["original"] = "Partner/Indirect"
-            pivot_dimensions["distribution_channel"]["new"] = "Direct"
-            pivot_dimensions["distribution_channel"]["pivot_required"] = True
-        elif "partner" in stream_description.lower() and "partner" not in original_description.lower():
-            pivot_dimensions["distribution_channel"]["original"] = "Direct"
-            pivot_dimensions["distribution_channel"]["new"] = "Partner/Indirect"
-            pivot_dimensions["distribution_channel"]["pivot_required"] = True
-        
-        # Count required pivots
-        pivot_count = sum(1 for dim in pivot_dimensions.values() if dim["pivot_required"])
-        
-        # Determine pivot magnitude
-        if pivot_count >= 3:
-            pivot_magnitude = "Major"
-        elif pivot_count >= 1:
-            pivot_magnitude = "Moderate"
-        else:
-            pivot_magnitude = "Minor"
+        stream_description = params.get("stream_description", "")
+        results = rules.evaluate(original_description, [stream_description])
+        pivot_dimensions = results.dimensions(0)
         
-        # Generate adjusted description
-        adjusted_description = original_description
-        for dim in pivot_dimensions.values():
-            if dim["pivot_required"]:
-                # This is a simplistic approach - in a real implementation, 
-                # we would use more sophisticated NLP to modify the description
-                if dim["original"] in adjusted_description:
-                    adjusted_description = adjusted_description.replace(dim["original"], dim["new"])
+        def change(dimension):
+            return pivot_dimensions[dimension]["new"] if pivot_dimensions[dimension]["pivot_required"] else "No change required"
         
         # Compile pivot analysis
         pivot_analysis = {
-            "pivot_magnitude": pivot_magnitude,
+            "pivot_magnitude": results.magnitude(0),
             "pivot_dimensions": pivot_dimensions,
-            "pivot_count": pivot_count,
-            "adjusted_description": adjusted_description,
+            "pivot_count": int(results.pivot_count[0]),
+            "adjusted_description": results.adjusted_description(0),
             "key_implications": [
-                f"Business model changes: {pivot_dimensions['business_model']['new'] if pivot_dimensions['business_model']['pivot_required'] else 'No change required'}",
-                f"Target market changes: {pivot_dimensions['target_market']['new'] if pivot_dimensions['target_market']['pivot_required'] else 'No change required'}",
-                f"Revenue model changes: {pivot_dimensions['revenue_model']['new'] if pivot_dimensions['revenue_model']['pivot_required'] else 'No change required'}",
-                f"Distribution changes: {pivot_dimensions['distribution_channel']['new'] if pivot_dimensions['distribution_channel']['pivot_required'] else 'No change required'}"
+                f"Business model changes: {change('business_model')}",
+                f"Target market changes: {change('target_market')}",
+                f"Value proposition changes: {change('value_proposition')}",
+                f"Revenue model changes: {change('revenue_model')}",
+                f"Distribution changes: {change('distribution_channel')}"
             ],
             "implementation_considerations": [
                 "Team skill alignment with new direction",
@@ -508,3 +415,23 @@ def pivot_analysis_tool(parameters: str) -> str:
     
     except Exception as e:
         return f"Error in pivot analysis: {str(e)}"
+
+@tool
+def knowledge_lookup_tool(query: str) -> str:
+    """
+    Look up facts and figures recorded by earlier workshops, such as CAC ranges or conversion rates.
+    
+    Args:
+        query: What to look up, e.g. "CAC for B2C fintech apps in the UAE"
+        
+    Returns:
+        The most relevant recorded facts with their sector, country and date
+    """
+    from knowledge_store import KnowledgeStore, fact_tags, format_facts
+
+    # The knowledge store is filled by workshops with the "knowledge" option enabled
+    sector, country = fact_tags(query)
+    facts = KnowledgeStore().search(query, sector=sector, country=country)
+    if not facts:
+        return "No facts recorded by earlier workshops match this query."
+    return format_facts(facts)
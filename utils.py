@@ -1,4 +1,20 @@
+import copy
+import datetime
+import json
+import os
 import re
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+
+# Parsed workshop configurations by path, with the file's modification time and size
+_configs = {}
+_configs_lock = threading.Lock()
+
+def unique_id():
+    """Return a timestamp-based ID with a random suffix, so runs started in the same second get different IDs."""
+    return f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
 
 def format_markdown_table(headers, rows):
     """
@@ -119,18 +135,28 @@ def extract_financial_metrics(text):
 
     return metrics
 
-def format_workshop_output(results):
+def iter_workshop_output(results=None, documentation=None, summary=None, notes=None):
     """
-    Format the final workshop output in a clean, structured format with a summary and detailed sections.
+    Yield the final workshop output in a clean, structured format with a summary and detailed sections.
 
-    Args:
-        results: Raw workshop results (CrewOutput object or string)
+    The output is produced piece by piece, so large documentation can be
+    streamed to a file without building the whole report in memory.
 
-    Returns:
-        Formatted workshop output as a string
+    Args:
+        results: Raw workshop results (CrewOutput object or string); only searched
+            for the documentation and summary that are not given
+        documentation: Detailed workshop documentation as a string or an iterable of
+            strings, e.g. streamed by a WorkshopRecord
+        summary: Executive summary
+        notes: Optional markdown added just above the footer
+
+    Yields:
+        Pieces of the formatted workshop output
     """
     # Convert CrewOutput to string if needed
-    if hasattr(results, 'raw'):
+    if results is None:
+        results_text = ""
+    elif hasattr(results, 'raw'):
         # If it's a CrewOutput object, get the raw output
         results_text = results.raw
     else:
@@ -146,7 +172,7 @@ def format_workshop_output(results):
     current_agent = None
     current_content = []
 
-    lines = results_text.split('\n')
+    lines = results_text.split('\n') if results_text and not (documentation and summary) else []
     for line in lines:
         if line.startswith('# Agent:'):
             # Save the previous agent's content
@@ -183,30 +209,40 @@ def format_workshop_output(results):
             # Legacy format
             workshop_summary = cso_content.split('## Final Answer:')[1].strip()
 
+    # Documentation and summary passed in by the caller take precedence over the ones found in the text
+    if documentation:
+        historian_documentation = documentation
+    if summary:
+        workshop_summary = summary
+
     # Format the output
-    formatted_output = "# GCC/MENA Venture Monetization Workshop Results\n\n"
+    yield "# GCC/MENA Venture Monetization Workshop Results\n\n"
 
     # Add the executive summary if available
     if workshop_summary:
-        formatted_output += "## Executive Summary\n\n"
-        formatted_output += workshop_summary + "\n\n"
+        yield "## Executive Summary\n\n"
+        yield workshop_summary + "\n\n"
 
     # Add a table of contents
-    formatted_output += "## Table of Contents\n\n"
-    formatted_output += "1. [Executive Summary](#executive-summary)\n"
-    formatted_output += "2. [Detailed Workshop Documentation](#detailed-workshop-documentation)\n"
-    formatted_output += "   - [Venture Definition](#venture-definition)\n"
-    formatted_output += "   - [Monetization Streams](#monetization-streams)\n"
-    formatted_output += "   - [Revenue and Expense Analysis](#revenue-and-expense-analysis)\n"
-    formatted_output += "   - [Prioritized Streams](#prioritized-streams)\n"
-    formatted_output += "   - [Validation Strategy](#validation-strategy)\n"
-    formatted_output += "   - [Pivot Implications](#pivot-implications)\n"
-    formatted_output += "3. [Final Recommendations](#final-recommendations)\n\n"
+    yield ("## Table of Contents\n\n"
+           "1. [Executive Summary](#executive-summary)\n"
+           "2. [Detailed Workshop Documentation](#detailed-workshop-documentation)\n"
+           "   - [Venture Definition](#venture-definition)\n"
+           "   - [Monetization Streams](#monetization-streams)\n"
+           "   - [Revenue and Expense Analysis](#revenue-and-expense-analysis)\n"
+           "   - [Prioritized Streams](#prioritized-streams)\n"
+           "   - [Validation Strategy](#validation-strategy)\n"
+           "   - [Pivot Implications](#pivot-implications)\n"
+           "3. [Final Recommendations](#final-recommendations)\n\n")
 
     # Add the historian's documentation if available
     if historian_documentation:
-        formatted_output += "## Detailed Workshop Documentation\n\n"
-        formatted_output += historian_documentation + "\n\n"
+        yield "## Detailed Workshop Documentation\n\n"
+        if isinstance(historian_documentation, str):
+            yield historian_documentation
+        else:
+            yield from historian_documentation
+        yield "\n\n"
 
     # If neither the summary nor documentation was found, fall back to the original approach
     if not workshop_summary and not historian_documentation:
@@ -223,37 +259,114 @@ def format_workshop_output(results):
 
         # Add venture description
         if "Venture Description" in sections:
-            formatted_output += "## Venture Description\n\n"
-            formatted_output += "\n".join(sections["Venture Description"]) + "\n\n"
+            yield "## Venture Description\n\n"
+            yield "\n".join(sections["Venture Description"]) + "\n\n"
 
         # Add prioritized streams
         if "Prioritized Streams" in sections:
-            formatted_output += "## Top Monetization Streams\n\n"
-            formatted_output += "\n".join(sections["Prioritized Streams"]) + "\n\n"
+            yield "## Top Monetization Streams\n\n"
+            yield "\n".join(sections["Prioritized Streams"]) + "\n\n"
 
         # Add validation strategies
         if "Validation Strategy" in sections:
-            formatted_output += "## Validation Strategies\n\n"
-            formatted_output += "\n".join(sections["Validation Strategy"]) + "\n\n"
+            yield "## Validation Strategies\n\n"
+            yield "\n".join(sections["Validation Strategy"]) + "\n\n"
 
         # Add pivot implications
         if "Pivot Implications" in sections:
-            formatted_output += "## Pivot Implications\n\n"
-            formatted_output += "\n".join(sections["Pivot Implications"]) + "\n\n"
+            yield "## Pivot Implications\n\n"
+            yield "\n".join(sections["Pivot Implications"]) + "\n\n"
 
         # Add recommendations
         if "Recommendations" in sections:
-            formatted_output += "## Final Recommendations\n\n"
-            formatted_output += "\n".join(sections["Recommendations"]) + "\n\n"
+            yield "## Final Recommendations\n\n"
+            yield "\n".join(sections["Recommendations"]) + "\n\n"
 
         # If no sections were found, return the raw output
         if not sections:
-            formatted_output += "## Raw Workshop Output\n\n"
-            formatted_output += results_text
+            yield "## Raw Workshop Output\n\n"
+            yield results_text
+
+    if notes:
+        yield notes
 
     # Add a footer with information about the workshop
-    formatted_output += "\n---\n\n"
-    formatted_output += "*This workshop was conducted using CrewAI with GPT-4.1 and web browsing capabilities.*\n"
-    formatted_output += "*The agents actively researched current market trends and benchmarks in the GCC/MENA region to provide realistic recommendations.*\n"
+    yield "\n---\n\n"
+    yield "*This workshop was conducted using CrewAI with GPT-4.1 and web browsing capabilities.*\n"
+    yield "*The agents actively researched current market trends and benchmarks in the GCC/MENA region to provide realistic recommendations.*\n"
+
+def format_workshop_output(results, documentation=None, summary=None, notes=None):
+    """
+    Format the final workshop output in a clean, structured format with a summary and detailed sections.
+
+    Args:
+        results: Raw workshop results (CrewOutput object or string)
+        documentation: Detailed workshop documentation, e.g. rendered by a WorkshopRecord
+            (searched for in the results when not given)
+        summary: Executive summary (searched for in the results when not given)
+        notes: Optional markdown added just above the footer
+
+    Returns:
+        Formatted workshop output as a string
+    """
+    return "".join(iter_workshop_output(results, documentation=documentation, summary=summary, notes=notes))
+
+@contextmanager
+def atomic_writer(path):
+    """
+    Open a file for writing that replaces path atomically once the block completes,
+    so concurrent readers never see a partial file.
+
+    Args:
+        path: Destination file path
+    """
+    path = str(path)
+    # Unique per writer, since the runs of one process (e.g. the workshop service) write the same files
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def copy_file_atomic(source, path):
+    """Copy a file to path atomically, streaming its content."""
+    with open(source, "r") as src, atomic_writer(path) as dst:
+        shutil.copyfileobj(src, dst)
+
+def write_text_atomic(path, text):
+    """
+    Write text to a file atomically so concurrent readers never see a partial file.
+
+    Args:
+        path: Destination file path
+        text: Content to write
+    """
+    with atomic_writer(path) as f:
+        f.write(text)
+
+def load_config(config_file):
+    """
+    Load a workshop configuration file, parsing it only when it changed since the last load.
+
+    A long-running process (such as the workshop service) then parses each
+    configuration once, however many runs use it. Every caller gets its own copy.
 
-    return formatted_output
+    Args:
+        config_file: Path to the JSON configuration file
+
+    Returns:
+        The configuration dictionary
+    """
+    path = os.path.abspath(config_file)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _configs_lock:
+        cached = _configs.get(path)
+        if cached is None or cached[0] != version:
+            with open(path, "r") as f:
+                cached = (version, json.load(f))
+            _configs[path] = cached
+    return copy.deepcopy(cached[1])
@@ -0,0 +1,161 @@
+import argparse
+from pathlib import Path
+
+from config import VARIANTS_DIR
+from incremental import TaskResultStore, task_input_fingerprint
+from utils import format_markdown_table, load_config, unique_id
+
+def plan_variants(venture_idea, config_files):
+    """
+    Merge the task graphs of several workshop variants and find the tasks they share.
+
+    A task node is identified by the fingerprint of its inputs (rendered
+    instructions, agents, model settings and limits, see
+    task_input_fingerprint), with the identities of its upstream nodes in place
+    of their outputs. Two variants share a node when they would run the same
+    task on the same inputs, which also requires sharing everything upstream of it.
+
+    Args:
+        venture_idea: A brief description of the venture idea
+        config_files: The variants' configuration files
+
+    Returns:
+        List of node dictionaries with key, task_id and the variants (indexes
+        into config_files) that contain the node, in execution order of the first variant containing it
+    """
+    from tasks import compile_task_prompts
+
+    nodes = {}
+    for v, config_file in enumerate(config_files):
+        config = load_config(config_file)
+        prompts = compile_task_prompts(venture_idea, config_file)
+        keys = {}
+        for i, task_config in enumerate(config["tasks"]):
+            prompt = prompts[task_config["id"]]
+            _, instructions, _ = prompt.render({})
+            upstream = {context_id: keys[context_id] for context_id in prompt.context_ids if context_id in keys}
+            key = task_input_fingerprint(config, i, instructions, upstream)
+            keys[task_config["id"]] = key
+            nodes.setdefault(key, {"key": key, "task_id": task_config["id"], "variants": []})["variants"].append(v)
+    return list(nodes.values())
+
+def print_variant_plan(nodes, config_files):
+    """Print which tasks the variants share and where they diverge."""
+    shared = [node for node in nodes if len(node["variants"]) > 1]
+    print(f"\nMerged task graph of {len(config_files)} variants: {len(nodes)} distinct tasks, {len(shared)} shared")
+    for node in nodes:
+        variants = ", ".join(Path(config_files[v]).name for v in node["variants"])
+        marker = "shared" if len(node["variants"]) > 1 else "own"
+        print(f"- {node['task_id']} [{node['key'][:8]}] {marker}: {variants}")
+    runs = sum(len(node["variants"]) for node in nodes)
+    print(f"\n{len(nodes)} of {runs} task runs would execute; {runs - len(nodes)} would be shared")
+
+def run_variants(venture_idea, config_files, use_response_cache=False, reuse_earlier_runs=False, on_event=None):
+    """
+    Run one venture idea through several workshop variants, executing each shared task once.
+
+    The variants run one after another with a task result store of their own
+    (or the shared incremental store with reuse_earlier_runs). A task whose
+    inputs match a task already executed by an earlier variant, i.e. a node
+    shared in plan_variants(), takes that output instead of running again,
+    so the variants only fan out from the first task where they differ.
+
+    Args:
+        venture_idea: A brief description of the venture idea
+        config_files: The variants' configuration files
+        use_response_cache: Serve repeated LLM prompts from the shared on-disk response cache
+        reuse_earlier_runs: Also reuse unchanged tasks of earlier workshops from the shared store
+        on_event: Optional callable receiving every progress event of every variant
+
+    Returns:
+        Dictionary with a summary per variant (config_file, run_id, report_path, cost,
+        executed and reused task IDs) and the llm_calls, seconds and cost saved in total
+    """
+    from venture_workshop import run_venture_workshop
+
+    batch_id = unique_id()
+    store_path = Path(VARIANTS_DIR) / f"{batch_id}.sqlite3"
+    store = TaskResultStore() if reuse_earlier_runs else TaskResultStore(store_path)
+
+    variants = []
+    try:
+        for v, config_file in enumerate(config_files):
+            summary = {"config_file": config_file, "run_id": f"{batch_id}_v{v + 1}", "executed": [], "reused": [],
+                       "cost": 0.0, "llm_calls_saved": 0, "seconds_saved": 0.0, "cost_saved": 0.0}
+
+            def collect(event, summary=summary):
+                if event["type"] == "task_completed":
+                    summary["executed"].append(event["task_id"])
+                    summary["cost"] += event["cost"]
+                elif event["type"] == "task_reused":
+                    summary["reused"].append(event["task_id"])
+                    summary["llm_calls_saved"] += event["saved_llm_calls"]
+                    summary["seconds_saved"] += event["saved_seconds"]
+                    summary["cost_saved"] += event["saved_cost"]
+                if on_event:
+                    on_event(event)
+
+            print(f"\nVariant {v + 1} of {len(config_files)}: {config_file}")
+            summary["report_path"] = str(run_venture_workshop(
+                venture_idea, config_file, run_id=summary["run_id"], on_event=collect,
+                use_response_cache=use_response_cache, return_output=False, task_results=store
+            ))
+            variants.append(summary)
+    finally:
+        # The batch store only serves this comparison
+        if not reuse_earlier_runs:
+            for path in store_path.parent.glob(f"{store_path.name}*"):
+                path.unlink()
+
+    result = {
+        "batch_id": batch_id,
+        "variants": variants,
+        "llm_calls_saved": sum(variant["llm_calls_saved"] for variant in variants),
+        "seconds_saved": sum(variant["seconds_saved"] for variant in variants),
+        "cost_saved": sum(variant["cost_saved"] for variant in variants)
+    }
+    result["report_path"] = str(write_variant_report(venture_idea, result))
+    return result
+
+def write_variant_report(venture_idea, result):
+    """
+    Write an overview of a multi-variant run linking each variant's final report.
+
+    Returns:
+        Path of the overview in the reports directory
+    """
+    rows = [[Path(variant["config_file"]).name, variant["run_id"], len(variant["executed"]),
+             ", ".join(variant["reused"]) or "-", f"${variant['cost']:.4f}", variant["report_path"]]
+            for variant in result["variants"]]
+    table = format_markdown_table(["Variant", "Run", "Tasks executed", "Shared tasks reused", "Cost", "Report"], rows)
+    path = Path("reports") / f"workshop_variants_{result['batch_id']}.md"
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(
+        f"# Workshop Variants\n\n**Venture idea:** {venture_idea}\n\n{table}\n\n"
+        f"Sharing tasks between the variants saved {result['llm_calls_saved']} LLM calls, "
+        f"{result['seconds_saved']:.0f} seconds and ${result['cost_saved']:.4f}.\n",
+        encoding="utf-8"
+    )
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one venture idea through several workshop configurations, "
+                                                 "executing the tasks they share once.")
+    parser.add_argument("venture_idea", help="A brief description of the venture idea")
+    parser.add_argument("config_files", nargs="+", help="Configuration files of the variants to compare")
+    parser.add_argument("--dry-run", action="store_true", help="Only print which tasks the variants share")
+    parser.add_argument("--reuse-earlier-runs", action="store_true",
+                        help="Also reuse unchanged tasks of earlier workshops (see --incremental)")
+    parser.add_argument("--response-cache", action="store_true", help="Use the shared LLM response cache")
+    args = parser.parse_args()
+
+    print_variant_plan(plan_variants(args.venture_idea, args.config_files), args.config_files)
+    if not args.dry_run:
+        result = run_variants(args.venture_idea, args.config_files, use_response_cache=args.response_cache,
+                              reuse_earlier_runs=args.reuse_earlier_runs)
+        print("\n" + "=" * 80)
+        for variant in result["variants"]:
+            print(f"- {variant['config_file']}: {len(variant['executed'])} tasks executed, "
+                  f"{len(variant['reused'])} shared, ${variant['cost']:.4f}, report: {variant['report_path']}")
+        print(f"Shared tasks saved {result['llm_calls_saved']} LLM calls, {result['seconds_saved']:.0f} seconds "
+              f"and ${result['cost_saved']:.4f}; overview: {result['report_path']}")
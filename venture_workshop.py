@@ -1,47 +1,32 @@
 from crewai import Crew, Process, Task
-from langchain_openai import ChatOpenAI
+import argparse
+import asyncio
 import os
-import datetime
-import psutil
 import json
 import time
-import tiktoken
+import traceback
 from pathlib import Path
 from dotenv import load_dotenv
-from agents import create_agents
-from tasks import create_tasks
-from config import OPENAI_MODEL, AGENT_TEMPERATURE
-from utils import format_workshop_output
-
-# Cost tracking constants
-MODEL_COSTS = {
-    "gpt-4-1106-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
-    "gpt-4-0125-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
-    "gpt-4-turbo-preview": {"input": 0.01, "output": 0.03},  # $0.01 per 1K input tokens, $0.03 per 1K output tokens
-    "gpt-4": {"input": 0.03, "output": 0.06},  # $0.03 per 1K input tokens, $0.06 per 1K output tokens
-    "gpt-4-32k": {"input": 0.06, "output": 0.12},  # $0.06 per 1K input tokens, $0.12 per 1K output tokens
-    "gpt-3.5-turbo": {"input": 0.0015, "output": 0.002}  # $0.0015 per 1K input tokens, $0.002 per 1K output tokens
-}
-
-# Function to count tokens
-def count_tokens(text, model="gpt-4"):
-    """Count the number of tokens in a text string."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except Exception as e:
-        print(f"Error counting tokens: {e}")
-        # Fallback: estimate tokens as words / 0.75 (rough approximation)
-        return int(len(text.split()) / 0.75)
-
-# Function to calculate cost
-def calculate_cost(input_tokens, output_tokens, model=OPENAI_MODEL):
-    """Calculate the cost of API usage based on tokens and model."""
-    # Default to gpt-4 costs if model not found
-    costs = MODEL_COSTS.get(model, MODEL_COSTS["gpt-4"])
-    input_cost = (input_tokens / 1000) * costs["input"]
-    output_cost = (output_tokens / 1000) * costs["output"]
-    return input_cost + output_cost
+from agents import AgentRoster
+from tasks import compile_task_prompts, create_task, create_tasks
+from config import OPENAI_MODEL, OPENAI_MODEL_MINI, AGENT_TEMPERATURE, OUTPUT_STORE_DIR, REPORT_ARCHIVE
+from idea_index import DEFAULT_IDEA_INDEX, IdeaIndex, task_fingerprint
+from delegation_plans import DEFAULT_DELEGATION_PLANS, DelegationPlanStore, DelegationRecorder, config_hash, replay_delegations
+from knowledge_store import DEFAULT_KNOWLEDGE, KnowledgeStore, extract_facts, fact_tags, format_facts
+from incremental import DEFAULT_INCREMENTAL, TaskResultStore, plan_incremental_run, print_incremental_plan, \
+    task_input_fingerprint
+from metering import RunAborted, RunMeter, count_tokens, create_llm
+from output_store import OutputStore
+from profiler import NULL_PROFILER, PROFILE_SAMPLERS, RunProfiler
+from report_archive import ReportArchive
+from response_cache import ResponseCache
+from run_registry import RunRegistry
+from speculation import DEFAULT_SPECULATION, SPECULATION_DRAFTS, SpeculativeTask, text_similarity
+from structured_output import compact_json, parse_structured_output, render_markdown, resolve_output_schema
+from tool_memo import ToolMemo
+from tool_registry import ToolRegistry
+from utils import atomic_writer, copy_file_atomic, iter_workshop_output, load_config, unique_id
+from workshop_record import DEFAULT_HISTORIAN, HISTORIAN_AGENT_ID, HISTORIAN_MODES, WorkshopRecord
 
 # Load environment variables
 load_dotenv()
@@ -51,288 +36,1164 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 if not openai_api_key:
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-# Initialize the LLM with web browsing capabilities
-llm = ChatOpenAI(
-    model=OPENAI_MODEL,
-    temperature=AGENT_TEMPERATURE,
-    api_key=openai_api_key,
-    tools=[{"type": "web_search"}]  # Enable web search capability
-)
+# Initialize the shared LLM used when no per-run LLM is needed
+llm = create_llm(openai_api_key, OPENAI_MODEL, AGENT_TEMPERATURE)
+
+def _create_run_llm(meter, use_response_cache):
+    """Create a metered LLM for one run, optionally backed by the shared response cache."""
+    cache = ResponseCache() if use_response_cache else None
+    return create_llm(openai_api_key, OPENAI_MODEL, AGENT_TEMPERATURE, meter=meter, cache=cache)
 
-def run_venture_workshop(venture_idea, config_file="workshop_config.json"):
+def run_venture_workshop(venture_idea, config_file="workshop_config.json", run_id=None, on_event=None,
+                         use_response_cache=False, registry=None, speculative=None, return_output=True,
+                         metrics=None, llm_call_events=False, seed_from=None, incremental=None, call_gate=None,
+                         profile=None, task_results=None, archive_reports=None):
     """
     Run the venture monetization workshop for a given idea.
 
+    The run is recorded in the run registry and waits for a free slot when the
+    maximum number of concurrent workshops is already running.
+
     Args:
         venture_idea: A brief description of the venture idea
         config_file: Path to the JSON configuration file
+        run_id: Unique ID for this run (defaults to a timestamp with a random suffix)
+        on_event: Optional callable receiving progress event dictionaries
+        use_response_cache: Serve repeated LLM prompts from the shared on-disk response cache
+        registry: RunRegistry to record the run in (defaults to the shared registry)
+        speculative: Start each dependent task early on a draft of its upstream output
+            (defaults to the "speculation" setting of the configuration)
+        return_output: Read the final report back and return it; batch callers that
+            only need the report file can skip this
+        metrics: Optional WorkshopMetrics to update with the run's events
+        llm_call_events: Also send an llm_call event to on_event for every LLM call
+            (always done when metrics are given)
+        seed_from: Run ID of an earlier run of a near-duplicate idea (see IdeaIndex) whose
+            early-stage outputs are reused instead of running those tasks again
+        incremental: Reuse the stored output of every task whose inputs are unchanged since an
+            earlier run (defaults to the "incremental" setting of the configuration)
+        call_gate: Optional callable that blocks before every uncached LLM request until it may
+            be sent (see WorkshopScheduler.llm_gate)
+        profile: Profile each phase of the run into PROFILE_DIR/<run_id>; True or a sampler name
+            ("cprofile" or "pyinstrument"). Off by default, which adds no profiling code to the run
+        task_results: TaskResultStore to reuse unchanged tasks from and store results in, instead
+            of the shared store; implies incremental (see run_variants)
+        archive_reports: Store the progress reports in the report archive instead of one file
+            per step (defaults to REPORT_ARCHIVE)
 
     Returns:
-        The complete workshop output
+        The complete workshop output, or the path of the final report if return_output is False
+
+    Raises:
+        RunAborted: If the run was cancelled or reaped while it was queued
     """
-    # Create reports directory if it doesn't exist
-    reports_dir = Path("reports")
-    reports_dir.mkdir(exist_ok=True)
-
-    # Create a timestamp for this workshop
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    print(f"Running monetization workshop for venture: {venture_idea}")
-    print(f"Using model: {OPENAI_MODEL}")
-    print(f"Using configuration from: {config_file}")
-
-    # Create agents
-    print("Creating agents from configuration...")
-    agent_dict = create_agents(llm, config_file)
-
-    # Create tasks
-    print("Setting up workshop tasks from configuration...")
-    tasks = create_tasks(agent_dict, venture_idea, config_file)
-
-    # Create the crew
-    print("Assembling the crew...")
-    crew = Crew(
-        agents=list(agent_dict.values()),  # Convert dictionary to list for CrewAI
-        tasks=tasks,
-        verbose=True,
-        process=Process.hierarchical,  # Use hierarchical process to enable collaboration
-        manager_llm=llm  # Use the same LLM for the manager agent
-    )
-
-    # Create a function to update the progress report
-    def update_progress_report(completed_tasks, task_costs=None):
-        # Create a progress report
-        progress_report = f"# GCC/MENA Venture Monetization Workshop - Progress Report\n\n"
-        progress_report += f"## Venture Idea\n\n{venture_idea}\n\n"
-        progress_report += f"## Progress: {len(completed_tasks)} of {len(tasks)} steps completed\n\n"
-
-        # Add cost summary if available
-        if task_costs:
-            total_cost = sum(cost_data["cost"] for cost_data in task_costs.values())
-            total_input_tokens = sum(cost_data["input_tokens"] for cost_data in task_costs.values())
-            total_output_tokens = sum(cost_data["output_tokens"] for cost_data in task_costs.values())
-            total_execution_time = sum(cost_data["execution_time"] for cost_data in task_costs.values())
-
-            progress_report += f"## Cost Summary\n\n"
-            progress_report += f"- **Total Cost**: ${total_cost:.4f}\n"
-            progress_report += f"- **Total Tokens**: {total_input_tokens:,} input, {total_output_tokens:,} output\n"
-            progress_report += f"- **Total Execution Time**: {total_execution_time:.2f} seconds\n\n"
-
-        # Add completed steps
-        progress_report += f"## Completed Steps\n\n"
-        for i, (task_name, task_output) in enumerate(completed_tasks.items(), 1):
-            # Extract the outcome section if available
-            # Make sure task_output is a string
-            task_output_str = str(task_output)
-            outcome = task_output_str
-            if "# Outcome" in task_output_str:
-                outcome = task_output_str.split("# Outcome")[1].split("# Collaboration Summary")[0].strip()
-
-            progress_report += f"### Step {i}: {task_name}\n\n"
-            progress_report += f"#### Outcome\n{outcome}\n\n"
-
-            # Add cost information if available
-            if task_costs and task_name in task_costs:
-                cost_data = task_costs[task_name]
-                progress_report += f"#### Task Metrics\n"
-                progress_report += f"- **Cost**: ${cost_data['cost']:.4f}\n"
-                progress_report += f"- **Tokens**: {cost_data['input_tokens']:,} input, {cost_data['output_tokens']:,} output\n"
-                progress_report += f"- **Execution Time**: {cost_data['execution_time']:.2f} seconds\n\n"
-
-            # Add a link to the detailed explanation
-            progress_report += f"[View detailed explanation](#step-{i}-details)\n\n"
-
-        # Add detailed explanations in a separate section
-        progress_report += f"## Detailed Explanations\n\n"
-        for i, (task_name, task_output) in enumerate(completed_tasks.items(), 1):
-            progress_report += f"<a id='step-{i}-details'></a>\n"
-            progress_report += f"### Step {i}: {task_name} - Details\n\n"
-            progress_report += f"{task_output}\n\n"
-
-        # Add footer
-        progress_report += "\n---\n\n"
-        progress_report += f"*Progress report generated at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
-        progress_report += f"*This workshop is being conducted using {OPENAI_MODEL} with web browsing capabilities.*\n"
-        if task_costs:
-            total_cost = sum(cost_data["cost"] for cost_data in task_costs.values())
-            progress_report += f"*Estimated total cost: ${total_cost:.4f}*\n"
-
-        # Save the progress report
-        with open("venture_workshop_results.md", "w") as f:
-            f.write(progress_report)
-
-        # Also save a timestamped version in the reports directory
-        report_path = reports_dir / f"workshop_progress_{timestamp}_step{len(completed_tasks)}.md"
-        with open(report_path, "w") as f:
-            f.write(progress_report)
-
-        print(f"\nProgress report updated: {len(completed_tasks)} of {len(tasks)} steps completed.")
-        print(f"Report saved to venture_workshop_results.md and {report_path}\n")
+    run_id = run_id or unique_id()
 
-    # Run the crew with step-by-step reporting
-    print("\nStarting the GCC/MENA Venture Monetization Workshop...\n")
-    print("This process will take some time as our agents work through each step.")
-    print("Please be patient while the workshop is in progress.\n")
+    registry = registry or RunRegistry()
+    registry.register(run_id, venture_idea, config_file)
 
-    # Initialize empty dictionaries to store completed tasks and costs
-    completed_tasks = {}
-    task_costs = {}
-    total_cost = 0
-    total_tokens = {"input": 0, "output": 0}
+    def emit(event_type, **data):
+        # Task latencies let the scheduler estimate the length of future runs of this configuration
+        if event_type == "task_completed" and not data["truncated"]:
+            registry.record_task(run_id, data["task_id"], data["execution_time"])
+        if on_event or metrics:
+            event = {"type": event_type, "run_id": run_id, **data}
+            if metrics:
+                metrics.observe(event)
+            if on_event:
+                on_event(event)
 
-    # Execute each task sequentially and update the report after each one
-    for i, task in enumerate(tasks):
-        task_name = task.description.split('\n')[0].strip()
-        print(f"\nExecuting task {i+1} of {len(tasks)}: {task_name}")
-
-        # Track start time
-        start_time = time.time()
-
-        # Estimate input tokens from task description
-        task_input_tokens = count_tokens(task.description, OPENAI_MODEL)
-
-        # Special handling for the first task - use all agents
-        if i == 0:  # First task - full team collaboration
-            print("\nThis is the first task - engaging the entire team for collaboration...")
-            # Create a crew with all agents for the first task
-            full_team_crew = Crew(
-                agents=list(agent_dict.values()),  # All agents
-                tasks=[task],
-                verbose=True,
-                process=Process.hierarchical,  # Use hierarchical process for collaboration
-                manager_llm=llm  # Use the same LLM for the manager agent
-            )
-            # Execute the task with the full team
-            task_result = full_team_crew.kickoff()
-        else:  # All other tasks - single agent with collaboration
-            # Get collaborators from config
-            collaborators = []
-            with open(config_file, "r") as f:
-                config = json.load(f)
-                for task_config in config["tasks"]:
-                    if task_config["id"] == task.description.split('\n')[0].strip().lower().replace(" ", "_"):
-                        if "collaborators" in task_config:
-                            collaborator_ids = task_config["collaborators"]
-                            collaborators = [agent_dict[agent_id] for agent_id in collaborator_ids if agent_id in agent_dict]
-                        break
-
-            # If collaborators found, add them to the crew
-            if collaborators:
-                agents_for_task = [task.agent] + collaborators
-                print(f"Task will be executed by {task.agent.role} with collaboration from {', '.join([a.role for a in collaborators])}")
+    if not registry.acquire_slot(run_id):
+        # Cancelled or reaped while queued; its status is already recorded
+        error = f"Run {run_id} left the queue before it started"
+        emit("run_cancelled", error=error)
+        raise RunAborted(error)
+
+    # Without metrics or a consumer of LLM call events, the meter gets no listener at all
+    listener = (lambda usage: emit("llm_call", **usage)) if metrics or llm_call_events else None
+    meter = RunMeter(OPENAI_MODEL, listener=listener, call_gate=call_gate)
+    run_llm = _create_run_llm(meter, use_response_cache)
+    emit("run_started", venture_idea=venture_idea)
+
+    profiler = NULL_PROFILER
+    if profile:
+        profiler = RunProfiler(run_id, sampler=profile if isinstance(profile, str) else PROFILE_SAMPLERS[0])
+
+    try:
+        final_report_path, total_cost = _run_workshop(
+            venture_idea, config_file, run_id, run_llm, meter, emit, speculative, seed_from, incremental, profiler,
+            task_results, archive_reports
+        )
+    except BaseException as e:
+        registry.finish(run_id, "failed", error=f"{type(e).__name__}: {e}")
+        emit("run_failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+        raise
+    finally:
+        profiler.close()
+
+    registry.finish(run_id, "completed", cost=total_cost, report_path=str(final_report_path))
+    emit("run_completed", total_cost=total_cost, report_path=str(final_report_path), llm_usage=meter.snapshot())
+
+    if not return_output:
+        return final_report_path
+    with open(final_report_path, "r") as f:
+        return f.read()
+
+class WorkshopRun:
+    """
+    State and steps of a single workshop run.
+
+    The synchronous and asynchronous runners share this class and only differ
+    in how they kick off each task's crew. Task costs come from the run's
+    RunMeter, which also enforces the limits defined in the configuration.
+    Task outputs are kept on disk in an OutputStore and the reports are
+    streamed from there, so memory use does not grow with output length.
+    """
+
+    def __init__(self, venture_idea, config_file, run_id, llm, meter, emit, seed_from=None, incremental=None,
+                 profiler=NULL_PROFILER, task_results=None, archive_reports=None):
+        self.venture_idea = venture_idea
+        self.config_file = config_file
+        self.run_id = run_id
+        self.llm = llm
+        self.meter = meter
+        self.emit = emit
+        self.profiler = profiler
+
+        # Create reports directory if it doesn't exist
+        self.reports_dir = Path("reports")
+        self.reports_dir.mkdir(exist_ok=True)
+        self.outputs = OutputStore(Path(OUTPUT_STORE_DIR) / run_id)
+        # The archive keeps every step's report in compressed, deduplicated chunks instead of a file each
+        self.report_archive = ReportArchive() if (REPORT_ARCHIVE if archive_reports is None else archive_reports) else None
+
+        print(f"Running monetization workshop for venture: {venture_idea}")
+        print(f"Using model: {OPENAI_MODEL}")
+        print(f"Using configuration from: {config_file}")
+
+        with profiler.phase("config_load"):
+            self.config = load_config(config_file)
+
+        # Apply the run limits from the configuration
+        limits = self.config.get("limits", {})
+        meter.run_limits = limits.get("run", {})
+        meter.run_started_at = time.time()
+
+        # Speculative execution of dependent tasks (only used by the synchronous runner)
+        self.speculation = {**DEFAULT_SPECULATION, **self.config.get("speculation", {})}
+        if self.speculation["draft"] not in SPECULATION_DRAFTS:
+            raise ValueError(f"Unknown speculation draft '{self.speculation['draft']}'. "
+                             f"Expected one of {', '.join(SPECULATION_DRAFTS)}")
+        self.speculation_stats = {"attempts": 0, "hits": 0, "misses": 0, "seconds_saved": 0.0}
+
+        # The workshop record documents the run in place of the historian agent
+        self.historian = {**DEFAULT_HISTORIAN, **self.config.get("historian", {})}
+        if self.historian["mode"] not in HISTORIAN_MODES:
+            raise ValueError(f"Unknown historian mode '{self.historian['mode']}'. "
+                             f"Expected one of {', '.join(HISTORIAN_MODES)}")
+        self.record = WorkshopRecord(venture_idea, digest_chars=self.historian["digest_chars"])
+        self.agent_roles = {agent_config["id"]: agent_config["role"] for agent_config in self.config["agents"]}
+
+        # Early-stage outputs of an earlier run of a near-duplicate idea replace running those tasks
+        self.idea_index = {**DEFAULT_IDEA_INDEX, **self.config.get("idea_index", {})}
+        self.seed_from = seed_from
+        self.seeds = self.load_seeds(seed_from) if seed_from else {}
+
+        # Tasks whose inputs are unchanged since an earlier run reuse its output
+        self.incremental = {**DEFAULT_INCREMENTAL, **self.config.get("incremental", {})}
+        if incremental is not None:
+            self.incremental["enabled"] = incremental
+        if task_results is not None:
+            self.incremental["enabled"] = True
+        self.task_results = (task_results or TaskResultStore()) if self.incremental["enabled"] else None
+
+        # Facts recorded by earlier workshops are retrieved into the prompts, and this run's are recorded
+        self.knowledge = {**DEFAULT_KNOWLEDGE, **self.config.get("knowledge", {})}
+        self.knowledge_store = KnowledgeStore() if self.knowledge["enabled"] else None
+        self.knowledge_context = {}
+        if self.knowledge_store is not None:
+            self.venture_sector, _ = fact_tags(venture_idea)
+            evicted = self.knowledge_store.evict(self.knowledge["max_age_days"])
+            if evicted:
+                print(f"Evicted {evicted} stale facts from the knowledge store")
+
+        # The hierarchical manager's delegations are recorded per task and replayed by later runs of the same config
+        self.delegation = {**DEFAULT_DELEGATION_PLANS, **self.config.get("delegation_plans", {})}
+        self.delegation_plans = DelegationPlanStore() if self.delegation["enabled"] else None
+        self.config_hash = config_hash(self.config)
+        self.recorded_plans = {}
+        self.replayed_plans = {}
+
+        # Tasks with an output schema answer in JSON, which is validated and rendered locally
+        self.output_schemas = {task_config["id"]: resolve_output_schema(self.config, task_config)
+                               for task_config in self.config["tasks"]}
+        self.structured_outputs = {}
+
+        # Tools are declared in the configuration and imported when first used
+        self.tools = ToolRegistry.from_config(self.config)
+
+        # Tool results are memoized across all agents of this run
+        self.tool_memo = ToolMemo(self.config.get("tool_memoization", "reference"))
+
+        # Create agents
+        print("Creating agents from configuration...")
+        self.roster = {"max_agents": None, **self.config.get("roster", {})}
+        with profiler.phase("agent_creation"):
+            self.agent_dict = AgentRoster(llm, config_file, tool_memo=self.tool_memo, tools=self.tools)
+        self.roster_tokens_saved_estimate = {}
+
+        # Create tasks
+        print("Setting up workshop tasks from configuration...")
+        with profiler.phase("task_creation"):
+            self.prompts = compile_task_prompts(venture_idea, config_file)
+            self.tasks = create_tasks(self.agent_dict, venture_idea, config_file, prompts=self.prompts)
+
+        # Initialize empty dictionaries to store completed tasks and costs
+        # Task outputs are stored as OutputHandles
+        self.completed_tasks = {}
+        self.task_outputs = {}
+        self.task_costs = {}
+        self.prompt_sizes = {}
+        self.total_cost = 0
+        self.total_tokens = {"input": 0, "output": 0}
+        self.truncated_tasks = {}
+        self.reused_tasks = {}
+        self.stop_reason = None
+
+    def task_limits(self, i):
+        """Return the limits for a task: the config-wide task limits overridden by the task's own."""
+        limits = dict(self.config.get("limits", {}).get("task", {}))
+        limits.update(self.config["tasks"][i].get("limits", {}))
+        return limits
+
+    def prompt_budget(self, i):
+        """Return the prompt budget for a task: the config-wide budget overridden by the task's own."""
+        budget = dict(self.config.get("prompt_budget", {}))
+        budget.update(self.config["tasks"][i].get("prompt_budget", {}))
+        return budget
+
+    def read_outputs(self, task_ids):
+        """Load the outputs of the given tasks that have completed, as compact JSON for structured outputs."""
+        return {task_id: self.canonical_output(task_id) for task_id in task_ids if task_id in self.task_outputs}
+
+    def canonical_output(self, task_id):
+        """Return a completed task's output as its downstream tasks see it: compact JSON or the stored text."""
+        return self.structured_outputs.get(task_id) or self.task_outputs[task_id].read()
+
+    def store_output(self, i, text):
+        """
+        Store a task's output on disk and return its handle.
+
+        The output of a task with an output schema is parsed and validated;
+        the reports get markdown rendered from the data and downstream tasks
+        the compact JSON. An output that does not match its schema is stored
+        as it is.
+        """
+        task_config = self.config["tasks"][i]
+        schema = self.output_schemas[task_config["id"]]
+        if schema:
+            try:
+                data = parse_structured_output(text, schema)
+            except ValueError as e:
+                print(f"Structured output of task {i + 1} does not match its schema ({e}); keeping it as text")
+                self.emit("structured_output_invalid", task_index=i, task_id=task_config["id"], error=str(e))
             else:
-                agents_for_task = [task.agent]
-                print(f"Task will be executed by {task.agent.role} without specific collaborators")
-
-            # Create a single-task crew to execute just this task
-            task_crew = Crew(
-                agents=agents_for_task,
-                tasks=[task],
-                verbose=True,
-                process=Process.hierarchical,  # Still use hierarchical for collaboration
-                manager_llm=llm  # Use the same LLM for the manager agent
-            )
-            # Execute the task
-            task_result = task_crew.kickoff()
+                self.structured_outputs[task_config["id"]] = compact_json(data)
+                text = render_markdown(data, schema)
+        return self.outputs.put(f"{i + 1:02d}_{task_config['id']}", text)
+
+    def render_task_prompt(self, i, task):
+        """
+        Render a task's description with the outputs of the tasks it depends on.
+
+        The token size of each prompt component is reported before the task runs.
+        """
+        task_config = self.config["tasks"][i]
+        max_context_tokens = self.prompt_budget(i).get("max_context_tokens")
+        prompt = self.prompts[task_config["id"]]
+        description, instructions, context = prompt.render(
+            self.read_outputs(prompt.context_ids), max_context_tokens=max_context_tokens
+        )
+        knowledge = self.retrieve_knowledge(i, task.description)
+        task.description = description + (f"\n\n{knowledge}" if knowledge else "")
+
+        agent = task.agent
+        sizes = {
+            "backstory": count_tokens(f"{agent.role}\n{agent.goal}\n{agent.backstory}", OPENAI_MODEL),
+            "instructions": count_tokens(f"{instructions}\n{task.expected_output}", OPENAI_MODEL),
+            "context": count_tokens(context, OPENAI_MODEL) if context else 0,
+            "knowledge": count_tokens(knowledge, OPENAI_MODEL) if knowledge else 0
+        }
+        sizes["total"] = sum(sizes.values())
+
+        print(f"Prompt size: {sizes['backstory']:,} backstory + {sizes['instructions']:,} instructions + "
+              f"{sizes['context']:,} context "
+              + (f"+ {sizes['knowledge']:,} knowledge " if knowledge else "") + f"= {sizes['total']:,} tokens"
+              + (f" (context capped at {max_context_tokens:,})" if max_context_tokens else ""))
+        self.emit("prompt_budget", task_index=i, task_id=task_config["id"],
+                  max_context_tokens=max_context_tokens, **sizes)
+        return sizes
+
+    def retrieve_knowledge(self, i, task_name):
+        """
+        Return the facts of earlier workshops relevant to a task, formatted for its prompt, or None.
+
+        The facts are looked up once per task by the venture idea and the task
+        name, within the configured max_facts and max_chars.
+        """
+        if self.knowledge_store is None or not self.knowledge["inject"]:
+            return None
+        if i not in self.knowledge_context:
+            started = time.perf_counter()
+            facts = self.search_knowledge(task_name)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.knowledge_context[i] = format_facts(facts) if facts else None
+            if facts:
+                print(f"Knowledge: {len(facts)} facts from earlier workshops ({elapsed_ms:.1f} ms)")
+            self.emit("knowledge_retrieved", task_index=i, task_id=self.config["tasks"][i]["id"], facts=len(facts),
+                      milliseconds=elapsed_ms)
+        return self.knowledge_context[i]
+
+    def search_knowledge(self, task_name):
+        """Look up the facts relevant to a task in the knowledge store, without recording the lookup in the run."""
+        if self.knowledge_store is None or not self.knowledge["inject"]:
+            return []
+        return self.knowledge_store.search(
+            f"{self.venture_idea} {task_name.splitlines()[0]}", sector=self.venture_sector,
+            limit=self.knowledge["max_facts"], max_chars=self.knowledge["max_chars"],
+            max_age_days=self.knowledge["max_age_days"]
+        )
+
+    def record_knowledge(self):
+        """
+        Add the facts and figures stated by this run's tasks to the knowledge store, if it is enabled.
+
+        Only tasks that ran in this workshop and finished within their limits
+        contribute; reused and truncated outputs are left out.
+        """
+        if self.knowledge_store is None or not self.knowledge["record"]:
+            return
+        added = 0
+        for entry in self.record.entries:
+            if entry["truncated"] or entry["task_id"] in self.reused_tasks:
+                continue
+            facts = [(fact, *fact_tags(fact, self.venture_sector)) for fact in extract_facts(entry["output"].read_outcome())]
+            added += self.knowledge_store.add_facts(facts, run_id=self.run_id, task_id=entry["task_id"],
+                                                    agent_role=entry["agent_role"])
+        print(f"Knowledge store: {added} new facts recorded ({self.knowledge_store.stats()['facts']} stored)")
+
+    @property
+    def budget_exhausted(self):
+        """True once a run-wide limit has been reached and no further task may start."""
+        return self.meter.run_exceeded is not None
+
+    def build_task_crew(self, i, task):
+        """Create the hierarchical crew that executes a single task, recording its roster savings."""
+        crew, self.roster_tokens_saved_estimate[i] = self.task_crew(i, task)
+        return crew
+
+    def task_crew(self, i, task, agent_dict=None, llm=None):
+        """
+        Create the hierarchical crew that executes a single task, without changing the run's state.
+
+        The crew only contains the task's lead agent and its configured
+        collaborators; the first task involves the whole team, optionally
+        capped by the roster's max_agents with a summary of the absent roles.
+
+        Args:
+            i: Index of the task
+            task: The task to execute
+            agent_dict: AgentRoster to build the crew from (defaults to the run's roster)
+            llm: LLM for the manager agent (defaults to the run's LLM)
+
+        Returns:
+            Tuple of (crew, estimate of the manager prompt tokens saved by leaving the absent roles out)
+        """
+        agent_dict = agent_dict or self.agent_dict
+        llm = llm or self.llm
+        task_config = self.config["tasks"][i]
+        # The workshop record documents the run, so the historian agent takes no part in it
+        exclude = [HISTORIAN_AGENT_ID] if self.historian["mode"] == "aggregator" else []
+
+        full_team = i == 0
+        agent_ids, absent_ids = agent_dict.select(
+            task_config, full_team=full_team, max_agents=self.roster["max_agents"] if full_team else None,
+            exclude=exclude
+        )
+        agents_for_task = [agent_dict[agent_id] for agent_id in agent_ids]
+
+        # Special handling for the first task - use the whole team
+        if full_team:
+            print(f"\nThis is the first task - engaging the entire team ({len(agents_for_task)} agents) for collaboration...")
+            if absent_ids:
+                task.description += "\n\n" + agent_dict.absent_summary(absent_ids)
+                print(f"Roster capped at {len(agents_for_task)} agents; summarized the roles of "
+                      f"{', '.join(agent_dict.role(agent_id) for agent_id in absent_ids)}")
+        elif len(agents_for_task) > 1:
+            print(f"Task will be executed by {agents_for_task[0].role} with collaboration from "
+                  f"{', '.join([a.role for a in agents_for_task[1:]])}")
+        else:
+            print(f"Task will be executed by {agents_for_task[0].role} without specific collaborators")
+
+        # The manager's two delegation tools each list every coworker's role on each turn; the metered
+        # manager input tokens per turn are reported next to this estimate once the task has run
+        all_roles = [agent_dict.role(agent_id) for agent_id in agent_dict if agent_id not in exclude]
+        tokens_saved = 2 * (
+            count_tokens(", ".join(all_roles), OPENAI_MODEL) -
+            count_tokens(", ".join(agent.role for agent in agents_for_task), OPENAI_MODEL)
+        )
+
+        # Create a single-task crew to execute just this task
+        crew = Crew(
+            agents=agents_for_task,
+            tasks=[task],
+            verbose=True,
+            process=Process.hierarchical,  # Use hierarchical process for collaboration
+            manager_llm=llm.with_label("manager")  # Same LLM for the manager agent, metered separately
+        )
+        return crew, tokens_saved
 
+    def delegation_plan(self, i):
+        """Return the recorded delegation plan to replay for a task, or None to plan it live."""
+        if self.delegation_plans is None or not self.delegation["replay"]:
+            return None
+        return self.delegation_plans.get(self.config_hash, self.config["tasks"][i]["id"])
+
+    def replay_plan(self, i, task, crew, plan):
+        """
+        Execute a task by replaying its recorded delegation plan, without the manager's planning turns.
+
+        Args:
+            i: Index of the task
+            task: The task to execute
+            crew: The task's crew, whose agents the plan delegates to
+            plan: The recorded plan, from delegation_plan()
+
+        Returns:
+            The task's output, or None if the replay failed and the task has to be planned live
+        """
+        task_id = self.config["tasks"][i]["id"]
+        print(f"Replaying the recorded delegation plan: {' -> '.join(step['coworker'] for step in plan['steps'])}")
+        try:
+            output = replay_delegations(plan["steps"], task, {agent.role.casefold(): agent for agent in crew.agents})
+        except Exception as e:
+            # A limit stops the task rather than falling back to live planning
+            if self.meter.task_exceeded is not None:
+                raise
+            dropped = self.delegation_plans.record_replay(self.config_hash, task_id, False, self.delegation["max_failures"])
+            print(f"Delegation plan replay failed ({type(e).__name__}: {e}); falling back to live planning"
+                  + (" and dropping the plan" if dropped else ""))
+            self.emit("delegation_replay_failed", task_index=i, task_id=task_id, error=str(e), dropped=dropped)
+            return None
+        self.delegation_plans.record_replay(self.config_hash, task_id, True)
+        self.replayed_plans[i] = plan
+        return output
+
+    def record_plan(self, i, crew, recorder):
+        """Keep the delegations the manager made for a task, to be stored once the task completes."""
+        roles = {" ".join(agent.role.split()).casefold(): agent.role for agent in crew.agents}
+        # Delegations to unknown coworkers failed and the manager retried them, so they are not part of the plan
+        self.recorded_plans[i] = [{**step, "coworker": roles[step["coworker"].casefold()]}
+                                  for step in recorder.steps if step["coworker"].casefold() in roles]
+
+    def kickoff_task(self, i, task, crew):
+        """
+        Execute a task's crew, replaying its recorded delegation plan instead when there is one.
+
+        Returns:
+            Crew output, or the task's output as a string when the plan was replayed
+        """
+        # The agents of this crew have not seen the tool results delivered to earlier crews
+        with self.tool_memo.scope(self.config["tasks"][i]["id"]):
+            plan = self.delegation_plan(i)
+            if plan is not None:
+                output = self.replay_plan(i, task, crew, plan)
+                if output is not None:
+                    return output
+            if self.delegation_plans is None:
+                return crew.kickoff()
+            recorder = DelegationRecorder(task)
+            with recorder.recording():
+                task_result = crew.kickoff()
+            self.record_plan(i, crew, recorder)
+            return task_result
+
+    async def akickoff_task(self, i, task, crew):
+        """Asynchronous version of kickoff_task(), using the crew's native async kickoff."""
+        # The agents of this crew have not seen the tool results delivered to earlier crews
+        with self.tool_memo.scope(self.config["tasks"][i]["id"]):
+            plan = self.delegation_plan(i)
+            if plan is not None:
+                output = await asyncio.to_thread(self.replay_plan, i, task, crew, plan)
+                if output is not None:
+                    return output
+            if self.delegation_plans is None:
+                return await crew.akickoff()
+            recorder = DelegationRecorder(task)
+            with recorder.recording():
+                task_result = await crew.akickoff()
+            self.record_plan(i, crew, recorder)
+            return task_result
+
+    def start_task(self, i, task):
+        """Announce a task, render its prompt, start metering it, and return its name and start time."""
+        task_name = task.description.split('\n')[0].strip()
+        print(f"\nExecuting task {i+1} of {len(self.tasks)}: {task_name}")
+        self.emit("task_started", task_index=i, task_id=self.config["tasks"][i]["id"], task_name=task_name,
+                  total_tasks=len(self.tasks))
+
+        with self.profiler.phase(f"prompt_{i + 1}_{self.config['tasks'][i]['id']}"):
+            self.prompt_sizes[task_name] = self.render_task_prompt(i, task)
+
+        self.meter.start_task(self.task_limits(i))
+
+        return task_name, time.time()
+
+    def complete_task(self, i, task_name, start_time, task_result, truncated=None):
+        """
+        Record a task result with its metered cost and update the progress report.
+
+        Args:
+            i: Index of the task
+            task_name: Name of the task
+            start_time: Time the task started
+            task_result: Crew output, or None if the task was stopped before it finished
+            truncated: Reason the task was stopped early, if it was
+        """
         # Calculate execution time
         execution_time = time.time() - start_time
 
-        # Convert result to string and estimate output tokens
-        if hasattr(task_result, 'raw'):
+        # Convert result to string
+        if task_result is None:
+            # Keep whatever the agents produced before the limit was reached
+            task_output = self.meter.partial_output or "No output was produced before the limit was reached."
+            task_output = f"> **Truncated:** {truncated}. The output below is partial.\n\n{task_output}"
+        elif hasattr(task_result, 'raw'):
             task_output = task_result.raw
         else:
             task_output = str(task_result)
 
-        task_output_tokens = count_tokens(task_output, OPENAI_MODEL)
+        # Use the metered LLM usage of this task, including manager and delegation turns
+        usage = self.meter.task_usage()
+        self.total_cost += usage["cost"]
+        self.total_tokens["input"] += usage["input_tokens"]
+        self.total_tokens["output"] += usage["output_tokens"]
 
-        # Calculate cost
-        task_cost = calculate_cost(task_input_tokens, task_output_tokens, OPENAI_MODEL)
-        total_cost += task_cost
-        total_tokens["input"] += task_input_tokens
-        total_tokens["output"] += task_output_tokens
+        # Store the task result on disk and keep only its handle
+        task_config = self.config["tasks"][i]
+        output = self.store_output(i, task_output)
+        del task_output, task_result
+        self.tasks[i].output = None
+        self.completed_tasks[task_name] = output
+        self.task_outputs[task_config["id"]] = output
 
-        # Store the task result and metrics
-        completed_tasks[task_name] = task_output
-        task_costs[task_name] = {
+        # Store the task metrics
+        manager_turns, manager_input_tokens = self.meter.task_label_usage("manager")
+        replayed = self.replayed_plans.get(i)
+        self.task_costs[task_name] = {
             "execution_time": execution_time,
-            "input_tokens": task_input_tokens,
-            "output_tokens": task_output_tokens,
-            "cost": task_cost
+            "manager_turns": manager_turns,
+            "manager_turns_saved": replayed["manager_turns"] if replayed else 0,
+            "manager_prompt_tokens": manager_input_tokens // manager_turns if manager_turns else 0,
+            "roster_tokens_saved_estimate": self.roster_tokens_saved_estimate.get(i, 0),
+            "llm_calls": usage["llm_calls"],
+            "input_tokens": usage["input_tokens"],
+            "output_tokens": usage["output_tokens"],
+            "cost": usage["cost"],
+            "prompt_sizes": self.prompt_sizes.get(task_name)
         }
+        if truncated:
+            self.truncated_tasks[task_name] = truncated
+
+        # Add the task to the workshop record
+        self.record.add_task(
+            task_config["id"], task_name, self.agent_roles[task_config["agent_id"]], output,
+            metrics=self.task_costs[task_name],
+            collaborators=[self.agent_roles[agent_id] for agent_id in task_config.get("collaborators", [])
+                           if agent_id in self.agent_roles],
+            truncated=truncated
+        )
 
         # Print cost information
-        print(f"\nTask completed in {execution_time:.2f} seconds")
-        print(f"Estimated tokens: {task_input_tokens:,} input, {task_output_tokens:,} output")
-        print(f"Estimated cost: ${task_cost:.4f}")
-        print(f"Total cost so far: ${total_cost:.4f}")
+        if truncated:
+            print(f"\nTask truncated after {execution_time:.2f} seconds: {truncated}")
+        else:
+            print(f"\nTask completed in {execution_time:.2f} seconds")
+        print(f"Tokens: {usage['input_tokens']:,} input, {usage['output_tokens']:,} output across {usage['llm_calls']} LLM calls")
+        if manager_turns:
+            cost_data = self.task_costs[task_name]
+            print(f"Manager: {manager_turns} turns, {cost_data['manager_prompt_tokens']:,} metered input tokens per turn; "
+                  f"roster pruning estimated to save ~{cost_data['roster_tokens_saved_estimate']:,} per turn "
+                  f"from the role names")
+        if replayed:
+            print(f"Manager: delegation plan replayed, {replayed['manager_turns']} planning turns saved")
+        print(f"Cost: ${usage['cost']:.4f}")
+        print(f"Total cost so far: ${self.total_cost:.4f}")
+        if truncated:
+            self.emit("task_truncated", task_index=i, task_name=task_name, reason=truncated)
+        else:
+            self.store_plan(i, manager_turns)
+        if not truncated and self.task_results is not None:
+            self.task_results.put(self.input_fingerprint(i), task_config["id"], self.canonical_output(task_config["id"]),
+                                  self.task_costs[task_name], self.run_id)
+        self.emit("task_completed", task_index=i, task_id=task_config["id"], task_name=task_name,
+                  total_tasks=len(self.tasks), truncated=bool(truncated), **self.task_costs[task_name])
 
         # Update the progress report
-        update_progress_report(completed_tasks, task_costs)
+        self.update_progress_report()
 
-    # Format the final results
-    # All values in completed_tasks should now be strings
-    formatted_result = format_workshop_output("\n\n".join(completed_tasks.values()))
+    def store_plan(self, i, manager_turns):
+        """Store the delegation plan the manager made for a completed task, for later runs to replay."""
+        steps = self.recorded_plans.pop(i, None)
+        if not steps or not manager_turns:
+            return
+        self.delegation_plans.put(self.config_hash, self.config["tasks"][i]["id"], steps, manager_turns, self.run_id)
+        print(f"Recorded delegation plan: {' -> '.join(step['coworker'] for step in steps)} ({manager_turns} manager turns)")
 
-    # Save the final report
-    with open("venture_workshop_results.md", "w") as f:
-        f.write(formatted_result)
+    def load_seeds(self, run_id):
+        """
+        Load the reusable outputs of an earlier run from the idea index.
 
-    # Also save a final version in the reports directory
-    final_report_path = reports_dir / f"workshop_final_{timestamp}.md"
-    with open(final_report_path, "w") as f:
-        f.write(formatted_result)
+        A task is only seeded if its configuration is unchanged since that run
+        and all of its context tasks are seeded as well.
 
-    print(f"\nFinal workshop report saved to venture_workshop_results.md and {final_report_path}")
+        Returns:
+            Dictionary of task ID to output text
+        """
+        reuse_tasks = set(self.idea_index["reuse_tasks"])
+        fingerprints = {task_config["id"]: task_fingerprint(task_config)
+                        for task_config in self.config["tasks"] if task_config["id"] in reuse_tasks}
+        stored = IdeaIndex().seed_outputs(run_id, fingerprints)
 
-    return formatted_result
+        seeds = {}
+        for task_config in self.config["tasks"]:
+            task_id = task_config["id"]
+            if task_id in stored and all(context_id in seeds for context_id in task_config.get("context", [])):
+                seeds[task_id] = stored[task_id]
+        print(f"Reusing {len(seeds)} task output(s) from run {run_id}: {', '.join(seeds) or 'none'}")
+        return seeds
 
-if __name__ == "__main__":
-    # Check if a workshop is already in progress by looking for running processes
-    current_pid = os.getpid()
-    workshop_running = False
+    def input_fingerprint(self, i):
+        """Return the fingerprint of task i's inputs, given the outputs of its upstream tasks so far."""
+        prompt = self.prompts[self.config["tasks"][i]["id"]]
+        _, instructions, _ = prompt.render({})
+        return task_input_fingerprint(self.config, i, instructions, self.read_outputs(prompt.context_ids))
+
+    def reuse_task(self, i, task):
+        """
+        Complete task i with an earlier output instead of running it.
 
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        The output comes from the seeding run of a near-duplicate idea or, for
+        incremental runs, from the task result store when the task's inputs are unchanged.
+
+        Returns:
+            True if the task was reused, False if it has to run
+        """
+        task_config = self.config["tasks"][i]
+        saved = {}
+        if task_config["id"] in self.seeds:
+            output_text, source_run_id = self.seeds[task_config["id"]], self.seed_from
+        elif self.task_results is not None:
+            stored = self.task_results.get(self.input_fingerprint(i))
+            if stored is None:
+                return False
+            output_text, source_run_id, saved = stored["output"], stored["run_id"], stored["metrics"]
+        else:
+            return False
+
+        task_name = task.description.split('\n')[0].strip()
+        output = self.store_output(i, output_text)
+        self.tasks[i].output = None
+        self.completed_tasks[task_name] = output
+        self.task_outputs[task_config["id"]] = output
+        self.task_costs[task_name] = {"execution_time": 0.0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0,
+                                      "cost": 0.0, "reused_from": source_run_id}
+        self.reused_tasks[task_config["id"]] = source_run_id
+        self.record.add_task(
+            task_config["id"], task_name, self.agent_roles[task_config["agent_id"]], output,
+            metrics=self.task_costs[task_name],
+            collaborators=[self.agent_roles[agent_id] for agent_id in task_config.get("collaborators", [])
+                           if agent_id in self.agent_roles]
+        )
+
+        print(f"\nTask {i+1} of {len(self.tasks)} reused from run {source_run_id}: {task_name}")
+        # What the task took when it ran, i.e. what reusing it saved (unknown for seeds)
+        self.emit("task_reused", task_index=i, task_id=task_config["id"], task_name=task_name,
+                  total_tasks=len(self.tasks), source_run_id=source_run_id,
+                  saved_llm_calls=saved.get("llm_calls", 0), saved_seconds=saved.get("execution_time", 0.0),
+                  saved_cost=saved.get("cost", 0.0))
+        self.update_progress_report()
+        return True
+
+    def index_run(self):
+        """Add the run's venture idea and early-stage outputs to the idea index, if it is enabled."""
+        if not self.idea_index["enabled"]:
+            return
+        outputs = {
+            task_config["id"]: (task_fingerprint(task_config), self.canonical_output(task_config["id"]))
+            for task_config in self.config["tasks"]
+            if task_config["id"] in self.idea_index["reuse_tasks"] and task_config["id"] in self.task_outputs
+            and self.record_entry_complete(task_config["id"])
+        }
+        IdeaIndex().add(self.run_id, self.venture_idea, self.config_file, outputs)
+
+    def record_entry_complete(self, task_id):
+        """Whether a task finished without being truncated, so its output can be reused."""
+        return any(entry["task_id"] == task_id and not entry["truncated"] for entry in self.record.entries)
+
+    def speculate(self, i):
+        """
+        Start task i+1 in the background on a draft of task i's output, if it depends on task i.
+
+        The speculative task gets its own agents, LLM and meter, so it never
+        shares state with the crew executing task i. Its meter still sends the
+        calls through the run's LLM rate budget and counts against the run's limits.
+
+        Returns:
+            The SpeculativeTask, or None if task i+1 does not depend on task i
+        """
+        if i + 1 >= len(self.tasks):
+            return None
+        upstream_id = self.config["tasks"][i]["id"]
+        if upstream_id not in self.config["tasks"][i + 1].get("context", []):
+            return None
+        if self.config["tasks"][i + 1]["id"] in self.seeds:
+            return None
+
+        meter = RunMeter(OPENAI_MODEL, parent=self.meter)
+        meter.start_task(self.task_limits(i + 1))
+        speculation = SpeculativeTask(i + 1, upstream_id, meter)
+        speculation.start(self._run_speculation)
+        self.speculation_stats["attempts"] += 1
+        print(f"Speculatively starting task {i + 2} on a {self.speculation['draft']} draft of this task's output")
+        self.emit("speculation_started", task_index=i + 1, upstream_task_id=upstream_id,
+                  draft=self.speculation["draft"])
+        return speculation
+
+    def _run_speculation(self, speculation):
+        upstream = self.tasks[speculation.index - 1]
+
+        # Draft the upstream output
+        if self.speculation["draft"] == "partial":
+            while len(self.meter.partial_output) < self.speculation["min_partial_chars"]:
+                if speculation.aborted:
+                    return None
+                time.sleep(1.0)
+            draft = self.meter.partial_output
+        else:
+            draft_llm = create_llm(openai_api_key, OPENAI_MODEL_MINI, AGENT_TEMPERATURE, meter=speculation.meter)
+            draft = draft_llm.call([{
+                "role": "user",
+                "content": f"Write a concise first draft of the result of this workshop step, "
+                           f"focusing on the concrete results.\n\n{upstream.description}\n\n"
+                           f"Expected output: {upstream.expected_output}"
+            }])
+        speculation.draft = draft
+
+        # Run the downstream task on the draft with its own agents
+        task_config = self.config["tasks"][speculation.index]
+        llm = create_llm(openai_api_key, OPENAI_MODEL, AGENT_TEMPERATURE, meter=speculation.meter, cache=self.llm.cache)
+        agent_dict = AgentRoster(llm, self.config_file, tool_memo=self.tool_memo, tools=self.tools)
+        prompt = self.prompts[task_config["id"]]
+        description, _, _ = prompt.render(
+            {**self.read_outputs(prompt.context_ids), speculation.upstream_id: draft},
+            max_context_tokens=self.prompt_budget(speculation.index).get("max_context_tokens")
+        )
+        # This runs on the speculation's thread, so it leaves the run's state and events to the main thread
+        facts = self.search_knowledge(description)
+        task = create_task(agent_dict, task_config, description + (f"\n\n{format_facts(facts)}" if facts else ""),
+                           self.config)
+        speculation.kickoff_at = time.time()
+        crew, speculation.roster_tokens_saved_estimate = self.task_crew(speculation.index, task, agent_dict=agent_dict, llm=llm)
+        with self.tool_memo.scope(task_config["id"]):
+            return crew.kickoff()
+
+    def resolve_speculation(self, speculation, upstream_output):
+        """
+        Commit a speculative task if its draft context matches the final upstream output, or abort it.
+
+        Args:
+            speculation: The SpeculativeTask started for the next task
+            upstream_output: Final output of the task it ran ahead of
+        """
+        upstream_finished_at = time.time()
+        similarity = text_similarity(speculation.draft, upstream_output) if speculation.draft else 0.0
+        if similarity >= self.speculation["similarity_threshold"]:
+            # The inputs did not materially change; let the speculative run finish
+            speculation.wait()
+            speculation.committed = speculation.result is not None and speculation.error is None
+        else:
+            speculation.abort(f"Upstream output changed (similarity {similarity:.2f})")
+            speculation.wait()
+
+        saved = 0.0
+        if speculation.committed:
+            self.roster_tokens_saved_estimate[speculation.index] = speculation.roster_tokens_saved_estimate
+            saved = speculation.seconds_saved(upstream_finished_at)
+            self.speculation_stats["hits"] += 1
+            self.speculation_stats["seconds_saved"] += saved
+            print(f"Speculation for task {speculation.index + 1} committed (similarity {similarity:.2f}, "
+                  f"{saved:.1f}s saved)")
+        else:
+            self.speculation_stats["misses"] += 1
+            print(f"Speculation for task {speculation.index + 1} discarded (similarity {similarity:.2f}); "
+                  f"the task will run on the final output")
+        self.emit("speculation_resolved", task_index=speculation.index, committed=speculation.committed,
+                  similarity=similarity, seconds_saved=saved)
+
+    def stop(self, i):
+        """Record that the run budget was exhausted before task i could start."""
+        self.stop_reason = f"{self.meter.run_exceeded}; {len(self.tasks) - i} remaining step(s) were not run"
+        print(f"\nStopping the workshop: {self.stop_reason}")
+        self.emit("run_truncated", reason=self.stop_reason, skipped_tasks=len(self.tasks) - i)
+        self.update_progress_report()
+
+    def update_progress_report(self):
+        """Write the progress report for the tasks completed so far."""
+        completed_tasks = self.completed_tasks
+
+        step = len(completed_tasks)
+        with self.profiler.phase(f"report_step{step}"):
+            pieces = self.record.iter_progress_report(
+                len(self.tasks), stop_reason=self.stop_reason, speculation_stats=self.speculation_stats
+            )
+            if self.report_archive is not None:
+                # Stream the report into the archive and the results file at once
+                with atomic_writer("venture_workshop_results.md") as f:
+                    self.report_archive.put(self.run_id, pieces, step=step, copy_to=f)
+                report_path = f"{self.report_archive.path} (run {self.run_id}, step {step})"
+            else:
+                # Stream the report into the reports directory and copy it to the results file
+                report_path = self.reports_dir / f"workshop_progress_{self.run_id}_step{step}.md"
+                with atomic_writer(report_path) as f:
+                    f.writelines(pieces)
+                copy_file_atomic(report_path, "venture_workshop_results.md")
+
+        print(f"\nProgress report updated: {step} of {len(self.tasks)} steps completed.")
+        print(f"Report saved to venture_workshop_results.md and {report_path}\n")
+
+    def finalize(self):
+        """
+        Format and save the final report.
+
+        Returns:
+            Path of the final report
+        """
+        # Write the executive summary from the step digests with a single LLM call
+        summary = None
+        if self.historian["mode"] == "aggregator" and self.historian["narrative"] and self.record.entries:
+            cost_before = self.meter.cost
+            self.meter.start_task()  # The summary is not bound by the last task's limits
+            try:
+                with self.profiler.phase("executive_summary"):
+                    summary = self.record.write_narrative(self.llm)
+            except Exception as e:
+                print(f"Could not write the executive summary ({type(e).__name__}: {e}); using the step digests")
+            self.total_cost += self.meter.cost - cost_before
+
+        # Note any steps that were cut short by the configured limits, just above the footer
+        limits_note = None
+        if self.truncated_tasks or self.stop_reason:
+            limits_note = "## Limits Reached\n\n"
+            for task_name, reason in self.truncated_tasks.items():
+                limits_note += f"- **{task_name}**: truncated ({reason})\n"
+            if self.stop_reason:
+                limits_note += f"- **Workshop stopped early**: {self.stop_reason}\n"
+
+        final_report_path = self.reports_dir / f"workshop_final_{self.run_id}.md"
+        with self.profiler.phase("final_report"):
+            # Format the final results, streaming the documentation from the stored outputs
+            if self.historian["mode"] == "aggregator":
+                pieces = iter_workshop_output(documentation=self.record.iter_documentation(),
+                                              summary=summary or self.record.summary(), notes=limits_note)
+            else:
+                # The historian agent's documentation has to be searched for in the full outputs
+                results = "\n\n".join(output.read() for output in self.completed_tasks.values())
+                pieces = iter_workshop_output(results, notes=limits_note)
+
+            # Save the final report in the reports directory and copy it to the results file
+            with atomic_writer(final_report_path) as f:
+                f.writelines(pieces)
+            copy_file_atomic(final_report_path, "venture_workshop_results.md")
+            if self.report_archive is not None:
+                # Archived too, so the archive holds every report of the run
+                with open(final_report_path, "r") as f:
+                    self.report_archive.put(self.run_id, f)
+
+        print(f"\nFinal workshop report saved to venture_workshop_results.md and {final_report_path}")
+
+        print(f"Agents instantiated: {len(self.agent_dict.instantiated)} of {len(self.agent_dict)}")
+        print(f"Tools loaded: {', '.join(self.tools.loaded) or 'none'}")
+        if self.reused_tasks:
+            print(f"Tasks reused from earlier runs: {', '.join(self.reused_tasks)}")
+
+        stats = self.speculation_stats
+        if stats["attempts"]:
+            hit_rate = stats["hits"] / stats["attempts"]
+            print(f"Speculation: {stats['hits']} of {stats['attempts']} committed ({hit_rate:.0%} hit rate), "
+                  f"{stats['seconds_saved']:.1f} seconds saved")
+            self.emit("speculation_stats", hit_rate=hit_rate, **stats)
+
+        if self.replayed_plans:
+            turns_saved = sum(plan["manager_turns"] for plan in self.replayed_plans.values())
+            print(f"Delegation plans: {len(self.replayed_plans)} replayed, {turns_saved} manager turns saved")
+            self.emit("delegation_stats", replayed=len(self.replayed_plans), manager_turns_saved=turns_saved)
+
+        tool_stats = self.tool_memo.stats()
+        if tool_stats:
+            self.tool_memo.log_stats()
+            self.emit("tool_memo_stats", tools=tool_stats)
+
+        return final_report_path
+
+    def close(self):
+        """Remove the run's stored task outputs; the reports keep their content."""
+        self.outputs.cleanup()
+
+def _print_start_banner():
+    # Run the crew with step-by-step reporting
+    print("\nStarting the GCC/MENA Venture Monetization Workshop...\n")
+    print("This process will take some time as our agents work through each step.")
+    print("Please be patient while the workshop is in progress.\n")
+
+def _run_workshop(venture_idea, config_file, run_id, llm, meter, emit, speculative=None, seed_from=None,
+                  incremental=None, profiler=NULL_PROFILER, task_results=None, archive_reports=None):
+    """
+    Execute the workshop tasks and write the progress and final reports.
+
+    With speculation, each task that depends on the task being executed is
+    started early on a draft of its upstream output. Once the upstream task
+    completes, the speculative result is committed if the draft was similar
+    enough to the final output; otherwise the task runs again as usual.
+
+    Returns:
+        Tuple of (final report path, total cost)
+    """
+    run = WorkshopRun(venture_idea, config_file, run_id, llm, meter, emit, seed_from=seed_from, incremental=incremental,
+                      profiler=profiler, task_results=task_results, archive_reports=archive_reports)
+    if speculative is None:
+        speculative = run.speculation["enabled"]
+    _print_start_banner()
+
+    try:
+        speculation = None
         try:
-            # Skip the current process
-            if proc.info['pid'] == current_pid:
-                continue
+            # Execute each task sequentially and update the report after each one
+            for i, task in enumerate(run.tasks):
+                if run.reuse_task(i, task):
+                    if speculation is not None:
+                        # The task was started early but its inputs turned out unchanged
+                        speculation.abort("Task reused")
+                        speculation.wait()
+                        meter.add_usage(speculation.meter.snapshot())
+                        speculation = None
+                    continue
+                if run.budget_exhausted:
+                    run.stop(i)
+                    break
+
+                task_name, start_time = run.start_task(i, task)
+
+                if speculation is not None:
+                    # Charge the speculative run to this task, whether it is committed or not
+                    meter.add_usage(speculation.meter.snapshot())
+                    committed, speculation = speculation, None
+                    if committed.committed:
+                        run.complete_task(i, task_name, committed.kickoff_at, committed.result)
+                        continue
+
+                if speculative:
+                    speculation = run.speculate(i)
 
-            # Check if it's a Python process running venture_workshop.py
-            if proc.info['name'] == 'python' and any('venture_workshop.py' in cmd for cmd in proc.info['cmdline'] if cmd):
-                workshop_running = True
-                break
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-
-    if workshop_running:
-        print("A workshop is already running in another process.")
-        print("You can view the progress in the venture_workshop_results.md file.")
-        print("\nOptions:")
-        print("1. Wait for the current workshop to complete")
-        print("2. Kill the running workshop and start a new one")
-        print("3. Exit")
-
-        choice = input("\nEnter your choice (1-3): ")
-
-        if choice == '1':
-            print("\nPlease check venture_workshop_results.md for progress updates.")
-            exit(0)
-        elif choice == '2':
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+                truncated = None
+                phase = f"{i + 1}_{run.config['tasks'][i]['id']}"
                 try:
-                    if proc.info['pid'] != current_pid and proc.info['name'] == 'python' and \
-                       any('venture_workshop.py' in cmd for cmd in proc.info['cmdline'] if cmd):
-                        print(f"Terminating process {proc.info['pid']}...")
-                        proc.terminate()
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
-            print("Waiting for processes to terminate...")
-            import time
-            time.sleep(2)  # Give processes time to terminate
-        else:
-            print("Exiting.")
-            exit(0)
+                    with profiler.phase(f"crew_{phase}"):
+                        crew = run.build_task_crew(i, task)
+                    with profiler.phase(f"kickoff_{phase}"):
+                        task_result = run.kickoff_task(i, task, crew)
+                except Exception:
+                    # crewai may wrap the metering error, so check the meter rather than the exception type
+                    if meter.task_exceeded is None:
+                        raise
+                    task_result, truncated = None, str(meter.task_exceeded)
+                run.complete_task(i, task_name, start_time, task_result, truncated=truncated)
+
+                if speculation is not None:
+                    run.resolve_speculation(speculation, run.canonical_output(run.config["tasks"][i]["id"]))
+        finally:
+            # Never leave a speculative task running when the run stops or fails
+            if speculation is not None:
+                speculation.abort("Workshop stopped")
+                speculation.wait()
+                meter.add_usage(speculation.meter.snapshot())
+
+        final_report_path = run.finalize()
+        run.index_run()
+        run.record_knowledge()
+    finally:
+        # The reports keep the task outputs, so the stored copies can go
+        run.close()
+    return final_report_path, run.total_cost
+
+async def arun_venture_workshop(venture_idea, config_file="workshop_config.json", run_id=None, task_timeout=None,
+                                use_response_cache=False, registry=None, metrics=None, seed_from=None,
+                                incremental=None, call_gate=None):
+    """
+    Run the venture monetization workshop asynchronously, yielding progress events.
+
+    Every task is kicked off with the crew's native async kickoff, so a single
+    event loop can drive many workshops at once. A task that times out keeps
+    its partial output and is marked as truncated in the report. Cancelling the consuming task
+    (or closing the iterator) cancels the task that is currently running.
+
+    Args:
+        venture_idea: A brief description of the venture idea
+        config_file: Path to the JSON configuration file
+        run_id: Unique ID for this run (defaults to a timestamp with a random suffix)
+        task_timeout: Optional limit in seconds for each task
+        use_response_cache: Serve repeated LLM prompts from the shared on-disk response cache
+        registry: RunRegistry to record the run in (defaults to the shared registry)
+        metrics: Optional WorkshopMetrics to update with the run's events
+        seed_from: Run ID of an earlier run of a near-duplicate idea whose early-stage outputs are reused
+        incremental: Reuse the stored output of every task whose inputs are unchanged since an earlier run
+        call_gate: Optional callable that blocks before every uncached LLM request until it may be sent
+
+    Yields:
+        Event dictionaries with a "type" of run_started, task_started, task_reused, llm_call, task_completed,
+        cost_update, task_timed_out, task_truncated, run_truncated, run_completed, run_failed or run_cancelled
+    """
+    run_id = run_id or unique_id()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def observed(event):
+        if metrics:
+            metrics.observe(event)
+        return event
+
+    def emit(event_type, **data):
+        # The run's blocking steps emit from worker threads, so hop back onto the loop
+        if event_type == "task_completed" and not data["truncated"]:
+            registry.record_task(run_id, data["task_id"], data["execution_time"])
+        loop.call_soon_threadsafe(events.put_nowait, observed({"type": event_type, "run_id": run_id, **data}))
+
+    def on_llm_call(usage):
+        # LLM calls can complete on crewai worker threads, so hop back onto the loop
+        loop.call_soon_threadsafe(events.put_nowait, observed({"type": "llm_call", "run_id": run_id, **usage}))
+
+    registry = registry or RunRegistry()
+    registry.register(run_id, venture_idea, config_file)
+    meter = RunMeter(OPENAI_MODEL, listener=on_llm_call, call_gate=call_gate)
+
+    async def execute():
+        if not await asyncio.to_thread(registry.acquire_slot, run_id):
+            raise RunAborted(f"Run {run_id} left the queue before it started")
+        emit("run_started", venture_idea=venture_idea)
+        # Every blocking step (config and SQLite reads, token counting, report writes) runs in a worker
+        # thread, so one run never stalls the other runs and event streams sharing the event loop
+        run = await asyncio.to_thread(WorkshopRun, venture_idea, config_file, run_id,
+                                      _create_run_llm(meter, use_response_cache), meter, emit,
+                                      seed_from=seed_from, incremental=incremental)
+        _print_start_banner()
+
+        try:
+            for i, task in enumerate(run.tasks):
+                if await asyncio.to_thread(run.reuse_task, i, task):
+                    continue
+                if run.budget_exhausted:
+                    await asyncio.to_thread(run.stop, i)
+                    break
+
+                task_name, start_time = await asyncio.to_thread(run.start_task, i, task)
+                # Enforce the wall-time limit as a hard timeout as well, since a single LLM call can be long
+                timeouts = [t for t in (task_timeout, meter.task_limits.get("max_seconds")) if t]
+                timeout = min(timeouts) if timeouts else None
+                crew = await asyncio.to_thread(run.build_task_crew, i, task)
+                try:
+                    task_result = await asyncio.wait_for(run.akickoff_task(i, task, crew), timeout)
+                except asyncio.TimeoutError:
+                    emit("task_timed_out", task_index=i, task_name=task_name, timeout=timeout)
+                    await asyncio.to_thread(run.complete_task, i, task_name, start_time, None,
+                                            truncated=f"Task exceeded the {timeout} second limit")
+                except Exception:
+                    if meter.task_exceeded is None:
+                        raise
+                    await asyncio.to_thread(run.complete_task, i, task_name, start_time, None,
+                                            truncated=str(meter.task_exceeded))
+                else:
+                    await asyncio.to_thread(run.complete_task, i, task_name, start_time, task_result)
+                emit("cost_update", total_cost=run.total_cost, llm_usage=meter.snapshot())
+
+            final_report_path = await asyncio.to_thread(run.finalize)
+            await asyncio.to_thread(run.index_run)
+            await asyncio.to_thread(run.record_knowledge)
+        finally:
+            await asyncio.to_thread(run.close)
+        return final_report_path, run.total_cost
+
+    worker = asyncio.ensure_future(execute())
+    finished = False
+    try:
+        # Forward events until the workshop finishes
+        while not worker.done() or not events.empty():
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait({getter, worker}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+
+        try:
+            final_report_path, total_cost = worker.result()
+        except RunAborted as e:
+            # Cancelled or reaped while queued; its status is already recorded
+            finished = True
+            yield observed({"type": "run_cancelled", "run_id": run_id, "error": str(e)})
+            return
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            registry.finish(run_id, "failed", error=error)
+            finished = True
+            yield observed({"type": "run_failed", "run_id": run_id, "error": error,
+                            "traceback": "".join(traceback.format_exception(e))})
+            return
+
+        registry.finish(run_id, "completed", cost=total_cost, report_path=str(final_report_path))
+        finished = True
+        with open(final_report_path, "r") as f:
+            formatted_result = f.read()
+        yield observed({"type": "run_completed", "run_id": run_id, "total_cost": total_cost,
+                        "report_path": str(final_report_path), "llm_usage": meter.snapshot(),
+                        "result": formatted_result})
+    finally:
+        # Reached on cancellation or when the consumer stops iterating early
+        if not worker.done():
+            worker.cancel()
+        if not finished:
+            registry.finish(run_id, "cancelled", error="Cancelled by caller")
+            observed({"type": "run_cancelled", "run_id": run_id})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the venture monetization workshop interactively.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the stored output of every task whose inputs are unchanged since an earlier run")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only print which tasks an incremental re-run would execute and the estimated savings")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_SAMPLERS[0], choices=PROFILE_SAMPLERS, default=None,
+                        help="Write CPU profiles and top allocation sites of each phase of the run "
+                             "(cprofile by default, or pyinstrument sampling if installed)")
+    parser.add_argument("--archive-reports", action="store_true", default=None,
+                        help="Store the progress reports in the compressed report archive instead of a file per step")
+    args = parser.parse_args()
+
+    # Show other workshops sharing this machine; this run will queue if the concurrency limit is reached
+    active_runs = RunRegistry().active_runs()
+    if active_runs:
+        print(f"{len(active_runs)} workshop(s) currently queued or running in other processes:")
+        for run in active_runs:
+            print(f"- {run['run_id']} ({run['status']}, pid {run['pid']}): {run['venture_idea']}")
+        print("Concurrent runs are supported; each run writes its own reports in the reports directory.\n")
 
     # Print welcome message
     print("=" * 80)
@@ -370,9 +1231,29 @@ if __name__ == "__main__":
         print("Please check the file format and try again.")
         exit(1)
 
+    if args.dry_run:
+        print_incremental_plan(plan_incremental_run(venture_idea, config_file))
+        exit(0)
+
+    # Offer to reuse the early-stage outputs of a past run of a near-duplicate idea
+    seed_from = None
+    idea_index_config = {**DEFAULT_IDEA_INDEX, **config.get("idea_index", {})}
+    if idea_index_config["enabled"]:
+        matches = IdeaIndex().find_similar(venture_idea, idea_index_config["threshold"])
+        if matches:
+            print("\nSimilar venture ideas have been run before:")
+            for n, match in enumerate(matches, 1):
+                print(f"{n}. {match['run_id']} ({match['similarity']:.0%} similar): {match['venture_idea']}")
+            choice = input(f"\nReuse the {', '.join(idea_index_config['reuse_tasks'])} outputs of one of them? "
+                           f"Enter its number, or press Enter to start fresh: ").strip()
+            if choice.isdigit() and 1 <= int(choice) <= len(matches):
+                seed_from = matches[int(choice) - 1]["run_id"]
+
     try:
         # Run the workshop
-        result = run_venture_workshop(venture_idea, config_file)
+        result = run_venture_workshop(venture_idea, config_file, seed_from=seed_from,
+                                      incremental=True if args.incremental else None, profile=args.profile,
+                                      archive_reports=args.archive_reports)
 
         # Print the result
         print("\n\n" + "=" * 80)
@@ -385,5 +1266,4 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\nAn error occurred during the workshop: {e}")
         print("Please check the log files for more details.")
-        import traceback
         traceback.print_exc()
@@ -0,0 +1,324 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from config import METRICS_HOST, METRICS_SNAPSHOT_INTERVAL
+from utils import write_text_atomic
+
+# Upper bounds in seconds of the task latency histogram buckets
+TASK_DURATION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Upper bounds in seconds of the queue wait histogram buckets
+QUEUE_WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Events counted as errors; the event type is the error kind
+ERROR_EVENTS = ("run_failed", "run_crashed", "run_timed_out", "task_timed_out", "task_truncated")
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value)}"' for name, value in labels) + "}"
+
+class WorkshopMetrics:
+    """
+    In-process counters of the workshops running in this process (or reported to it by pool workers).
+
+    The metrics are fed from the workshop progress events, so instrumenting a
+    run only means passing the events to observe(). They are exposed in the
+    Prometheus text format by render_prometheus() and as a dictionary by snapshot().
+
+    The HTTP connection pool is read live when it is in this process
+    (http_pool); pool workers report their pool's counters with an
+    http_pool_stats event when their run ends.
+
+    Runs submitted through a WorkshopScheduler report run_queued and
+    run_dequeued events, which give the queue depth and wait time per
+    tenant; the tenant's finished runs and tasks are counted from then on.
+    """
+
+    def __init__(self, http_pool=None):
+        self._lock = threading.Lock()
+        self.http_pool = http_pool
+        self.worker_http = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+        self.runs_in_progress = 0
+        self.runs = {}
+        self.tasks_in_progress = 0
+        self.tasks = {}
+        self.task_durations = {}
+        self.llm_requests = {"false": 0, "true": 0}
+        self.tokens = {"input": 0, "output": 0}
+        self.cost = 0.0
+        self.errors = {}
+        self.tool_calls = {}
+        self.tool_memo_hits = {}
+        self.queue_depth = {}
+        self.queue_waits = {}
+        self.tenant_runs = {}
+        self.tenant_tasks = {}
+        self._run_costs = {}
+        self._run_tenants = {}
+
+    def observe(self, event):
+        """Update the metrics from one workshop progress event."""
+        event_type = event["type"]
+        with self._lock:
+            if event_type == "run_started":
+                self.runs_in_progress += 1
+            elif event_type in ("run_completed", "run_failed", "run_crashed", "run_timed_out", "run_cancelled"):
+                self.runs_in_progress = max(0, self.runs_in_progress - 1)
+                status = event_type.replace("run_", "")
+                self.runs[status] = self.runs.get(status, 0) + 1
+                self._run_costs.pop(event["run_id"], None)
+                self._count_tenant_run(event["run_id"], status)
+            elif event_type == "task_started":
+                self.tasks_in_progress += 1
+            elif event_type == "task_completed":
+                self.tasks_in_progress = max(0, self.tasks_in_progress - 1)
+                status = "truncated" if event.get("truncated") else "completed"
+                self.tasks[status] = self.tasks.get(status, 0) + 1
+                self._observe_duration(event.get("task_id", str(event["task_index"] + 1)), event["execution_time"])
+                tenant = self._run_tenants.get(event["run_id"])
+                if tenant is not None and status == "completed":
+                    self.tenant_tasks[tenant] = self.tenant_tasks.get(tenant, 0) + 1
+            elif event_type == "run_queued":
+                self._run_tenants[event["run_id"]] = event["tenant"]
+                self.queue_depth[event["tenant"]] = self.queue_depth.get(event["tenant"], 0) + 1
+            elif event_type == "run_dequeued":
+                tenant = event["tenant"]
+                self.queue_depth[tenant] = max(0, self.queue_depth.get(tenant, 0) - 1)
+                if event["cancelled"]:
+                    # A run cancelled in the queue never starts, so it ends here
+                    self._count_tenant_run(event["run_id"], "cancelled")
+                else:
+                    self._observe_wait(tenant, event["wait_seconds"])
+            elif event_type == "llm_call":
+                self.llm_requests["true" if event["cached"] else "false"] += 1
+                self.tokens["input"] += event["input_tokens"]
+                self.tokens["output"] += event["output_tokens"]
+                # Events carry the run's cumulative cost, so add what it grew by
+                previous = self._run_costs.get(event["run_id"], 0.0)
+                self.cost += max(0.0, event["cost"] - previous)
+                self._run_costs[event["run_id"]] = event["cost"]
+            elif event_type == "http_pool_stats":
+                for counter in self.worker_http:
+                    self.worker_http[counter] += event[counter]
+            elif event_type == "tool_memo_stats":
+                for tool_name, stats in event["tools"].items():
+                    self.tool_calls[tool_name] = self.tool_calls.get(tool_name, 0) + stats["calls"]
+                    self.tool_memo_hits[tool_name] = self.tool_memo_hits.get(tool_name, 0) + stats["hits"]
+
+            if event_type in ERROR_EVENTS:
+                self.errors[event_type] = self.errors.get(event_type, 0) + 1
+
+    def _count_tenant_run(self, run_id, status):
+        tenant = self._run_tenants.pop(run_id, None)
+        if tenant is not None:
+            key = (tenant, status)
+            self.tenant_runs[key] = self.tenant_runs.get(key, 0) + 1
+
+    def _observe_wait(self, tenant, seconds):
+        histogram = self.queue_waits.setdefault(
+            tenant, {"buckets": [0] * len(QUEUE_WAIT_BUCKETS), "sum": 0.0, "count": 0})
+        for b, bound in enumerate(QUEUE_WAIT_BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][b] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+    def _observe_duration(self, task_id, seconds):
+        histogram = self.task_durations.setdefault(
+            task_id, {"buckets": [0] * len(TASK_DURATION_BUCKETS), "sum": 0.0, "count": 0})
+        for b, bound in enumerate(TASK_DURATION_BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][b] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+    def http_pool_snapshot(self):
+        """Return the HTTP pool counters of this process and of the reporting workers together."""
+        with self._lock:
+            combined = dict(self.worker_http)
+        local = self.http_pool.snapshot() if self.http_pool else {}
+        for counter in combined:
+            combined[counter] += local.get(counter, 0)
+        for gauge in ("requests_in_flight", "connections_in_use", "connections_idle", "max_connections"):
+            combined[gauge] = local.get(gauge, 0)
+        return combined
+
+    def snapshot(self):
+        """Return all metrics as a plain dictionary."""
+        http_pool = self.http_pool_snapshot()
+        with self._lock:
+            llm_total = self.llm_requests["false"] + self.llm_requests["true"]
+            tool_total = sum(self.tool_calls.values())
+            return {
+                "generated_at": time.time(),
+                "runs_in_progress": self.runs_in_progress,
+                "runs": dict(self.runs),
+                "tasks_in_progress": self.tasks_in_progress,
+                "tasks": dict(self.tasks),
+                "task_duration_seconds": {
+                    task_id: {"buckets": dict(zip(TASK_DURATION_BUCKETS, histogram["buckets"])),
+                              "sum": histogram["sum"], "count": histogram["count"]}
+                    for task_id, histogram in self.task_durations.items()
+                },
+                "llm_requests": {"uncached": self.llm_requests["false"], "cached": self.llm_requests["true"]},
+                "llm_cache_hit_rate": self.llm_requests["true"] / llm_total if llm_total else 0.0,
+                "tokens": dict(self.tokens),
+                "cost": self.cost,
+                "errors": dict(self.errors),
+                "tool_calls": dict(self.tool_calls),
+                "tool_memo_hit_rate": sum(self.tool_memo_hits.values()) / tool_total if tool_total else 0.0,
+                "http_pool": http_pool,
+                "queue_depth": dict(self.queue_depth),
+                "queue_wait_seconds": {
+                    tenant: {"buckets": dict(zip(QUEUE_WAIT_BUCKETS, histogram["buckets"])),
+                             "sum": histogram["sum"], "count": histogram["count"]}
+                    for tenant, histogram in self.queue_waits.items()
+                },
+                "tenant_runs": {f"{tenant}/{status}": count for (tenant, status), count in self.tenant_runs.items()},
+                "tenant_tasks": dict(self.tenant_tasks)
+            }
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+
+        http_pool = self.http_pool_snapshot()
+        with self._lock:
+            metric("workshop_runs_in_progress", "gauge", "Workshops currently running.",
+                   [("", (), self.runs_in_progress)])
+            metric("workshop_runs_total", "counter", "Finished workshops by status.",
+                   [("", (("status", status),), count) for status, count in sorted(self.runs.items())])
+            metric("workshop_tasks_in_progress", "gauge", "Workshop tasks currently running.",
+                   [("", (), self.tasks_in_progress)])
+            metric("workshop_tasks_total", "counter", "Finished workshop tasks by status.",
+                   [("", (("status", status),), count) for status, count in sorted(self.tasks.items())])
+
+            samples = []
+            for task_id, histogram in sorted(self.task_durations.items()):
+                for bound, count in zip(TASK_DURATION_BUCKETS, histogram["buckets"]):
+                    samples.append(("_bucket", (("task", task_id), ("le", bound)), count))
+                samples.append(("_bucket", (("task", task_id), ("le", "+Inf")), histogram["count"]))
+                samples.append(("_sum", (("task", task_id),), histogram["sum"]))
+                samples.append(("_count", (("task", task_id),), histogram["count"]))
+            metric("workshop_task_duration_seconds", "histogram", "Wall-clock duration of workshop tasks.", samples)
+
+            metric("workshop_llm_requests_total", "counter", "LLM requests, by whether the response cache served them.",
+                   [("", (("cached", cached),), count) for cached, count in self.llm_requests.items()])
+            metric("workshop_llm_tokens_total", "counter", "LLM tokens by direction.",
+                   [("", (("direction", direction),), count) for direction, count in self.tokens.items()])
+            metric("workshop_llm_cost_dollars_total", "counter", "Estimated LLM spend in US dollars.",
+                   [("", (), round(self.cost, 6))])
+            metric("workshop_errors_total", "counter", "Failed runs and stopped tasks by kind.",
+                   [("", (("kind", kind),), count) for kind, count in sorted(self.errors.items())])
+            metric("workshop_tool_calls_total", "counter", "Tool calls of finished workshops by tool.",
+                   [("", (("tool", tool_name),), count) for tool_name, count in sorted(self.tool_calls.items())])
+            metric("workshop_tool_memo_hits_total", "counter", "Tool calls answered from the run's tool memo.",
+                   [("", (("tool", tool_name),), count) for tool_name, count in sorted(self.tool_memo_hits.items())])
+
+            metric("workshop_http_requests_total", "counter", "LLM API requests, by whether they reused a pooled connection.",
+                   [("", (("connection", "reused"),), http_pool["connections_reused"]),
+                    ("", (("connection", "new"),), http_pool["connections_opened"])])
+            metric("workshop_http_connections", "gauge", "Open connections of the shared HTTP pool by state.",
+                   [("", (("state", "in_use"),), http_pool["connections_in_use"]),
+                    ("", (("state", "idle"),), http_pool["connections_idle"])])
+            metric("workshop_http_pool_max_connections", "gauge", "Connection limit of the shared HTTP pool.",
+                   [("", (), http_pool["max_connections"])])
+
+            metric("workshop_queue_depth", "gauge", "Workshops waiting for the scheduler, by tenant.",
+                   [("", (("tenant", tenant),), depth) for tenant, depth in sorted(self.queue_depth.items())])
+            samples = []
+            for tenant, histogram in sorted(self.queue_waits.items()):
+                for bound, count in zip(QUEUE_WAIT_BUCKETS, histogram["buckets"]):
+                    samples.append(("_bucket", (("tenant", tenant), ("le", bound)), count))
+                samples.append(("_bucket", (("tenant", tenant), ("le", "+Inf")), histogram["count"]))
+                samples.append(("_sum", (("tenant", tenant),), histogram["sum"]))
+                samples.append(("_count", (("tenant", tenant),), histogram["count"]))
+            metric("workshop_queue_wait_seconds", "histogram", "Time workshops waited in the queue, by tenant.", samples)
+            metric("workshop_tenant_runs_total", "counter", "Finished workshops by tenant and status.",
+                   [("", (("tenant", tenant), ("status", status)), count)
+                    for (tenant, status), count in sorted(self.tenant_runs.items())])
+            metric("workshop_tenant_tasks_total", "counter", "Completed workshop tasks by tenant.",
+                   [("", (("tenant", tenant),), count) for tenant, count in sorted(self.tenant_tasks.items())])
+
+        return "\n".join(lines) + "\n"
+
+def start_metrics_server(metrics, port, host=METRICS_HOST):
+    """
+    Serve the metrics over HTTP from a background thread.
+
+    /metrics returns the Prometheus text format and /metrics.json the snapshot.
+
+    Args:
+        metrics: WorkshopMetrics to serve
+        port: Port to listen on (0 picks a free port)
+        host: Interface to listen on (local only by default)
+
+    Returns:
+        The running ThreadingHTTPServer; call shutdown() to stop it
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot(), indent=2), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the workshop output
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Serving workshop metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def start_snapshot_writer(metrics, path, interval=METRICS_SNAPSHOT_INTERVAL):
+    """
+    Write a JSON snapshot of the metrics to a file periodically from a background thread.
+
+    Args:
+        metrics: WorkshopMetrics to write
+        path: Snapshot file, replaced atomically on every write
+        interval: Seconds between snapshots
+
+    Returns:
+        Callable that writes a last snapshot and stops the writer
+    """
+    stop_event = threading.Event()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def write_snapshots():
+        while True:
+            stopping = stop_event.wait(interval)
+            write_text_atomic(path, json.dumps(metrics.snapshot(), indent=2))
+            if stopping:
+                return
+
+    thread = threading.Thread(target=write_snapshots, name="metrics-snapshot", daemon=True)
+    thread.start()
+
+    def stop():
+        stop_event.set()
+        thread.join()
+
+    return stop
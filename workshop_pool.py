@@ -0,0 +1,212 @@
+import argparse
+import json
+import multiprocessing
+import queue
+import time
+
+from config import MAX_CONCURRENT_WORKSHOPS, METRICS_PORT, METRICS_SNAPSHOT_INTERVAL, METRICS_SNAPSHOT_PATH
+from utils import unique_id
+
+# Events that end a run, and the summary statuses they leave behind
+FINAL_RUN_EVENTS = ("run_failed", "run_crashed", "run_timed_out", "run_cancelled")
+FINAL_STATUSES = ("completed",) + tuple(event_type.replace("run_", "") for event_type in FINAL_RUN_EVENTS)
+
+def _workshop_worker(job, run_id, event_queue):
+    """
+    Run a single workshop inside a worker process and forward its events to the coordinator.
+
+    Importing venture_workshop here keeps crewai, the LLM client and the
+    environment checks out of the coordinator process.
+    """
+    from venture_workshop import run_venture_workshop
+
+    try:
+        run_venture_workshop(
+            job["venture_idea"],
+            job.get("config_file", "workshop_config.json"),
+            run_id=run_id,
+            on_event=event_queue.put,
+            use_response_cache=job.get("use_response_cache", True),
+            return_output=False,
+            llm_call_events=job.get("llm_call_events", False)
+        )
+    except Exception:
+        # run_venture_workshop already reported the failure as a run_failed or run_cancelled event
+        pass
+
+    # The worker's HTTP pool served only this run, so its counters are the run's
+    from http_pool import shared_http_pool
+    http_pool = shared_http_pool()
+    if job.get("llm_call_events") and http_pool:
+        event_queue.put({"type": "http_pool_stats", "run_id": run_id, **http_pool.snapshot()})
+
+def print_event(event):
+    if event["type"] == "task_started":
+        print(f"[{event['run_id']}] Task {event['task_index'] + 1}/{event['total_tasks']} started: {event['task_name']}")
+    elif event["type"] == "task_completed":
+        print(f"[{event['run_id']}] Task {event['task_index'] + 1}/{event['total_tasks']} completed "
+              f"in {event['execution_time']:.2f}s (${event['cost']:.4f})")
+    elif event["type"] == "task_truncated":
+        print(f"[{event['run_id']}] Task {event['task_index'] + 1} truncated: {event['reason']}")
+    elif event["type"] == "run_completed":
+        print(f"[{event['run_id']}] Workshop completed (${event['total_cost']:.4f}), report: {event['report_path']}")
+    elif event["type"] in ("run_failed", "run_crashed", "run_timed_out"):
+        print(f"[{event['run_id']}] Workshop {event['type'].replace('run_', '').replace('_', ' ')}: {event['error']}")
+    elif event["type"] == "run_cancelled":
+        print(f"[{event['run_id']}] Workshop cancelled")
+    elif event["type"] == "run_queued":
+        print(f"[{event['run_id']}] Queued for tenant {event['tenant']} (priority {event['priority']}, "
+              f"expected {event['expected_seconds']:.0f}s)")
+    elif event["type"] == "run_dequeued" and not event["cancelled"]:
+        print(f"[{event['run_id']}] Starting after {event['wait_seconds']:.1f}s in the queue")
+
+def run_workshops_in_pool(jobs, max_workers=MAX_CONCURRENT_WORKSHOPS, timeout=None, on_event=print_event,
+                          metrics=None):
+    """
+    Run several independent workshops, each in its own worker process.
+
+    A crash or hang in one workshop never affects the others: crashed workers are
+    detected from their exit code and workers exceeding the timeout are terminated.
+    All workers share the on-disk LLM response cache and the run registry.
+    The order in which jobs start is decided by a WorkshopScheduler, from
+    their priority, their tenant's fair share and their expected duration.
+
+    Args:
+        jobs: List of dictionaries with "venture_idea" and optional "config_file", "use_response_cache",
+            "tenant" and "priority"
+        max_workers: Maximum number of workshops running at the same time
+        timeout: Optional wall-clock limit in seconds for each workshop
+        on_event: Callable receiving every progress event from the workers
+        metrics: Optional WorkshopMetrics updated with the events of all workers; the workers
+            then also report every LLM call
+
+    Returns:
+        Dictionary with a summary per run and aggregated totals
+    """
+    from run_registry import RunRegistry
+    from scheduler import WorkshopScheduler
+
+    context = multiprocessing.get_context("spawn")
+    event_queue = context.Queue()
+    batch_id = unique_id()
+
+    pending = {f"{batch_id}_{i + 1}": {**job, "llm_call_events": True} if metrics else job
+               for i, job in enumerate(jobs)}
+    running = {}
+    summaries = {
+        run_id: {"run_id": run_id, "venture_idea": job["venture_idea"], "status": "pending",
+                 "completed_tasks": 0, "cost": 0.0, "error": None, "report_path": None}
+        for run_id, job in pending.items()
+    }
+
+    def handle(event):
+        if metrics:
+            metrics.observe(event)
+        summary = summaries[event["run_id"]]
+        if event["type"] == "task_started":
+            summary["status"] = "running"
+        elif event["type"] == "task_completed":
+            summary["completed_tasks"] += 1
+            summary["cost"] += event["cost"]
+        elif event["type"] == "run_completed":
+            summary["status"] = "completed"
+            summary["report_path"] = event["report_path"]
+            summary["llm_usage"] = event.get("llm_usage")
+        elif event["type"] in FINAL_RUN_EVENTS:
+            summary["status"] = event["type"].replace("run_", "")
+            summary["error"] = event["error"]
+        if on_event:
+            on_event(event)
+
+    # The LLM rate budget is shared by the runs of one process only, so workers get no LLM gate
+    scheduler = WorkshopScheduler(max_workers, registry=RunRegistry())
+    for run_id, job in pending.items():
+        ticket = scheduler.submit(run_id, job.get("tenant"), job.get("priority", 0), job.get("config_file"))
+        handle({"type": "run_queued", "run_id": run_id, "tenant": ticket["tenant"], "priority": ticket["priority"],
+                "expected_seconds": ticket["expected_seconds"]})
+
+    def drain(block_seconds):
+        try:
+            handle(event_queue.get(timeout=block_seconds))
+            while True:
+                handle(event_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    while pending or running:
+        # Start the jobs the scheduler picks while there is free capacity
+        for ticket in scheduler.dispatch():
+            run_id, job = ticket["run_id"], pending.pop(ticket["run_id"])
+            handle({"type": "run_dequeued", "run_id": run_id, "tenant": ticket["tenant"],
+                    "wait_seconds": ticket["wait_seconds"], "cancelled": False})
+            process = context.Process(target=_workshop_worker, args=(job, run_id, event_queue), daemon=False)
+            process.start()
+            running[run_id] = (process, time.time())
+
+        drain(0.5)
+
+        # Check for finished, crashed and timed out workers
+        for run_id, (process, started_at) in list(running.items()):
+            if not process.is_alive():
+                process.join()
+                drain(0.1)
+                if summaries[run_id]["status"] not in FINAL_STATUSES:
+                    handle({"type": "run_crashed", "run_id": run_id,
+                            "error": f"Worker exited with code {process.exitcode}"})
+                del running[run_id]
+                scheduler.release(run_id)
+            elif timeout and time.time() - started_at > timeout:
+                process.terminate()
+                process.join()
+                handle({"type": "run_timed_out", "run_id": run_id,
+                        "error": f"Exceeded the {timeout} second limit"})
+                del running[run_id]
+                scheduler.release(run_id)
+
+    drain(0.1)
+
+    runs = list(summaries.values())
+    return {
+        "runs": runs,
+        "completed": sum(1 for run in runs if run["status"] == "completed"),
+        "failed": sum(1 for run in runs if run["status"] != "completed"),
+        "total_cost": sum(run["cost"] for run in runs)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several venture workshops in parallel worker processes.")
+    parser.add_argument("jobs_file", help='JSON file with a list of {"venture_idea": ..., "config_file": ...} objects '
+                                          '(optionally with "tenant" and "priority")')
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_WORKSHOPS, help="Maximum parallel workshops")
+    parser.add_argument("--timeout", type=float, default=None, help="Wall-clock limit per workshop in seconds")
+    parser.add_argument("--metrics-port", type=int, nargs="?", const=METRICS_PORT, default=None,
+                        help=f"Serve Prometheus metrics of the workshops on this local port (default {METRICS_PORT})")
+    parser.add_argument("--metrics-snapshot", nargs="?", const=METRICS_SNAPSHOT_PATH, default=None,
+                        help=f"Write a JSON snapshot of the metrics to this file periodically (default {METRICS_SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    with open(args.jobs_file, "r") as f:
+        jobs = json.load(f)
+
+    # Metrics are only collected when an endpoint or snapshot file is requested
+    metrics, server, stop_snapshots = None, None, None
+    if args.metrics_port is not None or args.metrics_snapshot:
+        from workshop_metrics import WorkshopMetrics, start_metrics_server, start_snapshot_writer
+        metrics = WorkshopMetrics()
+        if args.metrics_port is not None:
+            server = start_metrics_server(metrics, args.metrics_port)
+        if args.metrics_snapshot:
+            stop_snapshots = start_snapshot_writer(metrics, args.metrics_snapshot, METRICS_SNAPSHOT_INTERVAL)
+
+    result = run_workshops_in_pool(jobs, max_workers=args.workers, timeout=args.timeout, metrics=metrics)
+    if stop_snapshots:
+        stop_snapshots()
+    if server:
+        server.shutdown()
+
+    print("\n" + "=" * 80)
+    print(f"Completed {result['completed']} of {len(jobs)} workshops, total cost ${result['total_cost']:.4f}")
+    print("=" * 80)
+    for run in result["runs"]:
+        print(f"- {run['run_id']}: {run['status']} ({run['completed_tasks']} tasks, ${run['cost']:.4f})"
+              + (f" - {run['error']}" if run["error"] else ""))
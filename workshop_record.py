@@ -0,0 +1,244 @@
+import datetime
+import re
+import threading
+
+from config import OPENAI_MODEL
+
+# Agent ID of the historian, which the record replaces in workshop crews
+HISTORIAN_AGENT_ID = "historian"
+
+# "aggregator" builds the documentation from task results without an LLM pass;
+# "agent" keeps the historian agent in the crews as before
+HISTORIAN_MODES = ("aggregator", "agent")
+
+DEFAULT_HISTORIAN = {
+    "mode": "aggregator",
+    "narrative": True,
+    "digest_chars": 600
+}
+
+def extract_outcome(task_output):
+    """Return the Outcome section of a task output, or the whole output if it has none."""
+    if "# Outcome" in task_output:
+        return task_output.split("# Outcome")[1].split("# Collaboration Summary")[0].strip()
+    return task_output.strip()
+
+def _key_figures(text, limit=8):
+    """Return the first dollar amounts and percentages mentioned in a text, without duplicates."""
+    figures = re.findall(r"\$[0-9][0-9,]*(?:\.[0-9]+)?\s?(?:[KkMm]\b)?|[0-9]+(?:\.[0-9]+)?%", text)
+    return list(dict.fromkeys(figure.strip() for figure in figures))[:limit]
+
+def _digest(outcome, max_chars):
+    """Compact a task outcome to its headings and leading text, cut at a line boundary."""
+    headings = [line.lstrip("#").strip() for line in outcome.splitlines() if line.startswith("#")]
+    body = "\n".join(line for line in outcome.splitlines() if line.strip() and not line.startswith("#"))
+    if len(body) > max_chars:
+        body = body[:max_chars].rsplit("\n", 1)[0] + "\n..."
+    parts = []
+    if headings:
+        parts.append("Sections: " + "; ".join(headings))
+    parts.append(body)
+    return "\n".join(parts)
+
+class WorkshopRecord:
+    """
+    Deterministic documentation of a workshop run, built incrementally as tasks complete.
+
+    Each completed task adds one entry with a handle to its stored output, its
+    metrics and a compact digest. The progress reports and the documentation
+    section of the final report are streamed from the stored outputs; an LLM is
+    only used, once, to write the executive summary from the digests.
+    """
+
+    def __init__(self, venture_idea, digest_chars=DEFAULT_HISTORIAN["digest_chars"]):
+        self.venture_idea = venture_idea
+        self.digest_chars = digest_chars
+        self._lock = threading.Lock()
+        self.entries = []
+
+    def add_task(self, task_id, task_name, agent_role, output, metrics=None, collaborators=(), truncated=None):
+        """
+        Add the result of a completed task to the record.
+
+        Args:
+            task_id: ID of the task in the configuration
+            task_name: Name of the task
+            agent_role: Role of the agent responsible for the task
+            output: OutputHandle of the task's final output
+            metrics: Optional dictionary with the task's cost, tokens and execution time
+            collaborators: Roles of the agents that collaborated on the task
+            truncated: Reason the task was stopped early, if it was
+        """
+        # Only the digest of the outcome is kept in memory
+        outcome = output.read_outcome()
+        entry = {
+            "task_id": task_id,
+            "task_name": task_name,
+            "agent_role": agent_role,
+            "collaborators": list(collaborators),
+            "output": output,
+            "first_line": next((line.strip() for line in outcome.splitlines()
+                                if line.strip() and not line.startswith("#")), ""),
+            "digest": _digest(outcome, self.digest_chars),
+            "key_figures": _key_figures(outcome),
+            "metrics": metrics or {},
+            "truncated": truncated
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return entry
+
+    def digests(self):
+        """Return the compact digests of all steps as a single text."""
+        parts = [f"Venture idea: {self.venture_idea}"]
+        for i, entry in enumerate(self.entries, 1):
+            part = f"Step {i}: {entry['task_name']} (led by {entry['agent_role']})"
+            if entry["truncated"]:
+                part += f" [truncated: {entry['truncated']}]"
+            part += "\n" + entry["digest"]
+            if entry["key_figures"]:
+                part += "\nKey figures: " + ", ".join(entry["key_figures"])
+            parts.append(part)
+        return "\n\n".join(parts)
+
+    def summary(self):
+        """Return a deterministic executive summary listing the outcome digest of each step."""
+        lines = []
+        for entry in self.entries:
+            line = f"- **{entry['task_name']}**: {entry['first_line']}"
+            if entry["key_figures"]:
+                line += f" (key figures: {', '.join(entry['key_figures'][:4])})"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write_narrative(self, llm):
+        """
+        Write the executive summary with a single LLM call over the step digests.
+
+        Args:
+            llm: The language model to use
+
+        Returns:
+            The executive summary text
+        """
+        prompt = (
+            "You are the Workshop Historian. Below are compact digests of every step of a venture "
+            "monetization workshop. Write a concise executive summary (at most 400 words) covering "
+            "the venture, the prioritized monetization streams, the validation plan and the main "
+            "risks. Use only the information in the digests.\n\n" + self.digests()
+        )
+        return str(llm.call([{"role": "user", "content": prompt}])).strip()
+
+    def iter_documentation(self):
+        """Yield the detailed documentation of every step in markdown, streaming each outcome from disk."""
+        for i, entry in enumerate(self.entries, 1):
+            if i > 1:
+                yield "\n\n"
+            section = f"### Step {i}: {entry['task_name']}\n\n"
+            section += f"*Led by {entry['agent_role']}"
+            if entry["collaborators"]:
+                section += f" with {', '.join(entry['collaborators'])}"
+            section += "*\n\n"
+            if entry["truncated"]:
+                section += f"> **Truncated:** {entry['truncated']}\n\n"
+
+            metrics = entry["metrics"]
+            if metrics:
+                section += (f"- **Cost**: ${metrics.get('cost', 0):.4f}\n"
+                            f"- **Tokens**: {metrics.get('input_tokens', 0):,} input, "
+                            f"{metrics.get('output_tokens', 0):,} output\n"
+                            f"- **Execution Time**: {metrics.get('execution_time', 0):.2f} seconds\n\n")
+            yield section
+            yield from entry["output"].iter_outcome()
+
+    def documentation(self):
+        """Render the detailed documentation of every step in markdown."""
+        return "".join(self.iter_documentation())
+
+    def iter_progress_report(self, total_tasks, stop_reason=None, speculation_stats=None):
+        """
+        Yield the progress report for the steps recorded so far.
+
+        Args:
+            total_tasks: Number of tasks in the workshop
+            stop_reason: Why the workshop stopped early, if it did
+            speculation_stats: Optional speculative execution counters of the run
+
+        Yields:
+            Pieces of the progress report in markdown
+        """
+        entries = list(self.entries)
+
+        # Create a progress report
+        yield f"# GCC/MENA Venture Monetization Workshop - Progress Report\n\n"
+        yield f"## Venture Idea\n\n{self.venture_idea}\n\n"
+        yield f"## Progress: {len(entries)} of {total_tasks} steps completed\n\n"
+        if stop_reason:
+            yield f"**Workshop stopped early:** {stop_reason}\n\n"
+
+        # Add cost summary if available
+        task_costs = [entry["metrics"] for entry in entries if entry["metrics"]]
+        if task_costs:
+            total_cost = sum(cost_data["cost"] for cost_data in task_costs)
+            total_input_tokens = sum(cost_data["input_tokens"] for cost_data in task_costs)
+            total_output_tokens = sum(cost_data["output_tokens"] for cost_data in task_costs)
+            total_execution_time = sum(cost_data["execution_time"] for cost_data in task_costs)
+
+            summary = f"## Cost Summary\n\n"
+            summary += f"- **Total Cost**: ${total_cost:.4f}\n"
+            summary += f"- **Total Tokens**: {total_input_tokens:,} input, {total_output_tokens:,} output\n"
+            summary += f"- **Total Execution Time**: {total_execution_time:.2f} seconds\n"
+            if speculation_stats and speculation_stats["attempts"]:
+                summary += (f"- **Speculation**: {speculation_stats['hits']} of {speculation_stats['attempts']} "
+                            f"speculative tasks committed, {speculation_stats['seconds_saved']:.1f} seconds saved\n")
+            yield summary + "\n"
+
+        # Add completed steps
+        yield f"## Completed Steps\n\n"
+        for i, entry in enumerate(entries, 1):
+            step = f"### Step {i}: {entry['task_name']}\n\n"
+            if entry["truncated"]:
+                step += f"*Truncated: {entry['truncated']}*\n\n"
+            yield step + "#### Outcome\n"
+            yield from entry["output"].iter_outcome()
+            step = "\n\n"
+
+            # Add cost information if available
+            cost_data = entry["metrics"]
+            if cost_data:
+                step += f"#### Task Metrics\n"
+                if cost_data.get("reused_from"):
+                    step += f"- **Reused from run**: {cost_data['reused_from']}\n"
+                step += f"- **Cost**: ${cost_data['cost']:.4f}\n"
+                step += f"- **Tokens**: {cost_data['input_tokens']:,} input, {cost_data['output_tokens']:,} output\n"
+                step += f"- **LLM Calls**: {cost_data['llm_calls']}\n"
+                if cost_data.get("manager_turns"):
+                    step += (f"- **Manager Turns**: {cost_data['manager_turns']} "
+                             f"({cost_data['manager_prompt_tokens']:,} metered input tokens per turn; "
+                             f"roster pruning estimated to save ~{cost_data['roster_tokens_saved_estimate']:,} per turn)\n")
+                if cost_data.get("manager_turns_saved"):
+                    step += (f"- **Delegation Plan**: replayed, {cost_data['manager_turns_saved']} manager turns saved\n")
+                sizes = cost_data.get("prompt_sizes")
+                if sizes:
+                    step += (f"- **Prompt Size**: {sizes['backstory']:,} backstory, "
+                             f"{sizes['instructions']:,} instructions, {sizes['context']:,} context"
+                             + (f", {sizes['knowledge']:,} knowledge" if sizes.get("knowledge") else "") + " tokens\n")
+                step += f"- **Execution Time**: {cost_data['execution_time']:.2f} seconds\n\n"
+
+            # Add a link to the detailed explanation
+            yield step + f"[View detailed explanation](#step-{i}-details)\n\n"
+
+        # Add detailed explanations in a separate section
+        yield f"## Detailed Explanations\n\n"
+        for i, entry in enumerate(entries, 1):
+            yield f"<a id='step-{i}-details'></a>\n### Step {i}: {entry['task_name']} - Details\n\n"
+            yield from entry["output"].iter_chunks()
+            yield "\n\n"
+
+        # Add footer
+        footer = "\n---\n\n"
+        footer += f"*Progress report generated at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
+        footer += f"*This workshop is being conducted using {OPENAI_MODEL} with web browsing capabilities.*\n"
+        if task_costs:
+            footer += f"*Estimated total cost: ${total_cost:.4f}*\n"
+        yield footer
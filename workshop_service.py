@@ -0,0 +1,505 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import socketserver
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import MAX_CONCURRENT_WORKSHOPS, SCHEDULER_LLM_CALLS_PER_MINUTE, SERVICE_HOST, SERVICE_PORT, \
+    SERVICE_RETAINED_RUNS
+from run_registry import RunRegistry
+from scheduler import DEFAULT_TENANT, WorkshopScheduler, parse_tenant_weights
+from utils import load_config, unique_id
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Longest wait of a single long-poll request for new events
+MAX_POLL_SECONDS = 60
+
+class WorkshopService:
+    """
+    Runs submitted workshops in one long-lived process.
+
+    crewai, the LLM client, the parsed configurations and the tools' datasets
+    are loaded once by warm(), so a submission only pays for its own run.
+    Runs are driven by arun_venture_workshop on a single event loop in a
+    background thread, at most max_workers at a time (the run registry still
+    applies the machine-wide limit). Which queued run starts next, and how
+    the LLM rate budget is shared, is decided per tenant by a
+    WorkshopScheduler. The events of each run are kept for polling and
+    streaming.
+    """
+
+    def __init__(self, max_workers=MAX_CONCURRENT_WORKSHOPS, use_response_cache=True, metrics=None,
+                 retained_runs=SERVICE_RETAINED_RUNS, tenant_weights=None,
+                 llm_calls_per_minute=SCHEDULER_LLM_CALLS_PER_MINUTE):
+        self.max_workers = max_workers
+        self.use_response_cache = use_response_cache
+        self.metrics = metrics
+        self.retained_runs = retained_runs
+        self.scheduler = WorkshopScheduler(max_workers, tenant_weights, llm_calls_per_minute, registry=RunRegistry())
+        self.started_at = time.time()
+        self.runs = {}
+        self._futures = {}
+        self._start_events = {}
+        self._finished = collections.deque()
+        self._condition = threading.Condition()
+        self._loop = None
+
+    def warm(self, config_files=()):
+        """
+        Load everything a run needs up front.
+
+        Args:
+            config_files: Configurations to parse and whose tools to import now
+        """
+        started = time.perf_counter()
+        # crewai, the environment, the API key check and the shared LLM client
+        import venture_workshop  # noqa: F401
+        from benchmark_data import load_benchmarks
+        from pivot_engine import load_pivot_rules
+        from tool_registry import ToolRegistry
+
+        load_benchmarks()
+        load_pivot_rules()
+        for config_file in config_files:
+            config = load_config(config_file)
+            tools = ToolRegistry.from_config(config)
+            for tool_name in {name for agent_config in config["agents"] for name in agent_config.get("tools", [])}:
+                tools.spec(tool_name).load()
+        print(f"Workshop service warmed up in {time.perf_counter() - started:.2f} seconds")
+
+    def start(self):
+        """Start the event loop that runs the workshops."""
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="workshop-service", daemon=True).start()
+
+    def shutdown(self, timeout=30):
+        """Cancel the unfinished runs, wait for them to be recorded as cancelled and stop the event loop."""
+        async def cancel_all():
+            runs = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in runs:
+                task.cancel()
+            await asyncio.gather(*runs, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self._loop).result(timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def submit(self, venture_idea, config_file="workshop_config.json", seed_from=None, task_timeout=None,
+               tenant=DEFAULT_TENANT, priority=0):
+        """
+        Queue a workshop run.
+
+        Args:
+            venture_idea: A brief description of the venture idea
+            config_file: Path to the JSON configuration file
+            seed_from: Optional run ID whose early-stage outputs are reused (see IdeaIndex)
+            task_timeout: Optional wall-clock limit in seconds for each task
+            tenant: Tenant the run belongs to, for fair sharing between tenants
+            priority: Higher priorities start before lower ones, whatever their tenant
+
+        Returns:
+            The run ID
+
+        Raises:
+            ValueError: If the venture idea is empty or the configuration cannot be loaded
+        """
+        if not isinstance(venture_idea, str) or not venture_idea.strip():
+            raise ValueError("venture_idea must be a non-empty string")
+        try:
+            load_config(config_file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot load configuration '{config_file}': {e}") from None
+        try:
+            priority = int(priority or 0)
+        except (TypeError, ValueError):
+            raise ValueError("priority must be an integer") from None
+        tenant = str(tenant or DEFAULT_TENANT)
+
+        run_id = unique_id()
+        with self._condition:
+            self.runs[run_id] = {
+                "run_id": run_id, "venture_idea": venture_idea, "config_file": config_file, "tenant": tenant,
+                "priority": priority, "status": "queued", "submitted_at": time.time(), "started_at": None,
+                "finished_at": None, "completed_tasks": 0, "total_tasks": None, "cost": 0.0, "error": None,
+                "report_path": None, "events": []
+            }
+        job = {"venture_idea": venture_idea, "config_file": config_file, "seed_from": seed_from,
+               "task_timeout": task_timeout, "tenant": tenant}
+        # The event is only bound to the loop when awaited, so it can be created here
+        self._start_events[run_id] = asyncio.Event()
+        ticket = self.scheduler.submit(run_id, tenant, priority, config_file)
+        self._queue_event({"type": "run_queued", "run_id": run_id, "tenant": tenant, "priority": priority,
+                           "expected_seconds": ticket["expected_seconds"]})
+        self._futures[run_id] = asyncio.run_coroutine_threadsafe(self._execute(run_id, job), self._loop)
+        self._loop.call_soon_threadsafe(self._dispatch)
+        return run_id
+
+    def _queue_event(self, event):
+        if self.metrics:
+            self.metrics.observe(event)
+        self._record(event)
+
+    def _dispatch(self):
+        # Runs on the event loop: start the runs the scheduler picks
+        for ticket in self.scheduler.dispatch():
+            self._queue_event({"type": "run_dequeued", "run_id": ticket["run_id"], "tenant": ticket["tenant"],
+                               "wait_seconds": ticket["wait_seconds"], "cancelled": False})
+            start = self._start_events.pop(ticket["run_id"], None)
+            if start is not None:
+                start.set()
+
+    def _release(self, run_id):
+        # Runs on the event loop: free the run's slot (or queue place) and start the next runs
+        self._start_events.pop(run_id, None)
+        ticket = self.scheduler.release(run_id)
+        if ticket is not None and ticket["state"] == "cancelled":
+            self._queue_event({"type": "run_dequeued", "run_id": run_id, "tenant": ticket["tenant"],
+                               "wait_seconds": ticket["wait_seconds"], "cancelled": True})
+        self._dispatch()
+
+    async def _execute(self, run_id, job):
+        from venture_workshop import arun_venture_workshop
+
+        try:
+            start = self._start_events.get(run_id)
+            if start is not None:
+                await start.wait()
+            async for event in arun_venture_workshop(
+                job["venture_idea"], job["config_file"], run_id=run_id, task_timeout=job["task_timeout"],
+                use_response_cache=self.use_response_cache, metrics=self.metrics, seed_from=job["seed_from"],
+                call_gate=self.scheduler.llm_gate(job["tenant"])
+            ):
+                self._record(event)
+        except asyncio.CancelledError:
+            self._record({"type": "run_cancelled", "run_id": run_id})
+        except Exception as e:
+            self._record({"type": "run_failed", "run_id": run_id, "error": f"{type(e).__name__}: {e}"})
+        finally:
+            self._futures.pop(run_id, None)
+            self._release(run_id)
+
+    def _record(self, event):
+        # The report is on disk, so the final event does not need to hold it in memory
+        event = {key: value for key, value in event.items() if key != "result"}
+        with self._condition:
+            state = self.runs.get(event["run_id"])
+            if state is None or state["status"] in FINISHED_STATUSES:
+                return
+            event["seq"] = len(state["events"])
+            state["events"].append(event)
+
+            if event["type"] == "run_started":
+                state["status"], state["started_at"] = "running", time.time()
+            elif event["type"] == "task_started":
+                state["total_tasks"] = event["total_tasks"]
+            elif event["type"] == "task_completed":
+                state["completed_tasks"] += 1
+                state["cost"] += event["cost"]
+            elif event["type"] == "run_completed":
+                state["status"], state["report_path"], state["cost"] = "completed", event["report_path"], event["total_cost"]
+            elif event["type"] in ("run_failed", "run_cancelled"):
+                state["status"], state["error"] = event["type"].replace("run_", ""), event.get("error")
+
+            if state["status"] in FINISHED_STATUSES:
+                state["finished_at"] = time.time()
+                self._finished.append(state["run_id"])
+                # Forget the oldest finished runs; the run registry and reports keep their records
+                while len(self._finished) > self.retained_runs:
+                    self.runs.pop(self._finished.popleft(), None)
+            self._condition.notify_all()
+
+    def status(self, run_id):
+        """Return the state of a run without its events, or None if the run is unknown."""
+        with self._condition:
+            state = self.runs.get(run_id)
+            if state is None:
+                return None
+            return {**{key: value for key, value in state.items() if key != "events"}, "events": len(state["events"])}
+
+    def list_runs(self):
+        """Return the state of every retained run, most recent first."""
+        with self._condition:
+            run_ids = list(self.runs)
+        return [status for status in map(self.status, reversed(run_ids)) if status]
+
+    def events(self, run_id, after=0, wait=0):
+        """
+        Return the events of a run from position after, waiting for new ones if there are none yet.
+
+        Args:
+            run_id: ID of the run
+            after: Number of events the caller has already seen
+            wait: Seconds to wait for a new event
+
+        Returns:
+            Tuple of (events, whether the run has finished), or None if the run is unknown
+        """
+        with self._condition:
+            state = self.runs.get(run_id)
+            if state is None:
+                return None
+            self._condition.wait_for(
+                lambda: len(state["events"]) > after or state["status"] in FINISHED_STATUSES, timeout=wait
+            )
+            return state["events"][after:], state["status"] in FINISHED_STATUSES
+
+    def cancel(self, run_id):
+        """
+        Cancel a queued or running workshop.
+
+        Returns:
+            True if the run was cancelled, False if it already finished, None if it is unknown
+        """
+        if self.status(run_id) is None:
+            return None
+        future = self._futures.get(run_id)
+        if future is None or not future.cancel():
+            return False
+        # A run still waiting for a slot never starts, so record the cancellation here
+        self._record({"type": "run_cancelled", "run_id": run_id})
+        self._loop.call_soon_threadsafe(self._release, run_id)
+        return True
+
+    def queue(self):
+        """Return the scheduler's queue, running runs and per-tenant counters, with queue positions."""
+        snapshot = self.scheduler.snapshot()
+        for position, ticket in enumerate(snapshot["queued"]):
+            ticket["position"] = position
+        return snapshot
+
+    def health(self):
+        """Return the service's uptime and the number of retained runs by status."""
+        with self._condition:
+            statuses = collections.Counter(state["status"] for state in self.runs.values())
+        return {"status": "ok", "uptime_seconds": round(time.time() - self.started_at, 1),
+                "max_workers": self.max_workers, "queued": len(self.scheduler.queued), "runs": dict(statuses)}
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, body):
+            data = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self):
+            url = urlparse(self.path)
+            return [part for part in url.path.split("/") if part], parse_qs(url.query)
+
+        def do_GET(self):
+            parts, query = self._route()
+            if parts == ["health"]:
+                self._send_json(200, service.health())
+            elif parts == ["runs"]:
+                self._send_json(200, {"runs": service.list_runs()})
+            elif parts == ["queue"]:
+                self._send_json(200, service.queue())
+            elif len(parts) == 2 and parts[0] == "runs":
+                status = service.status(parts[1])
+                if status is None:
+                    self._send_json(404, {"error": "Unknown run"})
+                else:
+                    self._send_json(200, status)
+            elif len(parts) == 3 and parts[0] == "runs" and parts[2] == "events":
+                after = int(query.get("after", ["0"])[0])
+                wait = min(float(query.get("wait", ["0"])[0]), MAX_POLL_SECONDS)
+                result = service.events(parts[1], after, wait)
+                if result is None:
+                    self._send_json(404, {"error": "Unknown run"})
+                else:
+                    events, finished = result
+                    self._send_json(200, {"events": events, "next": after + len(events), "finished": finished})
+            elif len(parts) == 3 and parts[0] == "runs" and parts[2] == "stream":
+                self._stream(parts[1], int(query.get("after", ["0"])[0]))
+            elif parts in (["metrics"], ["metrics.json"]) and service.metrics:
+                if parts == ["metrics"]:
+                    data = service.metrics.render_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send_json(200, service.metrics.snapshot())
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def _stream(self, run_id, after):
+            """Send the run's events as server-sent events until it finishes."""
+            if service.status(run_id) is None:
+                self._send_json(404, {"error": "Unknown run"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            try:
+                while True:
+                    result = service.events(run_id, after, wait=15)
+                    if result is None:
+                        return
+                    events, finished = result
+                    for event in events:
+                        self.wfile.write(f"id: {event['seq']}\nevent: {event['type']}\n"
+                                         f"data: {json.dumps(event, default=str)}\n\n".encode("utf-8"))
+                    if not events:
+                        self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    after += len(events)
+                    if finished and not events:
+                        return
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped following the run; the run itself continues
+                return
+
+        def do_POST(self):
+            parts, _ = self._route()
+            if parts != ["runs"]:
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                run_id = service.submit(
+                    body.get("venture_idea"), body.get("config_file", "workshop_config.json"),
+                    seed_from=body.get("seed_from"), task_timeout=body.get("task_timeout"),
+                    tenant=body.get("tenant"), priority=body.get("priority", 0)
+                )
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(202, {"run_id": run_id, "status": "queued"})
+
+        def do_DELETE(self):
+            parts, _ = self._route()
+            if len(parts) != 2 or parts[0] != "runs":
+                self._send_json(404, {"error": "Not found"})
+                return
+            cancelled = service.cancel(parts[1])
+            if cancelled is None:
+                self._send_json(404, {"error": "Unknown run"})
+            elif not cancelled:
+                self._send_json(409, {"error": "Run already finished"})
+            else:
+                self._send_json(202, {"run_id": parts[1], "status": "cancelling"})
+
+        def log_message(self, format, *args):
+            # Keep requests out of the workshop output
+            pass
+
+    return Handler
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+def create_server(service, port=SERVICE_PORT, host=SERVICE_HOST, socket_path=None):
+    """
+    Create the HTTP server of a workshop service.
+
+    Args:
+        service: The started WorkshopService
+        port: Port to listen on (0 picks a free port)
+        host: Interface to listen on (local only by default)
+        socket_path: Listen on this Unix socket instead of a TCP port
+
+    Returns:
+        The server; call serve_forever() to handle requests
+    """
+    handler = _make_handler(service)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def _request(url, method="GET", body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def _serve(args):
+    metrics = None
+    if args.metrics:
+        from http_pool import shared_http_pool
+        from workshop_metrics import WorkshopMetrics
+        metrics = WorkshopMetrics(http_pool=shared_http_pool())
+
+    service = WorkshopService(args.workers, use_response_cache=not args.no_response_cache, metrics=metrics,
+                              tenant_weights=parse_tenant_weights(args.tenant_weights),
+                              llm_calls_per_minute=args.llm_calls_per_minute)
+    service.warm(args.preload)
+    service.start()
+    server = create_server(service, args.port, args.host, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Workshop service listening on {where} ({args.workers} concurrent workshops)")
+    if args.llm_calls_per_minute:
+        print(f"LLM calls are shared fairly between tenants at {args.llm_calls_per_minute:g} per minute")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping the workshop service; unfinished runs are cancelled")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+def _submit(args):
+    from workshop_pool import print_event
+
+    submitted = _request(f"{args.url}/runs", "POST", {"venture_idea": args.venture_idea, "config_file": args.config,
+                                                      "seed_from": args.seed_from, "tenant": args.tenant,
+                                                      "priority": args.priority})
+    run_id = submitted["run_id"]
+    print(f"Submitted run {run_id}")
+    if not args.follow:
+        return
+
+    after, finished = 0, False
+    while not finished:
+        result = _request(f"{args.url}/runs/{run_id}/events?after={after}&wait={MAX_POLL_SECONDS}")
+        for event in result["events"]:
+            print_event(event)
+        after, finished = result["next"], result["finished"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run venture workshops from a long-lived local service.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Start the service")
+    serve.add_argument("--host", default=SERVICE_HOST, help="Interface to listen on")
+    serve.add_argument("--port", type=int, default=SERVICE_PORT, help="Port to listen on")
+    serve.add_argument("--socket", default=None, help="Listen on this Unix socket instead of a TCP port")
+    serve.add_argument("--workers", type=int, default=MAX_CONCURRENT_WORKSHOPS, help="Maximum concurrent workshops")
+    serve.add_argument("--preload", nargs="*", default=["workshop_config.json"],
+                       help="Configurations to parse and whose tools to load at startup")
+    serve.add_argument("--no-response-cache", action="store_true", help="Don't use the shared LLM response cache")
+    serve.add_argument("--metrics", action="store_true", help="Serve Prometheus metrics on /metrics")
+    serve.add_argument("--tenant-weights", default="", help='Share of each tenant, e.g. "acme=2,globex=1" (default 1)')
+    serve.add_argument("--llm-calls-per-minute", type=float, default=SCHEDULER_LLM_CALLS_PER_MINUTE,
+                       help="Global LLM call budget, shared fairly between the tenants")
+
+    submit = commands.add_parser("submit", help="Submit a workshop to a running service")
+    submit.add_argument("venture_idea", help="A brief description of the venture idea")
+    submit.add_argument("--config", default="workshop_config.json", help="Configuration file, as seen by the service")
+    submit.add_argument("--seed-from", default=None, help="Run ID whose early-stage outputs to reuse")
+    submit.add_argument("--tenant", default=DEFAULT_TENANT, help="Tenant the run belongs to")
+    submit.add_argument("--priority", type=int, default=0, help="Higher priorities start first")
+    submit.add_argument("--url", default=f"http://{SERVICE_HOST}:{SERVICE_PORT}", help="URL of the service")
+    submit.add_argument("--follow", action="store_true", help="Print the run's progress until it finishes")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        _serve(args)
+    else:
+        _submit(args)